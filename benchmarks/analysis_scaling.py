@@ -0,0 +1,232 @@
+"""
+Benchmark the analysis functions on synthetic seasons of growing size
+
+Run from the root of the repository:
+    python -m benchmarks.analysis_scaling --sizes 300 30000 3000000
+    python -m benchmarks.analysis_scaling --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import timeit
+import tracemalloc
+import numpy as np
+import pandas as pd
+from modules.analysis import (
+    compute_report,
+    least_cs,
+    longest_loss_streak,
+    most_deaths,
+    worst_day,
+    worst_kda,
+    worst_rolling_kda,
+    worst_vs,
+    worst_winrate,
+)
+
+FUNCTIONS = [
+    most_deaths,
+    least_cs,
+    worst_winrate,
+    worst_kda,
+    worst_vs,
+    longest_loss_streak,
+    worst_rolling_kda,
+    worst_day,
+    compute_report,
+]
+
+DEFAULT_SIZES = [300, 3_000, 30_000, 300_000, 3_000_000, 10_000_000]
+
+RESULTS_DIRECTORY = "benchmarks/results"
+
+# Positions in the same mix as data/Among Us Jimin.csv, with the role and
+# lane usually reported for each
+POSITIONS = {
+    "TOP": (0.21, "SOLO", "TOP"),
+    "JUNGLE": (0.19, "NONE", "JUNGLE"),
+    "MIDDLE": (0.23, "SOLO", "MIDDLE"),
+    "BOTTOM": (0.23, "CARRY", "BOTTOM"),
+    "UTILITY": (0.14, "SUPPORT", "BOTTOM"),
+}
+
+
+def make_player_frame(num_rows, num_champions=165, seed=0):
+    """
+    Makes a synthetic player frame shaped like a scraped .csv file. Champions
+    are picked with a long-tailed popularity, like real players, and stats
+    are drawn around the averages of the sample data for each position.
+
+    Args:
+        num_rows: An integer representing the number of games
+        num_champions: An integer representing the number of champions
+        seed: An integer seeding the random number generator
+
+    Returns:
+        A DataFrame indexed by match id holding the analysis columns
+    """
+    rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, num_champions + 1)
+    champions = np.array([f"Champion{idx}" for idx in range(num_champions)])
+    positions = np.array(list(POSITIONS))
+    position_idx = rng.choice(
+        len(positions),
+        num_rows,
+        p=[share for share, _, _ in POSITIONS.values()],
+    )
+    jungle = position_idx == list(POSITIONS).index("JUNGLE")
+    support = position_idx == list(POSITIONS).index("UTILITY")
+    time_played = rng.integers(850, 2950, num_rows)
+    minutes = time_played / 60
+    return pd.DataFrame(
+        {
+            "championName": champions[
+                rng.choice(num_champions, num_rows, p=popularity / popularity.sum())
+            ],
+            "kills": rng.poisson(7, num_rows),
+            "deaths": rng.poisson(4.7, num_rows),
+            "assists": rng.poisson(np.where(support, 14, 7), num_rows),
+            "win": rng.random(num_rows) < 0.5,
+            "neutralMinionsKilled": rng.poisson(np.where(jungle, 5, 0.5) * minutes),
+            "totalMinionsKilled": rng.poisson(
+                np.where(jungle | support, 1, 6) * minutes
+            ),
+            "timePlayed": time_played,
+            "visionScore": rng.poisson(np.where(support, 1.7, 0.6) * minutes),
+            "individualPosition": positions[position_idx],
+            "role": np.array([role for _, role, _ in POSITIONS.values()])[position_idx],
+            "teamPosition": positions[position_idx],
+            "lane": np.array([lane for _, _, lane in POSITIONS.values()])[position_idx],
+            # Most recent match first, about six games a day
+            "gameCreation": 1668000000000 - np.arange(num_rows) * 4 * 60 * 60 * 1000,
+        },
+        index=pd.Index([f"NA1_{idx}" for idx in range(num_rows)]),
+    )
+
+
+def measure(func, player_data, repeats):
+    """
+    Times an analysis function and measures the memory it allocates
+
+    Args:
+        func: An analysis function taking player_data
+        player_data: A DataFrame holding a player's stats
+        repeats: An integer representing how many timed measurements to
+            take the fastest of
+
+    Returns:
+        A dictionary holding the fastest time in seconds and the peak memory
+        allocated in bytes
+    """
+    # Small frames are run many times per measurement so the timer is not
+    # swamped by noise
+    timer = timeit.Timer(lambda: func(player_data))
+    number = timer.autorange()[0]
+    seconds = min(timer.repeat(repeat=repeats, number=number)) / number
+
+    # Memory is measured in a separate run since tracing slows allocations
+    tracemalloc.start()
+    func(player_data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def current_commit():
+    """
+    Finds the short hash of the checked out commit, or "working" outside git
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "working"
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how results changed from a baseline run and flags regressions
+
+    Args:
+        results: A dictionary of results made by main
+        baseline: A dictionary of results from an earlier run
+        threshold: A float representing the slowdown ratio counted as a
+            regression
+
+    Returns:
+        An integer representing the number of regressions found
+    """
+    regressions = 0
+    for size, functions in results["results"].items():
+        for name, result in functions.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if before is None:
+                continue
+            ratio = result["seconds"] / before["seconds"]
+            memory_ratio = result["peak_bytes"] / max(before["peak_bytes"], 1)
+            flag = ""
+            if ratio > threshold or memory_ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(
+                f"rows={size:<10} {name:<20} time x{ratio:5.2f} "
+                f"memory x{memory_ratio:5.2f}{flag}"
+            )
+    return regressions
+
+
+def main():
+    """
+    Prints and saves the time and peak memory of each analysis function for
+    each frame size
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="file to save results to")
+    parser.add_argument("--compare", help="results file of an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="slowdown ratio reported as a regression",
+    )
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = {"commit": commit, "results": {}}
+    for size in args.sizes:
+        player_data = make_player_frame(size)
+        results["results"][str(size)] = {}
+        for func in FUNCTIONS:
+            result = measure(func, player_data, args.repeats)
+            results["results"][str(size)][func.__name__] = result
+            print(
+                f"rows={size:<10} {func.__name__:<20} "
+                f"{result['seconds'] * 1000:10.2f}ms "
+                f"{result['peak_bytes'] / 2**20:10.2f}MiB"
+            )
+        del player_data
+
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="UTF-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="UTF-8") as file:
+            baseline = json.load(file)
+        print(f"Compared to {baseline['commit']}:")
+        if compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
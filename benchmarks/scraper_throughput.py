@@ -0,0 +1,90 @@
+"""
+Benchmark match fetching throughput against the local Riot API stand-in
+
+Run from the root of the repository:
+    python -m benchmarks.scraper_throughput --matches 300 --latency 0.05
+"""
+
+import argparse
+import tempfile
+import time
+from modules.rate_limit import APP_LIMITS, RateLimiter, attach_rate_limiter
+from modules.riot_server import (
+    FixtureStore,
+    RiotStandIn,
+    create_stand_in_watcher,
+    make_synthetic_fixtures,
+)
+from modules.scraper import fetch_matches
+
+
+def time_fetch(stand_in, matchlist, max_workers, app_limits):
+    """
+    Times fetching every match in a matchlist from a stand-in server
+
+    Args:
+        stand_in: A running RiotStandIn object
+        matchlist: A list of strings representing match ids
+        max_workers: An integer representing the most requests in flight
+        app_limits: A tuple of (requests, seconds) limits for the rate limiter
+
+    Returns:
+        A tuple holding the seconds taken, the number of 429 responses and
+        the rate limiter's stats
+    """
+    watcher = create_stand_in_watcher(stand_in.url)
+    rate_limiter = RateLimiter(app_limits=app_limits)
+    attach_rate_limiter(watcher, rate_limiter)
+    throttled_before = stand_in.throttled_count
+    start = time.perf_counter()
+    for _ in fetch_matches(
+        watcher,
+        matchlist,
+        "na1",
+        max_workers=max_workers,
+        rate_limiter=rate_limiter,
+    ):
+        pass
+    return (
+        time.perf_counter() - start,
+        stand_in.throttled_count - throttled_before,
+        rate_limiter.stats(),
+    )
+
+
+def main():
+    """
+    Prints fetch throughput for increasing numbers of workers
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument(
+        "--dev-limits",
+        action="store_true",
+        help="enforce the rate limits of a development key on both sides",
+    )
+    args = parser.parse_args()
+    app_limits = APP_LIMITS if args.dev_limits else ()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = FixtureStore(directory)
+        matchlist = make_synthetic_fixtures(store, "Benchmark", args.matches)
+        for max_workers in args.workers:
+            stand_in = RiotStandIn(store, latency=args.latency, app_limits=app_limits)
+            stand_in.start()
+            seconds, throttled, stats = time_fetch(
+                stand_in, matchlist, max_workers, app_limits
+            )
+            stand_in.stop()
+            print(
+                f"workers={max_workers:<3} {seconds:8.2f}s "
+                f"{len(matchlist) / seconds:8.1f} matches/s  429s={throttled} "
+                f"retries={stats['retries']} "
+                f"throttled={stats['throttled_time']:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Puts the repository root on the import path, so the tests import the
+modules as the `modules` package the same way the ui and the command line
+tools do
+"""
@@ -2,6 +2,129 @@
 Functions for analyzing League of Legends game stats
 """
 
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+# Stats added up for each champion by worst_winrate and worst_kda
+CHAMPION_TOTALS = ["win", "kills", "deaths", "assists"]
+
+# Number of games in a row that worst_rolling_kda looks at
+ROLLING_WINDOW = 10
+
+# Fewest games played in a day for it to count for worst_day
+MIN_DAY_GAMES = 3
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+@dataclass(frozen=True)
+class WrappedReport:
+    """
+    All of a player's lowlights, as worked out by compute_report
+
+    Attributes
+    ----------
+    most_deaths : tuple
+        the most deaths in one game and the champion played, see most_deaths
+    least_cs : tuple
+        the least cs/m in one game and the champion played, see least_cs
+    worst_winrate : tuple
+        dictionaries for the five champions with the worst winrates, see
+        worst_winrate
+    worst_kda : tuple
+        dictionaries for the five champions with the worst KDAs, see
+        worst_kda
+    worst_vs : tuple
+        the least vision score per minute in one game and the champion
+        played, see worst_vs
+    loss_streak : tuple
+        the most games lost in a row and the champion played most in them,
+        see longest_loss_streak
+    rolling_kda : tuple
+        the worst KDA over ROLLING_WINDOW games in a row and the champion
+        played most in them, see worst_rolling_kda
+    worst_day : tuple
+        the day with the worst winrate, the games won and the games played
+        that day, see worst_day
+    """
+
+    most_deaths: tuple
+    least_cs: tuple
+    worst_winrate: tuple
+    worst_kda: tuple
+    worst_vs: tuple
+    loss_streak: tuple
+    rolling_kda: tuple
+    worst_day: tuple
+
+
+def compute_report(player_data):
+    """
+    Works out every lowlight at once. The game lengths, role masks, champion
+    totals and order of games they share are only computed once, and
+    player_data is neither copied nor changed.
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+
+    Returns:
+        A WrappedReport holding the player's lowlights
+    """
+    minutes = player_data["timePlayed"] / 60
+    support_games, other_games = _role_games(player_data)
+    champ_stats = _champion_totals(player_data, CHAMPION_TOTALS)
+    order = _played_order(player_data)
+    return WrappedReport(
+        most_deaths=most_deaths(player_data),
+        least_cs=_least_cs(player_data, minutes, other_games),
+        worst_winrate=tuple(_worst_winrate(champ_stats)),
+        worst_kda=tuple(_worst_kda(champ_stats)),
+        worst_vs=_worst_vs(player_data, minutes, support_games),
+        loss_streak=_longest_loss_streak(player_data, order),
+        rolling_kda=_worst_rolling_kda(player_data, order, ROLLING_WINDOW),
+        worst_day=worst_day(player_data),
+    )
+
+
+def _role_games(player_data):
+    """
+    Finds which games were played as a support and which were played in a
+    role that is not support in any way
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+
+    Returns:
+        A tuple holding two boolean Series, marking the support games and the
+        other games
+    """
+    utility_position = player_data["individualPosition"] == "UTILITY"
+    support_role = player_data["role"] == "SUPPORT"
+    utility_team_position = player_data["teamPosition"] == "UTILITY"
+    support_games = utility_position & support_role & utility_team_position
+    other_games = ~utility_position & ~support_role & ~utility_team_position
+    return (support_games, other_games)
+
+
+def _lowest_game(values, champions):
+    """
+    Finds the lowest value of a per-game stat and the champion played in the
+    first game with that value
+
+    Args:
+        values: A Series holding the stat for each game
+        champions: A Series holding the champion played in each game
+
+    Returns:
+        A tuple holding a float, representing the lowest value, and a string,
+        representing the champion name, or (nan, None) if there are no games
+    """
+    if values.count() == 0:
+        return (float("nan"), None)
+    position = values.argmin()
+    return (float(values.iloc[position]), champions.iloc[position])
+
 
 def most_deaths(player_data):
     """
@@ -15,9 +138,11 @@ def most_deaths(player_data):
         A tuple holding an integer, representing the number of deaths, and
         a string, representing the champion name
     """
-    max_deaths = player_data["deaths"].max()
-    champ_name = player_data[player_data["deaths"] == max_deaths]["championName"][0]
-    return (max_deaths, champ_name)
+    position = player_data["deaths"].argmax()
+    return (
+        int(player_data["deaths"].iloc[position]),
+        player_data["championName"].iloc[position],
+    )
 
 
 def least_cs(player_data):
@@ -32,16 +157,71 @@ def least_cs(player_data):
         A tuple holding an float, represetning the cs/m, and a string,
         representing the champion name
     """
-    player_data["cs/m"] = (
+    return _least_cs(
+        player_data, player_data["timePlayed"] / 60, _role_games(player_data)[1]
+    )
+
+
+def _least_cs(player_data, minutes, other_games):
+    """
+    Finds the least cs per minute in one game, see least_cs
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        minutes: A Series holding the length of each game in minutes
+        other_games: A boolean Series marking the games not played as support
+
+    Returns:
+        A tuple holding a float, representing the cs/m, and a string,
+        representing the champion name
+    """
+    creep_score = (
         player_data["neutralMinionsKilled"] + player_data["totalMinionsKilled"]
-    ) / (player_data["timePlayed"] / 60)
-    min_cs = player_data[
-        (player_data["individualPosition"] != "UTILITY")
-        & (player_data["role"] != "SUPPORT")
-        & (player_data["teamPosition"] != "UTILITY")
-    ]["cs/m"].min()
-    champ_name = player_data[player_data["cs/m"] == min_cs]["championName"][0]
-    return (min_cs, champ_name)
+    )
+    cs_per_min = creep_score / minutes
+    return _lowest_game(
+        cs_per_min[other_games], player_data["championName"][other_games]
+    )
+
+
+def _champion_totals(player_data, columns):
+    """
+    Adds up stats for each champion in one pass over the player's games
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        columns: A list of strings representing the stats to add up
+
+    Returns:
+        A DataFrame indexed by champion name, in the order each champion was
+        first played, holding the totals and a games_played column
+    """
+    champ_games = player_data.groupby("championName", sort=False, observed=True)
+    champ_totals = champ_games[columns].sum()
+    champ_totals["games_played"] = champ_games.size()
+    return champ_totals
+
+
+def _worst_five(stat_values, games_played, stat):
+    """
+    Picks the five champions with the lowest value of a stat. Champions with
+    the same value are kept in the order they were first played.
+
+    Args:
+        stat_values: A Series indexed by champion name holding the stat
+        games_played: A Series indexed by champion name holding the number
+            of games played
+        stat: A string representing the name of the stat
+
+    Returns:
+        A list of dictionaries, each holding the champion's name, the stat,
+        and the number of games played
+    """
+    worst = stat_values.sort_values(kind="stable").head(5)
+    return [
+        {"champ": champ, stat: float(value), "games_played": int(games_played[champ])}
+        for champ, value in worst.items()
+    ]
 
 
 def worst_winrate(player_data):
@@ -57,26 +237,22 @@ def worst_winrate(player_data):
         winrates. Each dictionary holds the champion's name, winrate, and
         number of games played
     """
-    champs_played = player_data["championName"].unique()
+    return _worst_winrate(_champion_totals(player_data, ["win"]))
 
-    champ_wrs = []
 
-    for champ in champs_played:
-        champ_games = player_data[player_data["championName"] == champ]["win"]
-        games_played = len(champ_games)
-        if games_played < 5:
-            continue
-        winrate = sum(champ_games) / games_played
+def _worst_winrate(champ_stats):
+    """
+    Finds the five champions with the worst winrates, see worst_winrate
 
-        champ_wrs.append(
-            {
-                "champ": champ,
-                "winrate": winrate,
-                "games_played": games_played,
-            }
-        )
+    Args:
+        champ_stats: A DataFrame made by _champion_totals with a win column
 
-    return sorted(champ_wrs, key=lambda champ_dict: champ_dict["winrate"])[:5]
+    Returns:
+        A list of dictionaries, as returned by worst_winrate
+    """
+    games_played = champ_stats["games_played"]
+    winrates = champ_stats["win"] / games_played
+    return _worst_five(winrates[games_played >= 5], games_played, "winrate")
 
 
 def worst_kda(player_data):
@@ -92,42 +268,239 @@ def worst_kda(player_data):
         KDAs. Each dictionary holds the champion's name, KDA, and
         number of games played
     """
-    champs_played = player_data["championName"].unique()
+    return _worst_kda(_champion_totals(player_data, ["kills", "deaths", "assists"]))
 
-    champ_kdas = []
 
-    for champ in champs_played:
-        champ_games = player_data[player_data["championName"] == champ]
-        assists = champ_games["assists"].sum()
-        deaths = champ_games["deaths"].sum()
-        kills = champ_games["kills"].sum()
-        if deaths == 0:
-            continue
-        kda = (kills + assists) / deaths
-        champ_kdas.append(
-            {"champ": champ, "kda": kda, "games_played": len(champ_games)}
-        )
-    return sorted(champ_kdas, key=lambda champ_dict: champ_dict["kda"])[:5]
+def _worst_kda(champ_stats):
+    """
+    Finds the five champions with the worst KDAs, see worst_kda
+
+    Args:
+        champ_stats: A DataFrame made by _champion_totals with kills, deaths
+            and assists columns
+
+    Returns:
+        A list of dictionaries, as returned by worst_kda
+    """
+    deaths = champ_stats["deaths"]
+    kdas = (champ_stats["kills"] + champ_stats["assists"]) / deaths
+    return _worst_five(kdas[deaths != 0], champ_stats["games_played"], "kda")
 
 
 def worst_vs(player_data):
-    player_data["vs/m"] = player_data["visionScore"] / player_data["timePlayed"] / 60
-    min_vis_score_per_min = player_data[
-        (player_data["individualPosition"] == "UTILITY")
-        & (player_data["role"] == "SUPPORT")
-        & (player_data["teamPosition"] == "UTILITY")
-    ]["vs/m"].min()
-    champ_name = player_data[player_data["visionScore"] == min_vis_score_per_min][
-        "championName"
-    ]
+    """
+    Finds the least vision score per minute in one game played as a support
+    and the champion that was being played
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+
+    Returns:
+        A tuple holding a float, representing the vision score per minute,
+        and a string, representing the champion name
+    """
+    return _worst_vs(
+        player_data, player_data["timePlayed"] / 60, _role_games(player_data)[0]
+    )
+
+
+def _worst_vs(player_data, minutes, support_games):
+    """
+    Finds the least vision score per minute in one game, see worst_vs
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        minutes: A Series holding the length of each game in minutes
+        support_games: A boolean Series marking the games played as support
+
+    Returns:
+        A tuple holding a float, representing the vision score per minute,
+        and a string, representing the champion name
+    """
+    vs_per_min = player_data["visionScore"] / minutes
+    return _lowest_game(
+        vs_per_min[support_games], player_data["championName"][support_games]
+    )
+
+
+def _played_order(player_data):
+    """
+    Finds the order the games were played in, oldest first. Games are sorted
+    by gameCreation when every game has it, otherwise the scraper's order,
+    most recent match first, is reversed.
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+
+    Returns:
+        An array of integers representing the positions of the games in
+        player_data, oldest first
+    """
+    if (
+        "gameCreation" in player_data.columns
+        and player_data["gameCreation"].notna().all()
+    ):
+        return np.argsort(player_data["gameCreation"].to_numpy(), kind="stable")
+    return np.arange(len(player_data))[::-1]
+
+
+def _most_played(champions):
+    """
+    Finds the champion played the most in some games, picking the one played
+    first if several were played equally often
+
+    Args:
+        champions: A Series holding the champion played in each game
+
+    Returns:
+        A string representing the champion name
+    """
+    return champions.groupby(champions, sort=False, observed=True).size().idxmax()
+
+
+def longest_loss_streak(player_data):
+    """
+    Finds the most games lost in a row and the champion played the most
+    during that streak
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+
+    Returns:
+        A tuple holding an integer, representing the number of games, and a
+        string, representing the champion name, or (0, None) if no games
+        were lost
+    """
+    return _longest_loss_streak(player_data, _played_order(player_data))
+
 
-    player_data["vs/m"] = (player_data["visionScore"]) / (
-        player_data["timePlayed"] / 60
+def _longest_loss_streak(player_data, order):
+    """
+    Finds the longest loss streak, see longest_loss_streak
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        order: An array of integers representing the positions of the games,
+            oldest first
+
+    Returns:
+        A tuple, as returned by longest_loss_streak
+    """
+    # A game with no result counts as not won, as it does in the winrates
+    lost = ~player_data["win"].to_numpy(dtype=bool, na_value=False)[order]
+
+    # Streaks start where a loss follows a win and end where a win follows
+    # a loss, so the changes come in start, end pairs
+    changes = np.flatnonzero(np.diff(np.concatenate(([0], lost.astype(np.int8), [0]))))
+    if len(changes) == 0:
+        return (0, None)
+    starts, ends = changes[::2], changes[1::2]
+    longest = np.argmax(ends - starts)
+    streak = order[starts[longest] : ends[longest]]
+    return (
+        int(ends[longest] - starts[longest]),
+        _most_played(player_data["championName"].iloc[streak]),
+    )
+
+
+def worst_rolling_kda(player_data, window=ROLLING_WINDOW):
+    """
+    Finds the worst KDA over a number of games in a row, calculated as
+    total (kills + assists) / deaths, and the champion played the most in
+    those games
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        window: An integer representing the number of games in a row
+
+    Returns:
+        A tuple holding a float, representing the KDA, and a string,
+        representing the champion name, or (nan, None) if there are fewer
+        games than window or no deaths in any of them
+    """
+    return _worst_rolling_kda(player_data, _played_order(player_data), window)
+
+
+def _worst_rolling_kda(player_data, order, window):
+    """
+    Finds the worst rolling KDA, see worst_rolling_kda
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various matches
+        order: An array of integers representing the positions of the games,
+            oldest first
+        window: An integer representing the number of games in a row
+
+    Returns:
+        A tuple, as returned by worst_rolling_kda
+    """
+    if len(order) < window:
+        return (float("nan"), None)
+
+    # Window totals are differences of running totals
+    kills_assists = np.cumsum(
+        np.concatenate(
+            (
+                [0],
+                player_data["kills"].to_numpy(dtype=np.int64)[order]
+                + player_data["assists"].to_numpy(dtype=np.int64)[order],
+            )
+        )
+    )
+    deaths = np.cumsum(
+        np.concatenate(([0], player_data["deaths"].to_numpy(dtype=np.int64)[order]))
+    )
+    window_kills_assists = kills_assists[window:] - kills_assists[:-window]
+    window_deaths = deaths[window:] - deaths[:-window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kdas = np.where(window_deaths > 0, window_kills_assists / window_deaths, np.inf)
+
+    start = np.argmin(kdas)
+    if np.isinf(kdas[start]):
+        return (float("nan"), None)
+    return (
+        float(kdas[start]),
+        _most_played(player_data["championName"].iloc[order[start : start + window]]),
+    )
+
+
+def worst_day(player_data, min_games=MIN_DAY_GAMES):
+    """
+    Finds the day, in UTC, with the worst winrate out of the days with at
+    least min_games games played. If several days are equally bad, the one
+    with the most games is picked, then the earliest.
+
+    Args:
+        player_data: A DataFrame holding a player's stats from various
+            matches, with a gameCreation column
+        min_games: An integer representing the fewest games played in a day
+            for it to count
+
+    Returns:
+        A tuple holding a string, representing the day as YYYY-MM-DD, and two
+        integers, representing the games won and played that day, or
+        (None, 0, 0) if no day counts or there is no gameCreation column
+    """
+    if "gameCreation" not in player_data.columns:
+        return (None, 0, 0)
+    dated = player_data["gameCreation"].notna()
+    days = player_data["gameCreation"][dated].astype(np.int64) // MS_PER_DAY
+    day_stats = (
+        player_data["win"][dated]
+        .fillna(False)
+        .astype(bool)
+        .groupby(days)
+        .agg(["sum", "size"])
+    )
+    day_stats = day_stats[day_stats["size"] >= min_games]
+    if len(day_stats) == 0:
+        return (None, 0, 0)
+    day_stats["winrate"] = day_stats["sum"] / day_stats["size"]
+    worst = day_stats.sort_values(
+        ["winrate", "size"], ascending=[True, False], kind="stable"
+    ).iloc[0]
+    return (
+        pd.Timestamp(worst.name * MS_PER_DAY, unit="ms").strftime("%Y-%m-%d"),
+        int(worst["sum"]),
+        int(worst["size"]),
     )
-    min_vs = player_data[
-        (player_data["individualPosition"] == "UTILITY")
-        & (player_data["role"] == "SUPPORT")
-        & (player_data["teamPosition"] == "UTILITY")
-    ]["vs/m"].min()
-    champ_name = player_data[player_data["vs/m"] == min_vs]["championName"][0]
-    return (min_vs, champ_name)
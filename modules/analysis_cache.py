@@ -0,0 +1,242 @@
+"""
+Remembers analysis results so a player's lowlights are only worked out once
+"""
+
+from collections import OrderedDict
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import pandas as pd
+from modules.analysis import WrappedReport
+from modules.storage import ANALYSIS_SCHEMA
+
+DEFAULT_CACHE_PATH = "data/analysis_cache.sqlite"
+
+# Raise whenever the analysis functions change what they return, so results
+# cached by older code are not reused
+SCHEMA_VERSION = 3
+
+
+def dataset_fingerprint(player_data):
+    """
+    Makes a short fingerprint of a player's data from its column names and
+    dtypes, its match ids and every value in the columns the analysis reads,
+    so a result is only reused for exactly the same data
+
+    Args:
+        player_data: A DataFrame holding a player's stats, indexed by match id
+
+    Returns:
+        A string representing the fingerprint
+    """
+    columns = sorted(player_data.columns, key=str)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{SCHEMA_VERSION}:{len(player_data)}:".encode())
+    digest.update(
+        "\0".join(
+            f"{column}:{player_data[column].dtype}" for column in columns
+        ).encode()
+    )
+    stats = player_data[[column for column in columns if column in ANALYSIS_SCHEMA]]
+    digest.update(pd.util.hash_pandas_object(stats, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _as_tuples(value):
+    """
+    Turns the lists in a decoded JSON value back into the tuples the
+    analysis functions return
+    """
+    if isinstance(value, list):
+        return tuple(_as_tuples(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _as_tuples(item) for key, item in value.items()}
+    return value
+
+
+def encode_result(result):
+    """
+    Writes an analysis result as JSON, so results can be stored without
+    pickling
+
+    Args:
+        result: A WrappedReport, or a value returned by one of the analysis
+            functions
+
+    Returns:
+        A string holding the JSON, or None if the result cannot be written
+        as JSON
+    """
+    if dataclasses.is_dataclass(result):
+        result = {"report": dataclasses.asdict(result)}
+    else:
+        result = {"value": result}
+    try:
+        return json.dumps(result)
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_result(text):
+    """
+    Reads an analysis result written by encode_result
+
+    Args:
+        text: A string holding the JSON
+
+    Returns:
+        The result, or None if text is not a result written by encode_result
+    """
+    try:
+        result = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(result, dict):
+        return None
+    if "report" in result:
+        return WrappedReport(**_as_tuples(result["report"]))
+    return _as_tuples(result.get("value"))
+
+
+class AnalysisCache:
+    """
+    A least recently used store of analysis results in memory, backed by an
+    optional SQLite file so results survive between runs. Results are keyed
+    by the dataset fingerprint and the module and qualified name of the
+    analysis function, and are stored on disk as JSON, so opening a cache
+    file never runs code from it. Results that can be written as JSON are
+    always returned as read back from JSON, so a result has the same types
+    whether it was just computed or found in memory or on disk.
+
+    Attributes
+    ----------
+    max_entries : int
+        most results kept in memory before the least recently used are
+        dropped
+    path : str
+        path to the SQLite database file, or None to only keep results in
+        memory
+    hits : int
+        number of lookups that found a result in memory or on disk
+    misses : int
+        number of lookups that had to run the analysis
+    """
+
+    def __init__(self, max_entries=128, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "fingerprint TEXT NOT NULL, "
+                "name TEXT NOT NULL, "
+                "data BLOB NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "PRIMARY KEY (fingerprint, name))"
+            )
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+    def _remember(self, key, result):
+        """
+        Puts a result in memory, dropping the least recently used results if
+        there are more than max_entries
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _load(self, key):
+        """
+        Looks up a result in the SQLite file, returning None if it is missing
+        """
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT data FROM results WHERE fingerprint = ? AND name = ?", key
+        ).fetchone()
+        return None if row is None else decode_result(row[0])
+
+    def _store(self, key, text):
+        """
+        Saves a result written by encode_result to the SQLite file, if there
+        is one and the result could be written as JSON
+        """
+        if self._connection is None or text is None:
+            return
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (*key, text, time.time()),
+        )
+        self._connection.commit()
+
+    def call(self, func, player_data):
+        """
+        Runs an analysis function on a player's data, or returns its result
+        from the last time it was run on the same data
+
+        Args:
+            func: An analysis function taking player_data, such as
+                compute_report or worst_kda. A ValueError is raised for
+                lambdas and functions defined inside other functions, since
+                their names do not tell them apart.
+            player_data: A DataFrame holding a player's stats, indexed by
+                match id
+
+        Returns:
+            The value returned by func, with lists as tuples if it can be
+            written as JSON, see decode_result
+        """
+        name = f"{func.__module__}.{func.__qualname__}"
+        if "<lambda>" in name or "<locals>" in name:
+            raise ValueError(f"{name} has no unique name to cache its results by")
+        key = (dataset_fingerprint(player_data), name)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            result = self._load(key)
+            if result is not None:
+                self._remember(key, result)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = func(player_data)
+        text = encode_result(result)
+        if text is not None:
+            result = decode_result(text)
+        with self._lock:
+            self._remember(key, result)
+            self._store(key, text)
+        return result
+
+    def clear(self):
+        """
+        Forgets every result, in memory and on disk
+        """
+        with self._lock:
+            self._results.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM results")
+                self._connection.commit()
+
+    def close(self):
+        """
+        Closes the connection to the database file, if there is one
+        """
+        if self._connection is not None:
+            self._connection.close()
@@ -0,0 +1,220 @@
+"""
+Downloads every champion square of a Data Dragon version and the other images
+the ui shows, so the ui can start offline. Run
+`python -m modules.asset_sync --version 13.6.1`
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from modules.image_store import (
+    DDRAGON_URL,
+    DDRAGON_VERSION,
+    DEFAULT_IMAGE_DIRECTORY,
+    MANIFEST_NAME,
+    REMOTE_IMAGES,
+    champion_image_path,
+    champion_image_url,
+    load_manifest,
+    remote_image_path,
+    write_file_atomic,
+)
+
+VERSIONS_URL = "http://ddragon.leagueoflegends.com/api/versions.json"
+
+
+def make_session(max_workers):
+    """
+    Creates a session that keeps a connection open for each worker
+
+    Args:
+        max_workers: An integer representing the most requests in flight
+
+    Returns:
+        A requests.Session object
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def latest_version(session):
+    """
+    Finds the newest Data Dragon version
+
+    Args:
+        session: A requests.Session object
+
+    Returns:
+        A string representing the version, like "13.6.1"
+    """
+    response = session.get(VERSIONS_URL, timeout=30)
+    response.raise_for_status()
+    return response.json()[0]
+
+
+def champion_names(session, version=DDRAGON_VERSION, base_url=DDRAGON_URL):
+    """
+    Finds every champion in a Data Dragon version
+
+    Args:
+        session: A requests.Session object
+        version: A string representing the Data Dragon version
+        base_url: A string representing the URL of the Data Dragon CDN
+
+    Returns:
+        A list of strings representing the champion names
+    """
+    response = session.get(f"{base_url}/{version}/data/en_US/champion.json", timeout=30)
+    response.raise_for_status()
+    return list(response.json()["data"])
+
+
+def fetch_asset(session, url, filepath, entry=None):
+    """
+    Downloads a file unless it is unchanged since it was last downloaded.
+    When the file was last downloaded from the same URL, the ETag and
+    Last-Modified headers of that download are sent back, so the server
+    answers 304 Not Modified without the file if it has not changed. A
+    champion's square in a new version has a new URL, so it is downloaded
+    and counted as unchanged if its content hash matches the last version's.
+
+    Args:
+        session: A requests.Session object
+        url: A string representing the URL of the file
+        filepath: A string representing where to save the file
+        entry: A dictionary holding the manifest entry of the last download
+            of the file, or None if it has not been downloaded
+
+    Returns:
+        A tuple holding the new manifest entry and a boolean representing
+        whether the file's content changed since the last download
+    """
+    headers = {}
+    if entry is not None and entry["url"] == url and os.path.exists(filepath):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=30)
+    if response.status_code == 304:
+        return (entry, False)
+
+    response.raise_for_status()
+    write_file_atomic(filepath, response.content)
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    return (
+        {
+            "url": url,
+            "path": filepath,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": content_hash,
+        },
+        entry is None or entry.get("sha256") != content_hash,
+    )
+
+
+def sync_assets(
+    version=DDRAGON_VERSION,
+    directory=DEFAULT_IMAGE_DIRECTORY,
+    max_workers=16,
+    session=None,
+    base_url=DDRAGON_URL,
+    remote_images=None,
+):
+    """
+    Downloads the champion squares of a Data Dragon version and the remote
+    images in parallel, and records them in the manifest. Images already
+    downloaded from the same URL are only downloaded again if they changed,
+    but each version has its own champion square URLs, so a new version
+    downloads every square again.
+
+    Args:
+        version: A string representing the Data Dragon version
+        directory: A string representing the image cache directory
+        max_workers: An integer representing the most requests in flight
+        session: A requests.Session object, or None to make one with a
+            connection for each worker
+        base_url: A string representing the URL of the Data Dragon CDN
+        remote_images: A dictionary mapping image names to URLs, or None for
+            REMOTE_IMAGES
+
+    Returns:
+        A dictionary holding the number of files whose content changed,
+        whose content was unchanged and that failed
+    """
+    session = make_session(max_workers) if session is None else session
+    remote_images = REMOTE_IMAGES if remote_images is None else remote_images
+    manifest = load_manifest(directory) or {"version": None, "assets": {}}
+
+    # Manifest entries are keyed without the version, so a new version is
+    # checked against what was downloaded for the last one
+    targets = {
+        f"champion/{champ}.png": (
+            champion_image_url(champ, version, base_url),
+            champion_image_path(champ, version, directory),
+        )
+        for champ in champion_names(session, version, base_url)
+    }
+    for name, url in remote_images.items():
+        targets[f"remote/{name}"] = (url, remote_image_path(name, directory))
+
+    counts = {"changed": 0, "unchanged": 0, "failed": 0}
+    assets = manifest["assets"]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_asset, session, url, filepath, assets.get(key)): key
+            for key, (url, filepath) in targets.items()
+        }
+        for future in as_completed(futures):
+            try:
+                entry, changed = future.result()
+            except (requests.RequestException, OSError):
+                counts["failed"] += 1
+                continue
+            assets[futures[future]] = entry
+            counts["changed" if changed else "unchanged"] += 1
+
+    manifest["version"] = version
+    manifest["synced_at"] = time.time()
+    write_file_atomic(
+        os.path.join(directory, MANIFEST_NAME),
+        json.dumps(manifest, indent=2, sort_keys=True).encode(),
+    )
+    return counts
+
+
+def main():
+    """
+    Syncs the images from the command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--version", default=DDRAGON_VERSION, help='version, or "latest"'
+    )
+    parser.add_argument("--directory", default=DEFAULT_IMAGE_DIRECTORY)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    session = make_session(args.workers)
+    version = latest_version(session) if args.version == "latest" else args.version
+    start = time.perf_counter()
+    counts = sync_assets(version, args.directory, args.workers, session)
+    print(
+        f"Synced Data Dragon {version} to {args.directory} in "
+        f"{time.perf_counter() - start:.1f}s: {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged, {counts['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
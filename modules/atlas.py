@@ -0,0 +1,166 @@
+"""
+A sprite atlas of the ui's images, pre-rendered at the size they are shown,
+made by `python -m modules.build_atlas`
+"""
+
+import json
+import os
+import numpy as np
+from PIL import Image
+
+# Width in pixels of the atlas, the sprites are packed into rows this wide
+ATLAS_WIDTH = 2048
+
+# Background of each slide, by image name
+BACKGROUNDS = {
+    "death_bg": "assets/TEMPLATE_deaths.jpg",
+    "kda_bg": "assets/TEMPLATE_kda.jpg",
+    "farm_bg": "assets/TEMPLATE_farm.jpg",
+    "vision_bg": "assets/TEMPLATE_vision.jpg",
+    "winrate_bg": "assets/TEMPLATE_winrate.jpg",
+    "tilt_bg": "assets/TEMPLATE_tilt.jpg",
+}
+
+# Size in pixels of the backgrounds, before scaling
+BACKGROUND_SIZE = (720, 1280)
+
+# Size in pixels the remote images are shown at, whatever the scale
+REMOTE_SIZE = (int(1276 * 0.375), int(718 * 0.375))
+
+
+def atlas_path(version, scale, directory):
+    """
+    Finds where the atlas for a Data Dragon version and ui scale is saved
+
+    Args:
+        version: A string representing the Data Dragon version
+        scale: A float representing the ui scale
+        directory: A string representing the image cache directory
+
+    Returns:
+        A string representing the path to the atlas, without an extension.
+        The pixels are saved in a .npy file and the index in a .json file.
+    """
+    return os.path.join(directory, "atlas", f"{version}_{scale:g}")
+
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """
+    Packs rectangles into rows, tallest first, so little space is wasted
+    between rectangles of similar sizes
+
+    Args:
+        sizes: A dictionary mapping names to (width, height) tuples, none
+            wider than width
+        width: An integer representing the width of the atlas
+
+    Returns:
+        A tuple holding a dictionary mapping each name to an (x, y, width,
+        height) tuple and an integer representing the height of the atlas
+    """
+    boxes = {}
+    x_pos = y_pos = row_height = 0
+    for name in sorted(sizes, key=lambda name: sizes[name][1], reverse=True):
+        box_width, box_height = sizes[name]
+        if x_pos + box_width > width:
+            x_pos, y_pos, row_height = 0, y_pos + row_height, 0
+        boxes[name] = (x_pos, y_pos, box_width, box_height)
+        x_pos += box_width
+        row_height = max(row_height, box_height)
+    return (boxes, y_pos + row_height)
+
+
+class SpriteAtlas:
+    """
+    Images packed into one array of pixels. A saved atlas is memory mapped,
+    so slicing out a sprite only reads its pixels from disk.
+
+    Attributes
+    ----------
+    pixels : ndarray
+        RGB pixels of the atlas, with shape (height, width, 3)
+    sprites : dict
+        (x, y, width, height) of each sprite in pixels, keyed by image name
+    """
+
+    def __init__(self, pixels, sprites):
+        self.pixels = pixels
+        self.sprites = sprites
+
+    def __contains__(self, name):
+        return name in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def image(self, name):
+        """
+        Slices a sprite out of the atlas
+
+        Args:
+            name: A string representing the image name
+
+        Returns:
+            A PIL Image
+        """
+        x_pos, y_pos, width, height = self.sprites[name]
+        region = self.pixels[y_pos : y_pos + height, x_pos : x_pos + width]
+        return Image.fromarray(np.ascontiguousarray(region))
+
+    @classmethod
+    def from_images(cls, images, width=ATLAS_WIDTH):
+        """
+        Packs images into an atlas
+
+        Args:
+            images: A dictionary mapping names to PIL Images
+            width: An integer representing the width of the atlas
+
+        Returns:
+            A SpriteAtlas object
+        """
+        sprites, height = pack(
+            {name: image.size for name, image in images.items()}, width
+        )
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        for name, (x_pos, y_pos, box_width, box_height) in sprites.items():
+            region = pixels[y_pos : y_pos + box_height, x_pos : x_pos + box_width]
+            region[...] = np.asarray(images[name].convert("RGB"))
+        return cls(pixels, sprites)
+
+    def save(self, filepath):
+        """
+        Saves the atlas to a .npy file of pixels and a .json index
+
+        Args:
+            filepath: A string representing the path, without an extension,
+                see atlas_path
+        """
+        # The index is written last, so an atlas is only found by load once
+        # its pixels are complete
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(f"{filepath}.npy.tmp", "wb") as file:
+            np.save(file, self.pixels, allow_pickle=False)
+        os.replace(f"{filepath}.npy.tmp", f"{filepath}.npy")
+        with open(f"{filepath}.json.tmp", "w", encoding="UTF-8") as file:
+            json.dump({"sprites": self.sprites}, file)
+        os.replace(f"{filepath}.json.tmp", f"{filepath}.json")
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads an atlas saved by save, memory mapping its pixels
+
+        Args:
+            filepath: A string representing the path, without an extension
+
+        Returns:
+            A SpriteAtlas object, or None if there is no atlas at filepath
+        """
+        if not os.path.exists(f"{filepath}.json"):
+            return None
+        with open(f"{filepath}.json", "r", encoding="UTF-8") as file:
+            sprites = {
+                name: tuple(box) for name, box in json.load(file)["sprites"].items()
+            }
+        return cls(np.load(f"{filepath}.npy", mmap_mode="r"), sprites)
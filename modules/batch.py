@@ -0,0 +1,182 @@
+"""
+Works out the lowlights of every player in a directory across a pool of
+processes. Run `python -m modules.batch data --output summary.csv`
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import islice
+import os
+import time
+from modules.analysis import compute_report
+from modules.cohort import player_files
+from modules.storage import load_analysis_data
+
+# Columns of the summary table, in order
+SUMMARY_COLUMNS = [
+    "summoner",
+    "games",
+    "load_seconds",
+    "analysis_seconds",
+    "most_deaths",
+    "most_deaths_champ",
+    "least_cs",
+    "least_cs_champ",
+    "worst_winrate",
+    "worst_winrate_champ",
+    "worst_kda",
+    "worst_kda_champ",
+    "worst_vs",
+    "worst_vs_champ",
+    "loss_streak",
+    "loss_streak_champ",
+    "rolling_kda",
+    "rolling_kda_champ",
+    "worst_day",
+    "worst_day_wins",
+    "worst_day_games",
+    "error",
+]
+
+
+def summarize_report(report):
+    """
+    Flattens a player's lowlights into one row of the summary table. The
+    lists of champions are summed up by their worst champion.
+
+    Args:
+        report: A WrappedReport holding a player's lowlights
+
+    Returns:
+        A dictionary mapping summary columns to values
+    """
+    row = {}
+    for name in ["most_deaths", "least_cs", "worst_vs", "loss_streak", "rolling_kda"]:
+        row[name], row[f"{name}_champ"] = getattr(report, name)
+    for name, stat in [("worst_winrate", "winrate"), ("worst_kda", "kda")]:
+        champs = getattr(report, name)
+        row[name] = champs[0][stat] if champs else None
+        row[f"{name}_champ"] = champs[0]["champ"] if champs else None
+    row["worst_day"], row["worst_day_wins"], row["worst_day_games"] = report.worst_day
+    return row
+
+
+def analyze_file(filepath):
+    """
+    Loads one player's data file and works out their lowlights, timing both
+
+    Args:
+        filepath: A string representing the path to a .csv, .parquet or
+            .arrow file
+
+    Returns:
+        A dictionary holding the player's row of the summary table. If the
+        file cannot be analyzed, the error column says why.
+    """
+    row = {"summoner": os.path.splitext(os.path.basename(filepath))[0]}
+    try:
+        start = time.perf_counter()
+        player_data = load_analysis_data(filepath)
+        loaded = time.perf_counter()
+        report = compute_report(player_data)
+        row["analysis_seconds"] = time.perf_counter() - loaded
+        row["load_seconds"] = loaded - start
+        row["games"] = len(player_data)
+        row.update(summarize_report(report))
+    except Exception as error:  # pylint: disable=broad-except
+        # One bad file must not stop the rest of the batch, and its row says
+        # what went wrong
+        row["error"] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def analyze_files(filepaths):
+    """
+    Analyzes a chunk of players' data files one after another, see
+    analyze_file
+
+    Args:
+        filepaths: A list of strings representing the paths to the files
+
+    Returns:
+        A list of summary rows, in the order of filepaths
+    """
+    return [analyze_file(filepath) for filepath in filepaths]
+
+
+def analyze_directory(directory="data", processes=None, chunk_size=4):
+    """
+    Works out the lowlights of every player in a directory. Files are handed
+    to the worker processes in chunks, and only two chunks per worker are
+    submitted at a time, so the pending work and finished rows waiting to
+    be yielded stay bounded however many players there are.
+
+    Args:
+        directory: A string representing the path to the directory
+        processes: An integer representing the number of worker processes,
+            or None to use one per CPU
+        chunk_size: An integer representing how many files are sent to a
+            worker at once
+
+    Returns:
+        A generator of summary rows, see analyze_file, in the order of
+        player_files
+    """
+    filepaths = iter(player_files(directory))
+    if processes == 1:
+        yield from map(analyze_file, filepaths)
+        return
+    processes = processes or os.cpu_count() or 1
+    chunks = iter(lambda: list(islice(filepaths, chunk_size)), [])
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque(
+            executor.submit(analyze_files, chunk)
+            for chunk in islice(chunks, 2 * processes)
+        )
+        while pending:
+            rows = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(executor.submit(analyze_files, chunk))
+            yield from rows
+
+
+def main():
+    """
+    Writes the summary table of a directory from the command line, one row
+    at a time as players finish
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--output", default="summary.csv")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--chunk-size", type=int, default=4)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = 0
+    with open(args.output, "w", newline="", encoding="UTF-8") as file:
+        writer = csv.DictWriter(file, SUMMARY_COLUMNS)
+        writer.writeheader()
+        for row in analyze_directory(args.directory, args.processes, args.chunk_size):
+            writer.writerow(row)
+            file.flush()
+            count += 1
+            if "error" in row:
+                print(f"{row['summoner']}: {row['error']}")
+            else:
+                print(
+                    f"{row['summoner']}: {row['games']} games, "
+                    f"loaded in {row['load_seconds']:.3f}s, "
+                    f"analyzed in {row['analysis_seconds']:.3f}s"
+                )
+    print(
+        f"Analyzed {count} players in {time.perf_counter() - start:.2f}s, "
+        f"saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Pre-renders the backgrounds, remote images and synced champion squares at the
+ui's scale into a sprite atlas, so the ui does not resize them at launch. Run
+`python -m modules.build_atlas --scale 0.7` after `python -m modules.asset_sync`
+"""
+
+import argparse
+import os
+import time
+from PIL import Image
+from modules.atlas import (
+    BACKGROUND_SIZE,
+    BACKGROUNDS,
+    REMOTE_SIZE,
+    SpriteAtlas,
+    atlas_path,
+)
+from modules.image_store import (
+    CHAMP_SIZES,
+    DDRAGON_VERSION,
+    DEFAULT_IMAGE_DIRECTORY,
+    REMOTE_IMAGES,
+    ImageStore,
+    champion_image_path,
+    load_manifest,
+)
+
+
+def synced_champions(version=DDRAGON_VERSION, directory=DEFAULT_IMAGE_DIRECTORY):
+    """
+    Finds the champions whose squares are saved for a Data Dragon version
+
+    Args:
+        version: A string representing the Data Dragon version
+        directory: A string representing the image cache directory
+
+    Returns:
+        A sorted list of strings representing the champion names
+    """
+    champion_directory = os.path.dirname(champion_image_path("", version, directory))
+    if not os.path.isdir(champion_directory):
+        return []
+    return sorted(
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(champion_directory)
+        if filename.endswith(".png")
+    )
+
+
+def render_images(store, champions):
+    """
+    Renders every image the atlas holds at the size the ui shows it
+
+    Args:
+        store: An ImageStore object for the version and scale to render
+        champions: A list of strings representing the champions to render
+            every size of
+
+    Returns:
+        A dictionary mapping image names to PIL Images
+    """
+    size = (
+        int(BACKGROUND_SIZE[0] * store.scale),
+        int(BACKGROUND_SIZE[1] * store.scale),
+    )
+    images = {}
+    for name, filepath in BACKGROUNDS.items():
+        with Image.open(filepath) as background:
+            images[name] = background.resize(size)
+    for name in REMOTE_IMAGES:
+        images[name] = store.remote_image(name).resize(REMOTE_SIZE)
+    for champ in champions:
+        for champ_size in CHAMP_SIZES:
+            images[f"{champ}{champ_size}"] = store.champion_image(champ, champ_size)
+    return images
+
+
+def build_atlas(version=DDRAGON_VERSION, scale=1, directory=DEFAULT_IMAGE_DIRECTORY):
+    """
+    Builds and saves the atlas of a Data Dragon version and ui scale, holding
+    every champion synced for the version
+
+    Args:
+        version: A string representing the Data Dragon version
+        scale: A float representing the ui scale
+        directory: A string representing the image cache directory
+
+    Returns:
+        A SpriteAtlas object
+    """
+    store = ImageStore(version, directory, scale)
+    atlas = SpriteAtlas.from_images(
+        render_images(store, synced_champions(version, directory))
+    )
+    atlas.save(atlas_path(version, scale, directory))
+    return atlas
+
+
+def main():
+    """
+    Builds the atlas from the command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--version", help="defaults to the last synced version")
+    parser.add_argument("--scale", type=float, default=0.7)
+    parser.add_argument("--directory", default=DEFAULT_IMAGE_DIRECTORY)
+    args = parser.parse_args()
+
+    version = args.version
+    if version is None:
+        manifest = load_manifest(args.directory)
+        version = DDRAGON_VERSION if manifest is None else manifest["version"]
+    start = time.perf_counter()
+    atlas = build_atlas(version, args.scale, args.directory)
+    height, width, _ = atlas.pixels.shape
+    print(
+        f"Built a {width}x{height} atlas of {len(atlas)} images in "
+        f"{time.perf_counter() - start:.1f}s, saved to "
+        f"{atlas_path(version, args.scale, args.directory)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Ranks a player's lowlights against every other scraped player. Run
+`python -m modules.cohort` to build the cohort from the files in data/
+"""
+
+import argparse
+import os
+import numpy as np
+from modules.analysis import compute_report
+from modules.storage import FILE_FORMATS, load_analysis_data
+
+DEFAULT_COHORT_PATH = "data/cohort.npz"
+
+# Whether a higher value of each lowlight is worse, like more deaths, or a
+# lower value is, like a lower cs/m
+HIGHER_IS_WORSE = {
+    "most_deaths": True,
+    "least_cs": False,
+    "worst_winrate": False,
+    "worst_kda": False,
+    "worst_vs": False,
+    "loss_streak": True,
+    "rolling_kda": False,
+}
+
+
+def report_metrics(report):
+    """
+    Turns a player's lowlights into one number per lowlight. The lists of
+    champions are summed up by their worst champion.
+
+    Args:
+        report: A WrappedReport holding a player's lowlights
+
+    Returns:
+        A dictionary mapping each lowlight in HIGHER_IS_WORSE to a float,
+        which is nan if the player has no games it applies to
+    """
+    worst_winrate = report.worst_winrate
+    worst_kda = report.worst_kda
+    return {
+        "most_deaths": float(report.most_deaths[0]),
+        "least_cs": float(report.least_cs[0]),
+        "worst_winrate": worst_winrate[0]["winrate"] if worst_winrate else np.nan,
+        "worst_kda": worst_kda[0]["kda"] if worst_kda else np.nan,
+        "worst_vs": float(report.worst_vs[0]),
+        "loss_streak": float(report.loss_streak[0]),
+        "rolling_kda": float(report.rolling_kda[0]),
+    }
+
+
+def player_files(directory="data"):
+    """
+    Finds each summoner's data file in a directory. If a summoner has been
+    saved in several formats, the columnar file is used.
+
+    Args:
+        directory: A string representing the path to the directory
+
+    Returns:
+        A list of strings representing the paths to the files, sorted by
+        summoner name
+    """
+    files = {}
+    for filename in sorted(os.listdir(directory)):
+        summoner_name, extension = os.path.splitext(filename)
+        file_format = extension[1:]
+        if file_format not in FILE_FORMATS:
+            continue
+        current = files.get(summoner_name)
+        if current is None or FILE_FORMATS.index(file_format) > FILE_FORMATS.index(
+            os.path.splitext(current)[1][1:]
+        ):
+            files[summoner_name] = filename
+    return [os.path.join(directory, files[name]) for name in sorted(files)]
+
+
+class Cohort:
+    """
+    Sorted distributions of every lowlight across a cohort of players. The
+    cohort only holds one number per player for each lowlight, so it can be
+    built from hundreds of thousands of players one file at a time, and each
+    percentile is found with a binary search.
+
+    Attributes
+    ----------
+    size : int
+        number of players added to the cohort
+    """
+
+    def __init__(self, distributions=None, size=0):
+        self.size = size
+        self._values = {metric: [] for metric in HIGHER_IS_WORSE}
+        self._sorted = {}
+        if distributions is not None:
+            self._sorted = {
+                metric: np.sort(np.asarray(distributions[metric], dtype=float))
+                for metric in HIGHER_IS_WORSE
+                if metric in distributions
+            }
+
+    def add_report(self, report):
+        """
+        Adds a player to the cohort
+
+        Args:
+            report: A WrappedReport holding the player's lowlights
+        """
+        for metric, value in report_metrics(report).items():
+            if not np.isnan(value):
+                self._values[metric].append(value)
+        self.size += 1
+
+    def distribution(self, metric):
+        """
+        Finds the sorted values of a lowlight across the cohort
+
+        Args:
+            metric: A string representing a lowlight in HIGHER_IS_WORSE
+
+        Returns:
+            A sorted array of floats, leaving out players the lowlight does
+            not apply to
+        """
+        if self._values[metric]:
+            merged = np.concatenate(
+                [self._sorted.get(metric, np.empty(0)), self._values[metric]]
+            )
+            self._sorted[metric] = np.sort(merged)
+            self._values[metric] = []
+        return self._sorted.get(metric, np.empty(0))
+
+    def bottom_percent(self, metric, value):
+        """
+        Finds what percent of the cohort did at least as badly as a value
+
+        Args:
+            metric: A string representing a lowlight in HIGHER_IS_WORSE
+            value: A float representing a player's value of the lowlight
+
+        Returns:
+            A float between 0 and 100, so a player is in the bottom X% of the
+            cohort, or nan if the cohort has no values for the lowlight
+        """
+        values = self.distribution(metric)
+        if len(values) == 0 or np.isnan(value):
+            return np.nan
+        if HIGHER_IS_WORSE[metric]:
+            at_least_as_bad = len(values) - np.searchsorted(values, value, "left")
+        else:
+            at_least_as_bad = np.searchsorted(values, value, "right")
+        return float(100 * at_least_as_bad / len(values))
+
+    def rank(self, report):
+        """
+        Finds where each of a player's lowlights falls in the cohort
+
+        Args:
+            report: A WrappedReport holding the player's lowlights
+
+        Returns:
+            A dictionary mapping each lowlight to the player's bottom percent,
+            see bottom_percent
+        """
+        return {
+            metric: self.bottom_percent(metric, value)
+            for metric, value in report_metrics(report).items()
+        }
+
+    def save(self, filepath=DEFAULT_COHORT_PATH):
+        """
+        Saves the sorted distributions to a .npz file
+
+        Args:
+            filepath: A string representing the path to the file
+        """
+        np.savez(
+            filepath,
+            size=self.size,
+            **{metric: self.distribution(metric) for metric in HIGHER_IS_WORSE},
+        )
+
+    @classmethod
+    def load(cls, filepath=DEFAULT_COHORT_PATH):
+        """
+        Loads a cohort saved by save
+
+        Args:
+            filepath: A string representing the path to the .npz file
+
+        Returns:
+            A Cohort object
+        """
+        with np.load(filepath) as saved:
+            return cls(saved, int(saved["size"]))
+
+    @classmethod
+    def from_directory(cls, directory="data"):
+        """
+        Builds a cohort from every player's data file in a directory. Files
+        are loaded one at a time with load_analysis_data.
+
+        Args:
+            directory: A string representing the path to the directory
+
+        Returns:
+            A Cohort object
+        """
+        cohort = cls()
+        for filepath in player_files(directory):
+            cohort.add_report(compute_report(load_analysis_data(filepath)))
+        return cohort
+
+
+def main():
+    """
+    Builds and saves a cohort from the command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--output", default=DEFAULT_COHORT_PATH)
+    args = parser.parse_args()
+
+    cohort = Cohort.from_directory(args.directory)
+    cohort.save(args.output)
+    print(f"Saved a cohort of {cohort.size} players to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
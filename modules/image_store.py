@@ -0,0 +1,291 @@
+"""
+Lazily loaded champion images, cached on disk by Data Dragon version
+"""
+
+import json
+import os
+from PIL import Image
+import requests
+from modules.atlas import BACKGROUND_SIZE, BACKGROUNDS, SpriteAtlas, atlas_path
+
+DDRAGON_URL = "http://ddragon.leagueoflegends.com/cdn"
+DDRAGON_VERSION = "13.6.1"
+DEFAULT_IMAGE_DIRECTORY = "data/images"
+
+# Name of the file, in the image cache directory, recording what has been
+# downloaded by modules/asset_sync.py
+MANIFEST_NAME = "manifest.json"
+
+# Images the ui shows that are not from Data Dragon, by name
+# pylint: disable=line-too-long
+REMOTE_IMAGES = {
+    "poros": "https://nexus.leagueoflegends.com/wp-content/uploads/2018/11/poros_banner-1_slno1owbdsxulmdvqomp.jpg",
+    "splash": "https://cdn1.epicgames.com/offer/24b9b5e323bc40eea252a10cdd3b2f10/LOL_2560x1440-98749e0d718e82d27a084941939bc9d3",
+}
+# pylint: enable=line-too-long
+
+# Side length in pixels of each size of champion square, before scaling,
+# keyed by the digit ending its name in the images lookup
+CHAMP_SIZES = {4: 405, 3: 400, 2: 200, 1: 167}
+
+
+def champion_image_path(
+    champ, version=DDRAGON_VERSION, directory=DEFAULT_IMAGE_DIRECTORY
+):
+    """
+    Finds where a champion's square is saved
+
+    Args:
+        champ: A string representing the champion name, as in championName
+        version: A string representing the Data Dragon version
+        directory: A string representing the image cache directory
+
+    Returns:
+        A string representing the path to the .png file
+    """
+    return os.path.join(directory, version, "champion", f"{champ}.png")
+
+
+def champion_image_url(champ, version=DDRAGON_VERSION, base_url=DDRAGON_URL):
+    """
+    Finds the Data Dragon URL of a champion's square
+
+    Args:
+        champ: A string representing the champion name, as in championName
+        version: A string representing the Data Dragon version
+        base_url: A string representing the URL of the Data Dragon CDN
+
+    Returns:
+        A string representing the URL
+    """
+    return f"{base_url}/{version}/img/champion/{champ}.png"
+
+
+def remote_image_path(name, directory=DEFAULT_IMAGE_DIRECTORY):
+    """
+    Finds where one of REMOTE_IMAGES is saved
+
+    Args:
+        name: A string representing the name of the image in REMOTE_IMAGES
+        directory: A string representing the image cache directory
+
+    Returns:
+        A string representing the path to the file
+    """
+    return os.path.join(directory, "remote", name)
+
+
+def load_manifest(directory=DEFAULT_IMAGE_DIRECTORY):
+    """
+    Loads the manifest written by modules/asset_sync.py
+
+    Args:
+        directory: A string representing the image cache directory
+
+    Returns:
+        A dictionary holding the synced Data Dragon version and an entry for
+        each downloaded image, or None if nothing has been synced
+    """
+    try:
+        with open(
+            os.path.join(directory, MANIFEST_NAME), "r", encoding="UTF-8"
+        ) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def write_file_atomic(filepath, content):
+    """
+    Writes bytes to a file through a temporary file, so a crash never
+    leaves half a file behind
+
+    Args:
+        filepath: A string representing the path to the file
+        content: The bytes to write
+    """
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+    os.replace(temp_path, filepath)
+
+
+class ImageStore:
+    """
+    The images the ui shows, looked up by name. Backgrounds and other fixed
+    images are stored as they are given and looked up like a dictionary.
+    Champion squares are named by champion and size, like `Ashe3`, and are
+    only downloaded and resized when a slide is rendered with them, by
+    pil_image. Downloads are kept on disk by Data Dragon version.
+
+    Attributes
+    ----------
+    version : str
+        Data Dragon version the champion squares come from
+    directory : str
+        path to the image cache directory
+    scale : float
+        factor every champion square size is multiplied by
+    atlas : SpriteAtlas
+        images pre-rendered for this version and scale, used instead of
+        resizing them, or None if the atlas has not been built
+    """
+
+    def __init__(
+        self,
+        version=DDRAGON_VERSION,
+        directory=DEFAULT_IMAGE_DIRECTORY,
+        scale=1,
+        session=None,
+        atlas=None,
+    ):
+        self.version = version
+        self.directory = directory
+        self.scale = scale
+        self.atlas = atlas
+        self._session = session if session is not None else requests.Session()
+        self._fixed = {}
+
+    @classmethod
+    def from_manifest(cls, directory=DEFAULT_IMAGE_DIRECTORY, **kwargs):
+        """
+        Makes an ImageStore for the Data Dragon version last synced by
+        modules/asset_sync.py, or DDRAGON_VERSION if nothing has been synced,
+        using the atlas built by modules/build_atlas.py if there is one
+
+        Args:
+            directory: A string representing the image cache directory
+            kwargs: Other arguments of ImageStore
+
+        Returns:
+            An ImageStore object
+        """
+        manifest = load_manifest(directory)
+        version = DDRAGON_VERSION if manifest is None else manifest["version"]
+        if "atlas" not in kwargs:
+            kwargs["atlas"] = SpriteAtlas.load(
+                atlas_path(version, kwargs.get("scale", 1), directory)
+            )
+        return cls(version, directory, **kwargs)
+
+    def __setitem__(self, name, image):
+        self._fixed[name] = image
+
+    def __getitem__(self, name):
+        return self._fixed[name]
+
+    def __contains__(self, name):
+        return name in self._fixed
+
+    def __len__(self):
+        return len(self._fixed)
+
+    @staticmethod
+    def _parse_name(name):
+        """
+        Splits the name of a champion square into the champion and size,
+        raising a KeyError if it is not one
+        """
+        size = name[-1:]
+        if len(name) < 2 or not size.isdigit() or int(size) not in CHAMP_SIZES:
+            raise KeyError(name)
+        return name[:-1], int(size)
+
+    def prerendered(self, name):
+        """
+        Slices an image out of the atlas
+
+        Args:
+            name: A string representing the image name
+
+        Returns:
+            A PIL Image, or None if there is no atlas or it does not have the
+            image
+        """
+        if self.atlas is None or name not in self.atlas:
+            return None
+        return self.atlas.image(name)
+
+    def pil_image(self, name):
+        """
+        Loads a background or champion square at the size the ui shows it,
+        without converting it, from the atlas if it has it
+
+        Args:
+            name: A string representing the image name, a key of BACKGROUNDS
+                or a champion square name like `Ashe3`
+
+        Returns:
+            A PIL Image
+        """
+        image = self.prerendered(name)
+        if image is not None:
+            return image
+        if name in BACKGROUNDS:
+            size = (
+                int(BACKGROUND_SIZE[0] * self.scale),
+                int(BACKGROUND_SIZE[1] * self.scale),
+            )
+            with Image.open(BACKGROUNDS[name]) as background:
+                return background.resize(size)
+        return self.champion_image(*self._parse_name(name))
+
+    def champion_path(self, champ):
+        """
+        Finds a champion's square on disk, downloading it if it is missing
+
+        Args:
+            champ: A string representing the champion name
+
+        Returns:
+            A string representing the path to the .png file
+        """
+        filepath = champion_image_path(champ, self.version, self.directory)
+        if not os.path.exists(filepath):
+            self._download(champion_image_url(champ, self.version), filepath, champ)
+        return filepath
+
+    def _download(self, url, filepath, name):
+        """
+        Downloads a file into the image cache, raising a KeyError if it does
+        not exist
+        """
+        response = self._session.get(url, timeout=30)
+        if response.status_code == 404:
+            raise KeyError(name)
+        response.raise_for_status()
+        write_file_atomic(filepath, response.content)
+
+    def remote_image(self, name):
+        """
+        Loads one of REMOTE_IMAGES, from the image cache if it has been
+        downloaded before
+
+        Args:
+            name: A string representing the name of the image in
+                REMOTE_IMAGES
+
+        Returns:
+            A PIL Image
+        """
+        filepath = remote_image_path(name, self.directory)
+        if not os.path.exists(filepath):
+            self._download(REMOTE_IMAGES[name], filepath, name)
+        with Image.open(filepath) as image:
+            return image.copy()
+
+    def champion_image(self, champ, size):
+        """
+        Loads a champion's square resized for the ui, without converting it
+
+        Args:
+            champ: A string representing the champion name
+            size: An integer representing the size, one of CHAMP_SIZES
+
+        Returns:
+            A PIL Image
+        """
+        side = int(CHAMP_SIZES[size] * self.scale)
+        with Image.open(self.champion_path(champ)) as champ_img:
+            return champ_img.resize((side, side))
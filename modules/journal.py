@@ -0,0 +1,147 @@
+"""
+An append-only journal of scraped rows used to checkpoint long scrapes
+"""
+
+import json
+import os
+
+KEPT = "kept"
+SKIPPED = "skipped"
+
+
+class ScrapeJournal:
+    """
+    A JSON Lines file that gets one line appended for every fetched match,
+    recording whether it was kept or skipped and why. Appending a line is
+    cheap no matter how many matches have been scraped, and every line is
+    flushed so a crash loses at most the match in progress. Opening an
+    existing journal appends to it, so an interrupted scrape can carry on.
+
+    Attributes
+    ----------
+    path : str
+        path to the .jsonl journal file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            _drop_partial_line(path)
+        # pylint: disable=consider-using-with
+        self._file = open(path, "a", encoding="UTF-8")
+
+    def record(self, match_id, status, reason=None, row=None):
+        """
+        Appends the outcome of fetching a match to the journal
+
+        Args:
+            match_id: A string representing the match id
+            status: A string representing what happened to the match, either
+                KEPT or SKIPPED
+            reason: A string representing why the match was skipped, or None
+            row: A dictionary holding the player's stats from the match if it
+                was kept, or None
+        """
+        entry = {"match_id": match_id, "status": status}
+        if reason is not None:
+            entry["reason"] = reason
+        if row is not None:
+            entry["row"] = row
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """
+        Closes the journal file
+        """
+        self._file.close()
+
+    def remove(self):
+        """
+        Closes and deletes the journal file once its rows have been compacted
+        """
+        self.close()
+        os.remove(self.path)
+
+
+def _drop_partial_line(path):
+    """
+    Truncates a journal file after its last complete line, so a line cut off
+    by a crash does not corrupt the next line appended
+
+    Args:
+        path: A string representing the path to the .jsonl journal file
+    """
+    with open(path, "rb+") as file:
+        data = file.read()
+        if data and not data.endswith(b"\n"):
+            file.truncate(data.rfind(b"\n") + 1)
+
+
+def read_journal(path):
+    """
+    Reads every complete entry from a journal file. A partly written last
+    line, left by a crash mid-write, is ignored.
+
+    Args:
+        path: A string representing the path to the .jsonl journal file
+
+    Returns:
+        A list of dictionaries holding each entry in the order written
+    """
+    entries = []
+    with open(path, "r", encoding="UTF-8") as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return entries
+
+
+def read_skipped(path):
+    """
+    Reads the matches finished scrapes have skipped, saved by write_skipped
+
+    Args:
+        path: A string representing the path to the .json file
+
+    Returns:
+        A dictionary mapping each skipped match id to why it was skipped,
+        empty if nothing has been saved yet
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="UTF-8") as file:
+        return json.load(file)
+
+
+def write_skipped(skipped, path):
+    """
+    Saves the matches a scrape skipped, so later scrapes and refreshes do
+    not fetch them again. Finished matches never change, so a skipped match
+    stays skipped.
+
+    Args:
+        skipped: A dictionary mapping each skipped match id to why it was
+            skipped
+        path: A string representing the path to the .json file
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="UTF-8") as file:
+        json.dump(skipped, file)
+    os.replace(temp_path, path)
+
+
+def write_csv_atomic(player_stats, filepath):
+    """
+    Writes a DataFrame to a .csv file by writing a temporary file and renaming
+    it, so the .csv file is never left half written
+
+    Args:
+        player_stats: A DataFrame to write
+        filepath: A string representing the path to the .csv file
+    """
+    temp_path = f"{filepath}.tmp"
+    player_stats.to_csv(temp_path)
+    os.replace(temp_path, filepath)
@@ -0,0 +1,224 @@
+"""
+Spreads scraping across several API keys and regions, each with its own
+rate limits
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from riotwatcher import LolWatcher
+from riotwatcher.Handlers import RequestHandler
+from modules.rate_limit import APP_LIMITS, ROUTING, RateLimiter
+from modules.scraper import refresh_player_data
+
+# Methods that are sent to a regional routing value instead of a platform
+REGIONAL_METHODS = {"by_id", "matchlist_by_puuid", "timeline_by_match"}
+
+
+def get_routing_value(method, region):
+    """
+    Finds which routing value, and so which rate limits, a request counts
+    towards
+
+    Args:
+        method: A string representing the name of the API method
+        region: A string representing the platform of the request
+
+    Returns:
+        A string representing the platform or regional routing value
+    """
+    region = region.lower()
+    if method in REGIONAL_METHODS:
+        return ROUTING.get(region, region)
+    return region
+
+
+class RoutedRateLimiter:
+    """
+    Keeps a separate RateLimiter for every routing value a key sends requests
+    to, since Riot counts each key's requests separately per routing value.
+    It can be used anywhere a RateLimiter is passed to the scraper.
+
+    Attributes
+    ----------
+    limiters : dict
+        RateLimiter objects keyed by routing value
+    """
+
+    def __init__(self, app_limits=APP_LIMITS, method_limits=None):
+        self.limiters = {}
+        self._app_limits = app_limits
+        self._method_limits = method_limits
+        self._lock = threading.Lock()
+
+    def limiter(self, routing_value):
+        """
+        Finds the RateLimiter for a routing value, making it if needed
+
+        Args:
+            routing_value: A string representing a platform or regional
+                routing value
+
+        Returns:
+            A RateLimiter object
+        """
+        with self._lock:
+            if routing_value not in self.limiters:
+                self.limiters[routing_value] = RateLimiter(
+                    self._app_limits, self._method_limits
+                )
+            return self.limiters[routing_value]
+
+    def call(self, method, func, *args, **kwargs):
+        """
+        Calls an API method through the RateLimiter of the routing value it
+        is sent to, see RateLimiter.call
+
+        Args:
+            method: A string representing the name of the API method
+            func: The LolWatcher method to call, taking the region as its
+                first argument or as the region keyword argument
+            *args: Positional arguments passed on to func
+            **kwargs: Keyword arguments passed on to func
+
+        Returns:
+            The value returned by func
+        """
+        region = kwargs["region"] if "region" in kwargs else args[0]
+        return self.limiter(get_routing_value(method, region)).call(
+            method, func, *args, **kwargs
+        )
+
+    def stats(self):
+        """
+        Summarizes how each routing value's RateLimiter has performed
+
+        Returns:
+            A dictionary mapping routing values to RateLimiter.stats()
+        """
+        with self._lock:
+            limiters = dict(self.limiters)
+        return {
+            routing_value: limiter.stats()
+            for routing_value, limiter in limiters.items()
+        }
+
+
+class _RoutedHeaderHandler(RequestHandler):
+    """
+    A LolWatcher request handler that passes the rate limit headers of every
+    response to the RateLimiter of the routing value it came from.
+    """
+
+    def __init__(self, routed_limiter):
+        super().__init__()
+        self.routed_limiter = routed_limiter
+
+    def after_request(self, region, endpoint_name, method_name, url, response):
+        """
+        Updates the routing value's rate limiter from a response's headers
+        """
+        self.routed_limiter.limiter(region.lower()).update_from_headers(
+            method_name, response.headers
+        )
+
+
+class KeyPool:
+    """
+    A pool of API keys that summoners are spread across. Riot encrypts
+    puuids separately for every key, so all of a summoner's requests are
+    sent with the same key; summoners are assigned to whichever key has the
+    fewest summoners in their region.
+
+    Attributes
+    ----------
+    watchers : list
+        a LolWatcher object for each key
+    rate_limiters : list
+        a RoutedRateLimiter object for each key
+    """
+
+    def __init__(self, api_keys, app_limits=APP_LIMITS, method_limits=None):
+        self.watchers = []
+        self.rate_limiters = []
+        for api_key in api_keys:
+            watcher = LolWatcher(api_key)
+            rate_limiter = RoutedRateLimiter(app_limits, method_limits)
+            # pylint: disable=protected-access
+            watcher._base_api._request_handlers.append(
+                _RoutedHeaderHandler(rate_limiter)
+            )
+            self.watchers.append(watcher)
+            self.rate_limiters.append(rate_limiter)
+        self._assigned = {}
+        self._lock = threading.Lock()
+
+    def assign(self, region):
+        """
+        Picks the key that a new summoner from a region should use
+
+        Args:
+            region: A string representing the platform of the summoner
+
+        Returns:
+            A tuple holding the LolWatcher and RoutedRateLimiter of the key
+        """
+        with self._lock:
+            counts = [
+                self._assigned.get((idx, ROUTING.get(region.lower())), 0)
+                for idx in range(len(self.watchers))
+            ]
+            idx = counts.index(min(counts))
+            key = (idx, ROUTING.get(region.lower()))
+            self._assigned[key] = self._assigned.get(key, 0) + 1
+        return (self.watchers[idx], self.rate_limiters[idx])
+
+
+def create_key_pool(filepath="keys.txt"):
+    """
+    Creates a KeyPool using API keys from a file
+
+    Args:
+        filepath: A string representing the filepath to a .txt file with one
+            key per line
+
+    Returns:
+        A KeyPool object using the keys in the file
+    """
+    with open(filepath, "r", encoding="UTF-8") as file:
+        api_keys = [line.strip() for line in file if line.strip()]
+    return KeyPool(api_keys)
+
+
+def scrape_summoners(key_pool, summoners, parallel=8, max_workers=2, cache=None):
+    """
+    Brings many summoners' data up to date at once, spreading them across
+    the keys in a pool. Summoners on different keys or routing values do not
+    wait on each other's rate limits.
+
+    Args:
+        key_pool: A KeyPool object holding the API keys to use
+        summoners: A list of (summoner name, region) tuples
+        parallel: An integer representing the most summoners scraped at once
+        max_workers: An integer representing the most match requests in
+            flight at once for each summoner
+        cache: A MatchCache object shared by every summoner, or None
+
+    Returns:
+        A dictionary mapping each (summoner name, region) tuple to a
+        DataFrame holding the summoner's season data
+    """
+
+    def scrape(summoner):
+        summoner_name, region = summoner
+        watcher, rate_limiter = key_pool.assign(region)
+        return refresh_player_data(
+            watcher,
+            summoner_name,
+            region,
+            max_workers=max_workers,
+            rate_limiter=rate_limiter,
+            cache=cache,
+        )
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return dict(zip(summoners, executor.map(scrape, summoners)))
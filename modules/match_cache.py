@@ -0,0 +1,163 @@
+"""
+A persistent on-disk store of matches downloaded from the Riot API
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = "data/match_cache.sqlite"
+
+
+class MatchCache:
+    """
+    A SQLite store of zlib-compressed match JSON keyed by match id. Finished
+    matches never change, so a cached match can be reused by every summoner
+    who played in it.
+
+    Attributes
+    ----------
+    path : str
+        path to the SQLite database file
+    max_entries : int
+        most matches kept before the least recently used are evicted, or None
+        for no limit
+    max_age : float
+        seconds a match is kept after it was stored, or None for no limit
+    hits : int
+        number of lookups that found a match in the cache
+    misses : int
+        number of lookups that did not find a match in the cache
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=None, max_age=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            "match_id TEXT PRIMARY KEY, "
+            "data BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, "
+            "used_at REAL NOT NULL)"
+        )
+        # Eviction finds the least recently used matches through this index,
+        # instead of sorting the whole table
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS matches_used_at ON matches (used_at)"
+        )
+        self._connection.commit()
+        self._count = 0
+        self.evict()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM matches").fetchone()[
+                0
+            ]
+
+    def __contains__(self, match_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, match_id):
+        """
+        Looks up a match in the cache
+
+        Args:
+            match_id: A string representing the match id
+
+        Returns:
+            A dictionary holding the match, or None if it is not cached
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, stored_at FROM matches WHERE match_id = ?",
+                (match_id,),
+            ).fetchone()
+            if row is None or (
+                self.max_age is not None and now - row[1] > self.max_age
+            ):
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE matches SET used_at = ? WHERE match_id = ?", (now, match_id)
+            )
+            self._connection.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, match_id, match):
+        """
+        Stores a match in the cache, evicting the least recently used matches
+        if that puts the cache over its size limit
+
+        Args:
+            match_id: A string representing the match id
+            match: A dictionary holding the match as returned by the API
+        """
+        data = zlib.compress(json.dumps(match, separators=(",", ":")).encode())
+        now = time.time()
+        with self._lock:
+            inserted = self._connection.execute(
+                "INSERT OR IGNORE INTO matches VALUES (?, ?, ?, ?)",
+                (match_id, data, now, now),
+            ).rowcount
+            if inserted:
+                self._count += 1
+            else:
+                self._connection.execute(
+                    "UPDATE matches SET data = ?, stored_at = ?, used_at = ? "
+                    "WHERE match_id = ?",
+                    (data, now, now, match_id),
+                )
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict_least_recently_used()
+            self._connection.commit()
+
+    def _evict_least_recently_used(self):
+        """
+        Removes the least recently used matches beyond max_entries, which
+        must be called holding the lock
+        """
+        self._connection.execute(
+            "DELETE FROM matches WHERE match_id IN ("
+            "SELECT match_id FROM matches ORDER BY used_at LIMIT ?)",
+            (self._count - self.max_entries,),
+        )
+        self._count = self.max_entries
+
+    def evict(self):
+        """
+        Removes matches older than max_age and the least recently used
+        matches beyond max_entries
+        """
+        with self._lock:
+            if self.max_age is not None:
+                self._connection.execute(
+                    "DELETE FROM matches WHERE stored_at < ?",
+                    (time.time() - self.max_age,),
+                )
+            # Counted again here, in case another connection changed the file
+            self._count = self._connection.execute(
+                "SELECT COUNT(*) FROM matches"
+            ).fetchone()[0]
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict_least_recently_used()
+            self._connection.commit()
+
+    def close(self):
+        """
+        Closes the connection to the database file
+        """
+        self._connection.close()
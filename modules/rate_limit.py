@@ -0,0 +1,389 @@
+"""
+Functions and classes for keeping requests within the Riot API rate limits
+"""
+
+from collections import deque
+import threading
+import time
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError, Timeout
+from riotwatcher.Handlers import RequestHandler
+
+# Limits are (number of requests, window in seconds). These are the limits
+# given to a personal development key.
+APP_LIMITS = ((20, 1), (100, 120))
+
+# Method limits for the match-v5 and summoner-v4 methods used by the scraper
+METHOD_LIMITS = {
+    "by_name": ((1600, 60),),
+    "by_id": ((2000, 10),),
+    "matchlist_by_puuid": ((2000, 10),),
+}
+
+# Regional routing values used by match-v5 for each platform. Limits are
+# counted separately for every platform and regional routing value.
+ROUTING = {
+    "br1": "americas",
+    "la1": "americas",
+    "la2": "americas",
+    "na1": "americas",
+    "oc1": "sea",
+    "eun1": "europe",
+    "euw1": "europe",
+    "ru": "europe",
+    "tr1": "europe",
+    "jp1": "asia",
+    "kr": "asia",
+}
+
+# Longest wait between retries when backing off exponentially
+MAX_BACKOFF = 60
+
+
+class TokenBucket:
+    """
+    A bucket holding `limit` tokens, where each spent token is returned to
+    the bucket `window` seconds after it was spent. This matches the way the
+    Riot API counts requests, so a full bucket can never cause a 429.
+
+    Attributes
+    ----------
+    limit : int
+        number of requests allowed in one window
+    window : float
+        length of the window in seconds
+    """
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._spent = deque()
+
+    def wait_time(self, now):
+        """
+        Finds how long until a token is available
+
+        Args:
+            now: A float representing the current monotonic time
+
+        Returns:
+            A float representing the number of seconds to wait, 0 if a token
+            is available now
+        """
+        while self._spent and self._spent[0] <= now - self.window:
+            self._spent.popleft()
+        if len(self._spent) < self.limit:
+            return 0.0
+        return self._spent[0] + self.window - now
+
+    def spend(self, now):
+        """
+        Takes one token from the bucket
+
+        Args:
+            now: A float representing the current monotonic time
+        """
+        self._spent.append(now)
+
+    def sync(self, count, now):
+        """
+        Takes tokens from the bucket until it has spent at least as many as
+        the API has counted, so requests made elsewhere with the same key are
+        accounted for
+
+        Args:
+            count: An integer representing the number of requests the API has
+                counted in the current window
+            now: A float representing the current monotonic time
+        """
+        self.wait_time(now)
+        while len(self._spent) < min(count, self.limit):
+            self._spent.append(now)
+
+
+def parse_rate_limit_header(value):
+    """
+    Parses a Riot rate limit header such as "20:1,100:120"
+
+    Args:
+        value: A string holding comma separated "count:seconds" pairs
+
+    Returns:
+        A list of (count, seconds) tuples, with the count an integer and the
+        seconds a float, since the local stand-in can use windows shorter
+        than a second
+    """
+    pairs = []
+    for pair in value.split(","):
+        count, window = pair.split(":")
+        pairs.append((int(count), float(window)))
+    return pairs
+
+
+class RateLimiter:
+    """
+    A thread-safe scheduler that blocks until a request fits within both the
+    application limits and the limits of the method being called. It adapts
+    to the limits and counts the API reports in its response headers, backs
+    off after 429s and server errors, and keeps counters of its own
+    throughput.
+
+    Attributes
+    ----------
+    app_buckets : list
+        TokenBucket objects shared by every request
+    method_buckets : dict
+        lists of TokenBucket objects keyed by method name
+    margin : float
+        extra seconds added to every window, since Riot starts counting a
+        window when the first request arrives rather than when it is sent
+    max_retries : int
+        most times a failed request is retried before its error is raised
+    requests : int
+        number of requests allowed through, including retries
+    retries : int
+        number of requests that were retried
+    throttled_time : float
+        total seconds callers have spent blocked waiting for a request
+    """
+
+    def __init__(
+        self, app_limits=APP_LIMITS, method_limits=None, margin=0.1, max_retries=5
+    ):
+        if method_limits is None:
+            method_limits = METHOD_LIMITS
+        self.margin = margin
+        self.max_retries = max_retries
+        self.app_buckets = self._make_buckets(app_limits)
+        self.method_buckets = {
+            method: self._make_buckets(limits)
+            for method, limits in method_limits.items()
+        }
+        self.requests = 0
+        self.retries = 0
+        self.throttled_time = 0.0
+        self._started = None
+        self._app_blocked_until = 0.0
+        self._method_blocked_until = {}
+        self._lock = threading.Lock()
+
+    def _make_buckets(self, limits):
+        return [TokenBucket(limit, window + self.margin) for limit, window in limits]
+
+    def _wait_time(self, method, now):
+        buckets = self.app_buckets + self.method_buckets.get(method, [])
+        return max(
+            [bucket.wait_time(now) for bucket in buckets]
+            + [
+                self._app_blocked_until - now,
+                self._method_blocked_until.get(method, 0.0) - now,
+            ]
+        )
+
+    def wait_time(self, method=None):
+        """
+        Finds how long a request to the given method would wait if it were
+        made now, without making it
+
+        Args:
+            method: A string representing the name of the API method
+
+        Returns:
+            A float representing the number of seconds to wait, 0 if the
+            request would be allowed now
+        """
+        with self._lock:
+            return max(self._wait_time(method, time.monotonic()), 0.0)
+
+    def acquire(self, method=None, stop=None):
+        """
+        Blocks until a request to the given method is allowed, then records
+        the request against every bucket it counts towards.
+
+        Args:
+            method: A string representing the name of the API method being
+                called, or None to only apply the application limits
+            stop: A threading.Event that ends the wait early once it is set,
+                or None
+
+        Returns:
+            True if the request is allowed, or False if stop was set
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._wait_time(method, now)
+                if wait <= 0:
+                    for bucket in self.app_buckets + self.method_buckets.get(
+                        method, []
+                    ):
+                        bucket.spend(now)
+                    self.requests += 1
+                    if self._started is None:
+                        self._started = now
+                    return True
+                self.throttled_time += wait
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+    def block(self, seconds, method=None):
+        """
+        Stops requests from being allowed for a number of seconds
+
+        Args:
+            seconds: A float representing how long to block requests
+            method: A string representing the name of the API method to
+                block, or None to block every request
+        """
+        with self._lock:
+            until = time.monotonic() + seconds
+            if method is None:
+                self._app_blocked_until = max(self._app_blocked_until, until)
+            else:
+                self._method_blocked_until[method] = max(
+                    self._method_blocked_until.get(method, 0.0), until
+                )
+
+    def update_from_headers(self, method, headers):
+        """
+        Adapts the buckets to the limits and counts reported by the API. If
+        the key's limits differ from the configured ones, the buckets are
+        replaced, and if the API has counted more requests than the buckets
+        have, the buckets catch up so the limiter slows down before a 429.
+
+        Args:
+            method: A string representing the name of the API method called
+            headers: A dictionary-like object holding the response headers
+        """
+        for limit_header, count_header, key in (
+            ("X-App-Rate-Limit", "X-App-Rate-Limit-Count", None),
+            ("X-Method-Rate-Limit", "X-Method-Rate-Limit-Count", method),
+        ):
+            if limit_header not in headers or count_header not in headers:
+                continue
+            limits = parse_rate_limit_header(headers[limit_header])
+            counts = {
+                window: count
+                for count, window in parse_rate_limit_header(headers[count_header])
+            }
+            with self._lock:
+                if key is None:
+                    buckets = self.app_buckets
+                else:
+                    buckets = self.method_buckets.get(key, [])
+                if [(bucket.limit, bucket.window) for bucket in buckets] != [
+                    (limit, window + self.margin) for limit, window in limits
+                ]:
+                    buckets = self._make_buckets(limits)
+                    if key is None:
+                        self.app_buckets = buckets
+                    else:
+                        self.method_buckets[key] = buckets
+                now = time.monotonic()
+                for bucket, (_, window) in zip(buckets, limits):
+                    bucket.sync(counts.get(window, 0), now)
+
+    def call(self, method, func, *args, stop=None, **kwargs):
+        """
+        Calls an API method once the rate limits allow it, retrying after
+        429s, server errors and dropped connections. After a 429 the wait
+        comes from the Retry-After header, otherwise it doubles with every
+        retry.
+
+        Args:
+            method: A string representing the name of the API method
+            func: The LolWatcher method to call
+            *args: Positional arguments passed on to func
+            stop: A threading.Event that gives up waiting for the rate
+                limits once it is set, or None
+            **kwargs: Keyword arguments passed on to func
+
+        Returns:
+            The value returned by func, or None if stop was set before it
+            was called
+        """
+        attempt = 0
+        while True:
+            if not self.acquire(method, stop):
+                return None
+            try:
+                return func(*args, **kwargs)
+            except HTTPError as error:
+                response = error.response
+                status = None if response is None else response.status_code
+                if attempt >= self.max_retries or status is None:
+                    raise
+                if status == 429:
+                    self.update_from_headers(method, response.headers)
+                    wait = float(response.headers.get("Retry-After", 2**attempt))
+                    if response.headers.get("X-Rate-Limit-Type") == "method":
+                        self.block(wait, method)
+                    else:
+                        self.block(wait)
+                elif status >= 500:
+                    self.block(min(2**attempt, MAX_BACKOFF), method)
+                else:
+                    raise
+            except (RequestsConnectionError, Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self.block(min(2**attempt, MAX_BACKOFF), method)
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+
+    def stats(self):
+        """
+        Summarizes how the limiter has performed so far
+
+        Returns:
+            A dictionary holding the number of requests and retries, the
+            seconds spent throttled, and the effective requests per second
+        """
+        with self._lock:
+            elapsed = 0.0 if self._started is None else time.monotonic() - self._started
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled_time": self.throttled_time,
+                "requests_per_second": self.requests / elapsed if elapsed else 0.0,
+            }
+
+
+class RateLimitHeaderHandler(RequestHandler):
+    """
+    A LolWatcher request handler that passes the rate limit headers of every
+    response to a RateLimiter.
+
+    Attributes
+    ----------
+    rate_limiter : RateLimiter
+        limiter that is updated from the headers
+    """
+
+    def __init__(self, rate_limiter):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def after_request(self, region, endpoint_name, method_name, url, response):
+        """
+        Updates the rate limiter from the headers of a response
+        """
+        self.rate_limiter.update_from_headers(method_name, response.headers)
+
+
+def attach_rate_limiter(watcher, rate_limiter):
+    """
+    Makes a LolWatcher report the rate limit headers of its responses to a
+    RateLimiter
+
+    Args:
+        watcher: A LolWatcher object
+        rate_limiter: A RateLimiter object to update from the headers
+    """
+    # pylint: disable=protected-access
+    # Handlers see responses in reverse order, so the last handler sees a 429
+    # before the handler that raises it as an HTTPError
+    watcher._base_api._request_handlers.append(RateLimitHeaderHandler(rate_limiter))
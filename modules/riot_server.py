@@ -0,0 +1,482 @@
+"""
+A local stand-in for the Riot API endpoints used by the scraper, for running
+the scraper and its benchmarks without an API key or network access
+"""
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, quote, unquote, urlparse
+import requests
+from riotwatcher import LolWatcher
+from modules.rate_limit import APP_LIMITS, ROUTING
+
+ROUTES = (
+    ("by_name", re.compile(r"^/lol/summoner/v4/summoners/by-name/([^/]+)$")),
+    ("matchlist_by_puuid", re.compile(r"^/lol/match/v5/matches/by-puuid/([^/]+)/ids$")),
+    ("by_id", re.compile(r"^/lol/match/v5/matches/([^/]+)$")),
+)
+
+CHAMPIONS = (
+    "Ashe",
+    "Evelynn",
+    "Garen",
+    "Janna",
+    "Kaisa",
+    "Karma",
+    "Nasus",
+    "Nilah",
+    "Olaf",
+    "Quinn",
+    "Seraphine",
+    "Viego",
+    "Zilean",
+)
+
+POSITIONS = (
+    ("TOP", "SOLO", "TOP"),
+    ("JUNGLE", "NONE", "JUNGLE"),
+    ("MIDDLE", "SOLO", "MIDDLE"),
+    ("BOTTOM", "CARRY", "BOTTOM"),
+    ("UTILITY", "SUPPORT", "BOTTOM"),
+)
+
+
+class FixtureStore:
+    """
+    A directory of recorded API responses, stored as one JSON file per
+    summoner, matchlist and match.
+
+    Attributes
+    ----------
+    directory : str
+        path to the directory holding the fixtures
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, kind, f"{quote(key, safe='')}.json")
+
+    def load(self, kind, key):
+        """
+        Reads a fixture
+
+        Args:
+            kind: A string representing the type of fixture, one of
+                "summoners", "matchlists" or "matches"
+            key: A string representing the summoner name, puuid or match id
+
+        Returns:
+            The decoded JSON fixture, or None if it has not been recorded
+        """
+        try:
+            with open(self._path(kind, key), "r", encoding="UTF-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, kind, key, data):
+        """
+        Writes a fixture, replacing any fixture with the same key
+
+        Args:
+            kind: A string representing the type of fixture, one of
+                "summoners", "matchlists" or "matches"
+            key: A string representing the summoner name, puuid or match id
+            data: The JSON-serializable response to record
+        """
+        path = self._path(kind, key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="UTF-8") as file:
+                json.dump(data, file)
+
+
+class _FixedWindow:
+    """
+    A request counter that resets `window` seconds after the first request
+    it counts, the way the Riot API counts requests.
+    """
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.count = 0
+        self.started = None
+
+    def hit(self, now):
+        """
+        Counts a request, returning the seconds to wait if it is over the limit
+        """
+        if self.started is None or now - self.started >= self.window:
+            self.count = 0
+            self.started = now
+        if self.count >= self.limit:
+            return self.started + self.window - now
+        self.count += 1
+        return 0.0
+
+    def header(self, use_count):
+        """
+        Formats the limit or the current count as a rate limit header value,
+        keeping fractions of a second in windows shorter than the API's
+        """
+        value = self.count if use_count else self.limit
+        return f"{value}:{self.window:g}"
+
+
+class RiotStandIn:
+    """
+    A local HTTP server answering the summoner-v4 and match-v5 requests the
+    scraper makes from a FixtureStore. It can add latency, enforce rate limits
+    with 429 responses and Retry-After headers, and record missing fixtures
+    from the real API.
+
+    Attributes
+    ----------
+    store : FixtureStore
+        fixtures that requests are answered from
+    latency : float
+        seconds added to every response
+    record_key : str
+        API key used to record fixtures that are missing, or None to answer
+        404 for them
+    region : str
+        platform routing value used when recording
+    request_count : int
+        number of requests answered, including 429s
+    throttled_count : int
+        number of requests answered with a 429
+    """
+
+    def __init__(
+        self,
+        store,
+        latency=0.0,
+        app_limits=(),
+        method_limits=None,
+        record_key=None,
+        region="na1",
+        port=0,
+    ):
+        self.store = store
+        self.latency = latency
+        self.record_key = record_key
+        self.region = region
+        self.request_count = 0
+        self.throttled_count = 0
+        self._app_windows = [_FixedWindow(*limit) for limit in app_limits]
+        self._method_windows = {
+            method: [_FixedWindow(*limit) for limit in limits]
+            for method, limits in (method_limits or {}).items()
+        }
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        The root URL of the server, to be used as a LolWatcher kernel_url
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Starts answering requests on a background thread
+
+        Returns:
+            A string representing the root URL of the server
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        """
+        Answers requests on the current thread until interrupted
+        """
+        self._server.serve_forever()
+
+    def stop(self):
+        """
+        Stops the server and frees its port
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def throttle(self, method):
+        """
+        Counts a request against the simulated rate limits
+
+        Args:
+            method: A string representing the name of the API method
+
+        Returns:
+            A tuple holding the seconds to wait (0 if the request is allowed),
+            the type of limit that was hit or None, and a dictionary of rate
+            limit headers
+        """
+        with self._lock:
+            self.request_count += 1
+            now = time.monotonic()
+            method_windows = self._method_windows.get(method, [])
+            wait, limit_type = 0.0, None
+            for windows, name in (
+                (self._app_windows, "application"),
+                (method_windows, "method"),
+            ):
+                for window in windows:
+                    window_wait = window.hit(now)
+                    if window_wait > wait:
+                        wait, limit_type = window_wait, name
+            if wait > 0:
+                self.throttled_count += 1
+            headers = {}
+            if self._app_windows:
+                headers["X-App-Rate-Limit"] = ",".join(
+                    window.header(False) for window in self._app_windows
+                )
+                headers["X-App-Rate-Limit-Count"] = ",".join(
+                    window.header(True) for window in self._app_windows
+                )
+            if method_windows:
+                headers["X-Method-Rate-Limit"] = ",".join(
+                    window.header(False) for window in method_windows
+                )
+                headers["X-Method-Rate-Limit-Count"] = ",".join(
+                    window.header(True) for window in method_windows
+                )
+        return (wait, limit_type, headers)
+
+    def answer(self, method, key, query):
+        """
+        Finds the response body for a request, recording it first if needed
+
+        Args:
+            method: A string representing the name of the API method
+            key: A string representing the summoner name, puuid or match id
+            query: A dictionary of query parameters
+
+        Returns:
+            The decoded JSON response, or None if there is no fixture for it
+        """
+        if method == "by_name":
+            data = self.store.load("summoners", key)
+            if data is None and self.record_key is not None:
+                data = self._record("summoners", key, self.region, f"by-name/{key}")
+            return data
+
+        if method == "by_id":
+            data = self.store.load("matches", key)
+            if data is None and self.record_key is not None:
+                data = self._record(
+                    "matches", key, ROUTING[self.region], f"matches/{key}"
+                )
+            return data
+
+        start = int(query.get("start", ["0"])[0])
+        count = int(query.get("count", ["20"])[0])
+        matchlist = self.store.load("matchlists", key) or []
+        if len(matchlist) < start + count and self.record_key is not None:
+            response = requests.get(
+                f"https://{ROUTING[self.region]}.api.riotgames.com"
+                f"/lol/match/v5/matches/by-puuid/{key}/ids",
+                params={name: values[0] for name, values in query.items()},
+                headers={"X-Riot-Token": self.record_key},
+                timeout=30,
+            )
+            response.raise_for_status()
+            matchlist = matchlist[:start] + response.json()
+            self.store.save("matchlists", key, matchlist)
+        return matchlist[start : start + count]
+
+    def _record(self, kind, key, host, path):
+        api = "summoner/v4/summoners" if kind == "summoners" else "match/v5"
+        response = requests.get(
+            f"https://{host}.api.riotgames.com/lol/{api}/{path}",
+            headers={"X-Riot-Token": self.record_key},
+            timeout=30,
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        self.store.save(kind, key, response.json())
+        return response.json()
+
+
+def _make_handler(stand_in):
+    """
+    Makes a request handler class that answers requests using a RiotStandIn
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        """
+        Answers one HTTP request to the stand-in
+        """
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """
+            Answers a GET request
+            """
+            url = urlparse(self.path)
+            for method, pattern in ROUTES:
+                match = pattern.match(url.path)
+                if match:
+                    break
+            else:
+                self._reply(404, {"status": {"status_code": 404}})
+                return
+
+            time.sleep(stand_in.latency)
+            wait, limit_type, headers = stand_in.throttle(method)
+            if wait > 0:
+                headers["Retry-After"] = str(math.ceil(wait))
+                headers["X-Rate-Limit-Type"] = limit_type
+                self._reply(429, {"status": {"status_code": 429}}, headers)
+                return
+
+            data = stand_in.answer(method, unquote(match.group(1)), parse_qs(url.query))
+            if data is None:
+                self._reply(404, {"status": {"status_code": 404}}, headers)
+            else:
+                self._reply(200, data, headers)
+
+        def _reply(self, status, data, headers=None):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    return Handler
+
+
+def create_stand_in_watcher(url):
+    """
+    Creates a LolWatcher object that sends its requests to a stand-in server
+
+    Args:
+        url: A string representing the root URL of the stand-in server
+
+    Returns:
+        A LolWatcher object using the stand-in server
+    """
+    return LolWatcher(kernel_url=url)
+
+
+def make_synthetic_fixtures(store, summoner_name, num_matches, seed=0):
+    """
+    Fills a FixtureStore with a made-up summoner who played `num_matches`
+    matches with realistic champion and role variety
+
+    Args:
+        store: A FixtureStore object to write the fixtures to
+        summoner_name: A string representing the name of the summoner
+        num_matches: An integer representing the number of matches to make
+        seed: An integer used to seed the random number generator
+
+    Returns:
+        A list of strings representing the match ids, most recent first
+    """
+    rng = random.Random(seed)
+    puuid = f"puuid-{summoner_name}"
+    store.save("summoners", summoner_name, {"name": summoner_name, "puuid": puuid})
+
+    matchlist = [f"NA1_{4600000000 - idx}" for idx in range(num_matches)]
+    for idx, match_id in enumerate(matchlist):
+        puuids = [puuid] + [f"puuid-{match_id}-{other}" for other in range(9)]
+        game_duration = rng.randint(180, 2400)
+        participants = []
+        for player_idx, player_puuid in enumerate(puuids):
+            position = POSITIONS[player_idx % 5]
+            participants.append(
+                {
+                    "puuid": player_puuid,
+                    "summonerName": summoner_name if player_idx == 0 else "",
+                    "championName": rng.choice(CHAMPIONS),
+                    "kills": rng.randint(0, 15),
+                    "deaths": rng.randint(0, 13),
+                    "assists": rng.randint(0, 25),
+                    "win": player_idx < 5 and idx % 2 == 0,
+                    "neutralMinionsKilled": rng.randint(0, 150),
+                    "totalMinionsKilled": rng.randint(0, 250),
+                    "visionScore": rng.randint(0, 80),
+                    "timePlayed": game_duration,
+                    "individualPosition": position[0],
+                    "role": position[1],
+                    "lane": position[2],
+                    "teamPosition": position[0],
+                    "challenges": {"kda": rng.random() * 5, "kp": rng.random()},
+                    "perks": {"statPerks": {"defense": 5002, "offense": 5008}},
+                }
+            )
+        store.save(
+            "matches",
+            match_id,
+            {
+                "metadata": {"matchId": match_id, "participants": puuids},
+                "info": {
+                    "gameCreation": 1668000000000 - idx * 3600000,
+                    "gameDuration": game_duration,
+                    "gameMode": "CLASSIC" if idx % 10 else "ARAM",
+                    "participants": participants,
+                },
+            },
+        )
+    store.save("matchlists", puuid, matchlist)
+    return matchlist
+
+
+def main():
+    """
+    Runs the stand-in server from the command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("fixtures", help="directory of recorded fixtures")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--record-key", help="API key used to record fixtures")
+    parser.add_argument("--region", default="na1")
+    parser.add_argument(
+        "--dev-limits",
+        action="store_true",
+        help="enforce the rate limits of a development key",
+    )
+    args = parser.parse_args()
+
+    stand_in = RiotStandIn(
+        FixtureStore(args.fixtures),
+        latency=args.latency,
+        app_limits=APP_LIMITS if args.dev_limits else (),
+        record_key=args.record_key,
+        region=args.region,
+        port=args.port,
+    )
+    print(f"Serving {args.fixtures} at {stand_in.url}")
+    try:
+        stand_in.serve_forever()
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Runs a scrape on a background thread so the ui stays responsive
+"""
+
+from collections import deque
+import queue
+import threading
+import time
+from modules.rate_limit import RateLimiter
+from modules.scraper import get_data_from_matchlist, get_season_matchlist
+from modules.storage import compact_player_data
+
+# Kinds of message a ScrapeTask sends back
+MATCHLIST = "matchlist"
+PROGRESS = "progress"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+def describe_eta(seconds):
+    """
+    Describes an estimated wait for the loading screen
+
+    Args:
+        seconds: A float representing the seconds left, or None if they are
+            not known yet
+
+    Returns:
+        A string like "about 3 minutes left"
+    """
+    if seconds is None:
+        return "working out how long this will take"
+    if seconds < 60:
+        return "less than a minute left"
+    minutes = round(seconds / 60)
+    return f"about {minutes} minute{'s' if minutes != 1 else ''} left"
+
+
+class ThroughputMeter:
+    """
+    Measures how fast matches are being scraped over the most recent ones,
+    so the wait estimate follows the rate limits the scrape is actually
+    getting
+
+    Attributes
+    ----------
+    window : int
+        number of most recent progress updates the rate is measured over
+    """
+
+    def __init__(self, window=20):
+        self.window = window
+        self._samples = deque(maxlen=window + 1)
+
+    def add(self, done, now=None):
+        """
+        Records how many matches are done
+
+        Args:
+            done: An integer representing the number of matches done
+            now: A float representing the time in seconds, or None for
+                time.monotonic()
+        """
+        self._samples.append((time.monotonic() if now is None else now, done))
+
+    def rate(self):
+        """
+        Finds the number of matches scraped per second
+
+        Returns:
+            A float, or None if too little has been scraped to tell
+        """
+        if len(self._samples) < 2:
+            return None
+        (start, start_done), (end, end_done) = self._samples[0], self._samples[-1]
+        if end <= start or end_done <= start_done:
+            return None
+        return (end_done - start_done) / (end - start)
+
+    def eta(self, remaining):
+        """
+        Estimates how long the rest of the scrape will take
+
+        Args:
+            remaining: An integer representing the number of matches left
+
+        Returns:
+            A float representing the seconds left, or None if the rate is
+            not known yet
+        """
+        rate = self.rate()
+        return None if rate is None else remaining / rate
+
+
+class ScrapeTask:
+    """
+    Finds a summoner's season matches and scrapes them on a background
+    thread. Progress is sent back as messages on a queue, which the ui reads
+    with poll so Tk is only touched from its own thread. A cancelled scrape
+    leaves its journal behind, so starting a new task for the same summoner
+    resumes it. Both the matchlist and the matches are requested through
+    one RateLimiter; pass the same rate_limiter to every task using a key,
+    so a resumed scrape counts the requests made before it.
+
+    Messages are tuples starting with their kind:
+        (MATCHLIST, list of match ids)
+        (PROGRESS, matches done, number of matches, seconds left or None)
+        (DONE, DataFrame of the player's stats in the types of
+            ANALYSIS_SCHEMA)
+        (CANCELLED,)
+        (FAILED, the exception raised)
+
+    Attributes
+    ----------
+    meter : ThroughputMeter
+        rate matches are being scraped at
+    """
+
+    def __init__(self, watcher, summoner_name, region, **kwargs):
+        self.meter = ThroughputMeter()
+        self._watcher = watcher
+        self._summoner_name = summoner_name
+        self._region = region
+        if kwargs.get("rate_limiter") is None:
+            kwargs["rate_limiter"] = RateLimiter()
+        self._kwargs = kwargs
+        self._messages = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """
+        Starts scraping on the background thread
+        """
+        self._thread.start()
+
+    def cancel(self):
+        """
+        Asks the scrape to stop after the match it is fetching
+        """
+        self._stop.set()
+
+    def is_alive(self):
+        """
+        Returns whether the background thread is still running
+        """
+        return self._thread.is_alive()
+
+    def poll(self):
+        """
+        Takes every message sent since the last poll, without waiting
+
+        Returns:
+            A list of message tuples, oldest first
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _progress(self, done, total):
+        """
+        Sends a progress message with the estimated time left
+        """
+        self.meter.add(done)
+        self._messages.put((PROGRESS, done, total, self.meter.eta(total - done)))
+
+    def _run(self):
+        """
+        Scrapes the summoner's season, sending messages as it goes
+        """
+        try:
+            matchlist = get_season_matchlist(
+                self._watcher,
+                self._summoner_name,
+                self._region,
+                rate_limiter=self._kwargs["rate_limiter"],
+                stop=self._stop,
+            )
+            if matchlist is None:
+                self._messages.put((CANCELLED,))
+                return
+            self._messages.put((MATCHLIST, matchlist))
+            player_data = get_data_from_matchlist(
+                self._watcher,
+                self._summoner_name,
+                matchlist,
+                self._region,
+                progress=self._progress,
+                stop=self._stop,
+                **self._kwargs,
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            # Any error has to reach the ui thread to be shown
+            self._messages.put((FAILED, error))
+            return
+        if player_data is None:
+            self._messages.put((CANCELLED,))
+        else:
+            self._messages.put((DONE, compact_player_data(player_data)))
@@ -2,33 +2,88 @@
 Functions for scraping League of Legends game stats from the Riot API
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import os
 from riotwatcher import LolWatcher
+import numpy as np
 import pandas as pd
+from modules.journal import (
+    KEPT,
+    SKIPPED,
+    ScrapeJournal,
+    read_journal,
+    read_skipped,
+    write_skipped,
+)
+from modules.rate_limit import RateLimiter, attach_rate_limiter
+from modules.storage import (
+    ANALYSIS_SCHEMA,
+    load_player_data,
+    player_data_path,
+    save_player_data,
+)
 
 S12_START = 1641531600  # 1/07/2022, 00:00:00
 S12_END = 1668488399  # 11/14/2022, 23:59:59
 
+# Fields used by the analysis, for projecting scraped rows
+ANALYSIS_FIELDS = tuple(ANALYSIS_SCHEMA)
 
-def create_watcher():
+# Fields of the match, rather than the player, added to each scraped row
+MATCH_FIELDS = ("gameCreation",)
+
+# Compact types for fields whose range is known
+FIELD_DTYPES = {
+    "kills": np.int16,
+    "deaths": np.int16,
+    "assists": np.int16,
+    "win": np.bool_,
+    "neutralMinionsKilled": np.int16,
+    "totalMinionsKilled": np.int16,
+    "timePlayed": np.int32,
+    "visionScore": np.int16,
+    "gameCreation": np.int64,
+}
+
+# Values used when a typed field is missing from a row, keyed by dtype kind
+FIELD_DEFAULTS = {"i": 0, "b": False}
+
+
+def create_watcher(rate_limiter=None):
     """
     Creates a LolWatcher object using an API key from a file
 
     Args:
         filepath: A string representing the filepath to .txt file with the key
             as the first and only line
+        rate_limiter: A RateLimiter object to update from the rate limit
+            headers of every response, or None
 
     Returns:
         A LolWatcher object using the given API key
     """
     with open("key.txt", "r", encoding="UTF=8") as file:
         api_key = file.readline()
-    return LolWatcher(api_key)
+    watcher = LolWatcher(api_key)
+    if rate_limiter is not None:
+        attach_rate_limiter(watcher, rate_limiter)
+    return watcher
 
 
-def get_season_matchlist(watcher, summoner_name, region):
+def get_season_matchlist(
+    watcher,
+    summoner_name,
+    region,
+    known_ids=None,
+    rate_limiter=None,
+    puuid=None,
+    stop=None,
+):
     """
     Create a list of match ids for all matches played by a summoner in
     Season 12. The match ids are ordered from most recent to least recent.
+    If known_ids is given, paging stops at the first match id that is already
+    known, so only matches newer than it are returned.
 
     Args:
         watcher: A LolWatcher object holding an API key
@@ -37,24 +92,52 @@ def get_season_matchlist(watcher, summoner_name, region):
         region: A string representing the region of the summoner
             regions can be found here: https://developer.riotgames.com/docs/lol
             under "platform routing values"
+        known_ids: A set of strings representing match ids that have already
+            been scraped, or None to list the whole season
+        rate_limiter: A RateLimiter object used to schedule and retry
+            requests, a new one using the development key limits is made if
+            None
+        puuid: A string representing the summoner's puuid if it has already
+            been looked up, or None to look it up by summoner_name
+        stop: A threading.Event that stops the requests waiting for the rate
+            limits once it is set, or None
 
     Returns:
-        A list of strings representing the match ids
+        A list of strings representing the match ids, or None if stop was
+        set before the whole list was found
     """
-    summoner = watcher.summoner.by_name(region, summoner_name)
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    if puuid is None:
+        summoner = rate_limiter.call(
+            "by_name", watcher.summoner.by_name, region, summoner_name, stop=stop
+        )
+        if summoner is None:
+            return None
+        puuid = summoner["puuid"]
 
     matchlist = []
     start_idx = 0
 
     while True:
-        new_matchlist = watcher.match.matchlist_by_puuid(
+        new_matchlist = rate_limiter.call(
+            "matchlist_by_puuid",
+            watcher.match.matchlist_by_puuid,
             region=region,
-            puuid=summoner["puuid"],
+            puuid=puuid,
             start=start_idx,
             count=100,
             start_time=S12_START,
             end_time=S12_END,
+            stop=stop,
         )
+        if new_matchlist is None:
+            return None
+        if known_ids is not None:
+            for idx, match_id in enumerate(new_matchlist):
+                if match_id in known_ids:
+                    return matchlist + new_matchlist[:idx]
+
         matchlist += new_matchlist
 
         if len(new_matchlist) != 100:
@@ -64,10 +147,252 @@ def get_season_matchlist(watcher, summoner_name, region):
     return matchlist
 
 
-def get_data_from_matchlist(watcher, summoner_name, matchlist, region):
+def fetch_matches(
+    watcher, matchlist, region, max_workers=1, rate_limiter=None, cache=None, stop=None
+):
+    """
+    Downloads matches from the Riot API, keeping up to `max_workers` requests
+    in flight at once while staying within the rate limits. Matches found in
+    the cache are not downloaded again.
+
+    Args:
+        watcher: A LolWatcher object holding an API key
+        matchlist: A list of strings representing match ids
+        region: A string representing the region of the matches
+        max_workers: An integer representing the most requests that can be
+            in flight at once
+        rate_limiter: A RateLimiter object used to schedule and retry
+            requests, a new one using the development key limits is made if
+            None
+        cache: A MatchCache object to check before calling the API, or None
+            to always call the API
+        stop: A threading.Event that stops requests waiting for the rate
+            limits once it is set, or None
+
+    Returns:
+        A generator of match dictionaries in the same order as matchlist,
+        with None for the matches not requested because stop was set
+    """
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+
+    def fetch(match_id):
+        if cache is not None:
+            match = cache.get(match_id)
+            if match is not None:
+                return match
+        match = rate_limiter.call(
+            "by_id", watcher.match.by_id, region, match_id, stop=stop
+        )
+        if cache is not None and match is not None:
+            cache.put(match_id, match)
+        return match
+
+    if max_workers <= 1:
+        return map(fetch, matchlist)
+
+    def fetch_all():
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            yield from executor.map(fetch, matchlist)
+        finally:
+            # Requests still queued are dropped if the caller stops early
+            executor.shutdown(cancel_futures=True)
+
+    return fetch_all()
+
+
+class ColumnBuilder:
+    """
+    Preallocated column arrays, one per field, that scraped rows are written
+    into as they arrive. Fields with a known type in FIELD_DTYPES get a
+    compact typed array; any other field gets an object array.
+
+    Attributes
+    ----------
+    matchlist : list
+        match ids in the order rows appear in the finished DataFrame
+    fields : list
+        names of the fields kept from each row
+    columns : dict
+        NumPy arrays holding each field's values, keyed by field name
+    count : int
+        number of rows written so far
+    """
+
+    def __init__(self, matchlist, fields):
+        self.matchlist = matchlist
+        self.fields = list(fields)
+        self.columns = {
+            field: np.empty(len(matchlist), dtype=FIELD_DTYPES.get(field, object))
+            for field in self.fields
+        }
+        self.count = 0
+        self._positions = {match_id: idx for idx, match_id in enumerate(matchlist)}
+        self._filled = np.zeros(len(matchlist), dtype=bool)
+
+    def add(self, match_id, row):
+        """
+        Writes the projected fields of a row into the column arrays. Rows for
+        match ids that are not in the matchlist are ignored.
+
+        Args:
+            match_id: A string representing the match id of the row
+            row: A dictionary holding a player's stats from the match
+        """
+        idx = self._positions.get(match_id)
+        if idx is None:
+            return
+        for field, column in self.columns.items():
+            column[idx] = row.get(field, FIELD_DEFAULTS.get(column.dtype.kind))
+        if not self._filled[idx]:
+            self._filled[idx] = True
+            self.count += 1
+
+    def to_frame(self, existing_data=None):
+        """
+        Builds a DataFrame from the rows written so far
+
+        Args:
+            existing_data: A DataFrame holding previously scraped stats for
+                older matches to put after the new rows, or None
+
+        Returns:
+            A DataFrame holding one row per match, indexed by match id
+        """
+        player_stats = pd.DataFrame(
+            {field: column[self._filled] for field, column in self.columns.items()},
+            index=pd.Index(np.asarray(self.matchlist, dtype=object)[self._filled]),
+        ).infer_objects()
+        if existing_data is not None:
+            player_stats = pd.concat([player_stats, existing_data])
+        return player_stats
+
+
+def project_row(row, fields, side_store=None, match_id=None):
+    """
+    Keeps only the projected fields of a row, moving the rest to a side store
+
+    Args:
+        row: A dictionary holding a player's stats from a match
+        fields: A list of strings representing the fields to keep, or None to
+            keep every field
+        side_store: A dictionary-like object that the other fields are saved
+            to under the match id, or None to drop them
+        match_id: A string representing the match id of the row
+
+    Returns:
+        A dictionary holding the projected fields
+    """
+    if fields is None:
+        return row
+    if side_store is not None:
+        side_store[match_id] = {
+            field: value for field, value in row.items() if field not in fields
+        }
+    return {field: row[field] for field in fields if field in row}
+
+
+def get_player_row(match, player):
+    """
+    Makes a player's row for a match, adding the MATCH_FIELDS of the match
+    to the player's stats
+
+    Args:
+        match: A dictionary holding a match as returned by the API
+        player: A dictionary holding one participant's stats from the match
+
+    Returns:
+        A dictionary holding the player's row
+    """
+    return {
+        **player,
+        **{
+            field: match["info"][field]
+            for field in MATCH_FIELDS
+            if field in match["info"]
+        },
+    }
+
+
+def get_skip_reason(match):
+    """
+    Finds why a match should be left out of a player's data
+
+    Args:
+        match: A dictionary holding a match as returned by the API
+
+    Returns:
+        A string representing why the match is skipped, or None if it is kept
+    """
+    if match["info"]["gameMode"] != "CLASSIC":
+        return f"gameMode is {match['info']['gameMode']}"
+    if match["info"]["gameDuration"] < 240:
+        return "gameDuration < 240"
+    return None
+
+
+def load_progress(summoner_name, matchlist, fields=None):
+    """
+    Loads what earlier scrapes of a summoner got done: the rows kept by an
+    interrupted scrape, from its journal `data/[summoner_name].jsonl`, and
+    the matches skipped by every scrape, from the journal and
+    `data/[summoner_name].skipped.json`
+
+    Args:
+        summoner_name: A string representing the name of the summoner
+        matchlist: A list of strings representing the match ids being scraped
+        fields: A list of strings representing the fields kept from each
+            match, or None to keep every field
+
+    Returns:
+        A tuple holding a ColumnBuilder with the kept rows added, or None if
+        fields is None and no row has been kept yet, a set of strings
+        representing the match ids that do not need fetching, and a
+        dictionary mapping each skipped match id to why it was skipped
+    """
+    journal_path = f"data/{summoner_name}.jsonl"
+    builder = None if fields is None else ColumnBuilder(matchlist, fields)
+    skipped = read_skipped(f"data/{summoner_name}.skipped.json")
+    done_ids = set(skipped)
+    if os.path.exists(journal_path):
+        for entry in read_journal(journal_path):
+            done_ids.add(entry["match_id"])
+            if entry["status"] == KEPT:
+                if builder is None:
+                    builder = ColumnBuilder(matchlist, entry["row"].keys())
+                builder.add(entry["match_id"], entry["row"])
+            else:
+                skipped[entry["match_id"]] = entry.get("reason")
+    return (builder, done_ids, skipped)
+
+
+def get_data_from_matchlist(
+    watcher,
+    summoner_name,
+    matchlist,
+    region,
+    max_workers=1,
+    rate_limiter=None,
+    cache=None,
+    existing_data=None,
+    compact_every=50,
+    fields=None,
+    side_store=None,
+    file_format="csv",
+    progress=None,
+    stop=None,
+):
     """
-    Scrapes and concatenates data from matches into a Pandas DataFrame and logs
-    DataFrame to .csv file throughout scraping.
+    Scrapes and concatenates data from matches into a Pandas DataFrame. Every
+    fetched match is recorded in the journal `data/[summoner_name].jsonl` as
+    kept or skipped, and the kept rows are compacted into
+    `data/[summoner_name].[file_format]` every `compact_every` matches and at
+    the end.
+    If the journal is left behind by an interrupted scrape, the matches it
+    records are not fetched again. Once the scrape is done, the skipped
+    matches are saved to `data/[summoner_name].skipped.json`, so later
+    scrapes do not fetch them again either.
 
     Args:
         watcher: A LolWatcher object holding an API key
@@ -77,24 +402,84 @@ def get_data_from_matchlist(watcher, summoner_name, matchlist, region):
         region: A string representing the region of the summoner
             regions can be found here: https://developer.riotgames.com/docs/lol
             under "platform routing values"
+        max_workers: An integer representing the most match requests that can
+            be in flight at once
+        rate_limiter: A RateLimiter object used to schedule and retry
+            requests, a new one using the development key limits is made if
+            None
+        cache: A MatchCache object to check before calling the API, or None
+            to always call the API
+        existing_data: A DataFrame holding previously scraped stats for older
+            matches, which is kept after the new matches in the saved file
+        compact_every: An integer representing how many kept matches are
+            scraped between writes of the saved file
+        fields: A list of strings representing the fields to keep from each
+            match, such as ANALYSIS_FIELDS, or None to keep every field
+        side_store: A dictionary-like object that the fields left out by the
+            projection are saved to under each match id, or None to drop them
+        file_format: A string representing the format the data is saved in,
+            "csv", "parquet" or "arrow"
+        progress: A function called with the number of matches done and the
+            number in matchlist, once matches from the journal are loaded
+            and after each match is fetched, or None
+        stop: A threading.Event that stops the scrape once it is set, or
+            None. It is checked before each match is fetched and wakes any
+            wait for the rate limits. The journal is kept, so the next call
+            resumes from the match it stopped at.
 
     Returns:
-        A DataFrame holding all player stats from all matches in matchlist
-    """
-    summoner = watcher.summoner.by_name(region, summoner_name)
-
-    player_keys = watcher.match.by_id(region, matchlist[0])["info"]["participants"][
-        0
-    ].keys()
-    player_stats = pd.DataFrame(index=matchlist, columns=player_keys)
-
-    for match_id in matchlist:
-        current_match = watcher.match.by_id(region, match_id)
-        if (
-            current_match["info"]["gameMode"] != "CLASSIC"
-            or current_match["info"]["gameDuration"] < 240
-        ):
-            player_stats = player_stats.drop([match_id])
+        A DataFrame holding all player stats from all matches in matchlist,
+        or None if the scrape was stopped
+    """
+    filepath = player_data_path(summoner_name, file_format)
+    builder, done_ids, skipped = load_progress(summoner_name, matchlist, fields)
+    remaining = [match_id for match_id in matchlist if match_id not in done_ids]
+
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    journal = ScrapeJournal(f"data/{summoner_name}.jsonl")
+    if remaining:
+        summoner = rate_limiter.call(
+            "by_name", watcher.summoner.by_name, region, summoner_name, stop=stop
+        )
+        if summoner is None:
+            journal.close()
+            return None
+
+    if progress is not None:
+        progress(len(matchlist) - len(remaining), len(matchlist))
+    matches = fetch_matches(
+        watcher, remaining, region, max_workers, rate_limiter, cache, stop
+    )
+    for done, match_id in enumerate(
+        remaining, start=len(matchlist) - len(remaining) + 1
+    ):
+        # Stop is checked before the next match is pulled, since pulling it
+        # can fetch it and every fetched match has to be journaled
+        if stop is not None and stop.is_set():
+            current_match = None
+        else:
+            current_match = next(matches)
+        if current_match is None:
+            # Stopped here or while waiting for the rate limits
+            if hasattr(matches, "close"):
+                matches.close()
+            journal.close()
+            return None
+        if progress is not None:
+            progress(done, len(matchlist))
+        if builder is None:
+            builder = ColumnBuilder(
+                matchlist,
+                get_player_row(
+                    current_match, current_match["info"]["participants"][0]
+                ).keys(),
+            )
+
+        reason = get_skip_reason(current_match)
+        if reason is not None:
+            journal.record(match_id, SKIPPED, reason=reason)
+            skipped[match_id] = reason
             continue
 
         target_player = next(
@@ -104,9 +489,212 @@ def get_data_from_matchlist(watcher, summoner_name, matchlist, region):
                 if player["puuid"] == summoner["puuid"]
             )
         )
+        target_player = project_row(
+            get_player_row(current_match, target_player), fields, side_store, match_id
+        )
 
-        player_stats.loc[match_id] = target_player
+        journal.record(match_id, KEPT, row=target_player)
+        builder.add(match_id, target_player)
 
-        player_stats.to_csv(f"data/{summoner_name}.csv")
+        if builder.count % compact_every == 0:
+            save_player_data(builder.to_frame(existing_data), filepath)
+
+    if builder is None:
+        builder = ColumnBuilder(matchlist, [])
+    player_stats = builder.to_frame()
+    if existing_data is None:
+        save_player_data(player_stats, filepath)
+    else:
+        save_player_data(pd.concat([player_stats, existing_data]), filepath)
+    write_skipped(skipped, f"data/{summoner_name}.skipped.json")
+    journal.remove()
 
     return player_stats
+
+
+def refresh_player_data(watcher, summoner_name, region, file_format="csv", **kwargs):
+    """
+    Brings a summoner's data in `data/[summoner_name].[file_format]` up to
+    date by only scraping matches newer than the most recent match already
+    in the file or skipped. If there is no file yet, the whole season is
+    scraped.
+
+    Args:
+        watcher: A LolWatcher object holding an API key
+        summoner_name: A string representing the name of the summoner who's
+            data will be refreshed
+        region: A string representing the region of the summoner
+            regions can be found here: https://developer.riotgames.com/docs/lol
+            under "platform routing values"
+        file_format: A string representing the format the data is saved in,
+            "csv", "parquet" or "arrow"
+        **kwargs: Keyword arguments passed on to get_data_from_matchlist
+
+    Returns:
+        A DataFrame holding all player stats from the season, most recent
+        match first, or None if the scrape was stopped
+    """
+    filepath = player_data_path(summoner_name, file_format)
+    journal_path = f"data/{summoner_name}.jsonl"
+    skipped_path = f"data/{summoner_name}.skipped.json"
+    existing_data = None
+    known_ids = None
+    if os.path.exists(filepath):
+        # Files saved by older versions have blank rows for the matches they
+        # had not scraped yet, which are dropped so those matches are fetched
+        existing_data = load_player_data(filepath).dropna(how="all")
+        if os.path.exists(journal_path):
+            # Rows from an interrupted scrape are resumed from its journal, so
+            # they do not count as already known
+            existing_data = existing_data.drop(
+                index=[entry["match_id"] for entry in read_journal(journal_path)],
+                errors="ignore",
+            )
+        # Skipped matches are known too, so they are not fetched again
+        known_ids = set(existing_data.index) | set(read_skipped(skipped_path))
+
+    # The matchlist and the matches share one budget of requests
+    if kwargs.get("rate_limiter") is None:
+        kwargs["rate_limiter"] = RateLimiter()
+    matchlist = get_season_matchlist(
+        watcher,
+        summoner_name,
+        region,
+        known_ids,
+        kwargs["rate_limiter"],
+        stop=kwargs.get("stop"),
+    )
+    if matchlist is None:
+        return None
+    if not matchlist:
+        return existing_data
+
+    new_data = get_data_from_matchlist(
+        watcher,
+        summoner_name,
+        matchlist,
+        region,
+        existing_data=existing_data,
+        file_format=file_format,
+        **kwargs,
+    )
+    if new_data is None:
+        return None
+    if existing_data is not None:
+        new_data = pd.concat([new_data, existing_data])
+    return new_data
+
+
+def get_data_for_summoners(
+    watcher,
+    summoner_names,
+    region,
+    max_workers=1,
+    rate_limiter=None,
+    cache=None,
+    fields=None,
+    file_format="csv",
+):
+    """
+    Scrapes Season 12 data for several summoners at once. Each match is only
+    fetched once, even when several of the summoners played in it, and every
+    tracked summoner's row is taken from it. Each summoner's data is saved to
+    `data/[summoner_name].[file_format]`. Every fetched match is recorded in
+    each tracking summoner's journal, like get_data_from_matchlist, so an
+    interrupted batch picks up where it stopped when run again.
+
+    Args:
+        watcher: A LolWatcher object holding an API key
+        summoner_names: A list of strings representing the names of the
+            summoners who's data will be collected
+        region: A string representing the region of the summoners
+            regions can be found here: https://developer.riotgames.com/docs/lol
+            under "platform routing values"
+        max_workers: An integer representing the most match requests that can
+            be in flight at once
+        rate_limiter: A RateLimiter object used to schedule and retry
+            requests, a new one using the development key limits is made if
+            None
+        cache: A MatchCache object to check before calling the API, or None
+            to always call the API
+        fields: A list of strings representing the fields to keep from each
+            match, such as ANALYSIS_FIELDS, or None to keep every field
+        file_format: A string representing the format the data is saved in,
+            "csv", "parquet" or "arrow"
+
+    Returns:
+        A dictionary mapping each summoner name to a DataFrame holding all of
+        their player stats from the season
+    """
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    puuids = {
+        summoner_name: rate_limiter.call(
+            "by_name", watcher.summoner.by_name, region, summoner_name
+        )["puuid"]
+        for summoner_name in summoner_names
+    }
+    matchlists = {
+        summoner_name: get_season_matchlist(
+            watcher,
+            summoner_name,
+            region,
+            rate_limiter=rate_limiter,
+            puuid=puuids[summoner_name],
+        )
+        for summoner_name in summoner_names
+    }
+
+    builders, remaining, skipped, journals = {}, {}, {}, {}
+    for summoner_name, matchlist in matchlists.items():
+        builder, done_ids, skipped[summoner_name] = load_progress(
+            summoner_name, matchlist, fields
+        )
+        builders[summoner_name] = builder
+        remaining[summoner_name] = set(matchlist) - done_ids
+        journals[summoner_name] = ScrapeJournal(f"data/{summoner_name}.jsonl")
+    # dict.fromkeys keeps the first occurrence of each match id in order
+    all_matches = list(
+        dict.fromkeys(
+            match_id
+            for summoner_name, matchlist in matchlists.items()
+            for match_id in matchlist
+            if match_id in remaining[summoner_name]
+        )
+    )
+
+    for match_id, current_match in zip(
+        all_matches,
+        fetch_matches(watcher, all_matches, region, max_workers, rate_limiter, cache),
+    ):
+        reason = get_skip_reason(current_match)
+        players = {
+            player["puuid"]: player for player in current_match["info"]["participants"]
+        }
+        for summoner_name, journal in journals.items():
+            if match_id not in remaining[summoner_name]:
+                continue
+            if reason is not None:
+                journal.record(match_id, SKIPPED, reason=reason)
+                skipped[summoner_name][match_id] = reason
+                continue
+            row = project_row(
+                get_player_row(current_match, players[puuids[summoner_name]]),
+                fields,
+            )
+            journal.record(match_id, KEPT, row=row)
+            if builders[summoner_name] is None:
+                builders[summoner_name] = ColumnBuilder(
+                    matchlists[summoner_name], row.keys()
+                )
+            builders[summoner_name].add(match_id, row)
+
+    all_player_stats = {}
+    for summoner_name, matchlist in matchlists.items():
+        builder = builders[summoner_name] or ColumnBuilder(matchlist, [])
+        player_stats = builder.to_frame()
+        save_player_data(player_stats, player_data_path(summoner_name, file_format))
+        write_skipped(skipped[summoner_name], f"data/{summoner_name}.skipped.json")
+        journals[summoner_name].remove()
+        all_player_stats[summoner_name] = player_stats
+    return all_player_stats
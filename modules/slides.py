@@ -0,0 +1,410 @@
+"""
+Composites each wrap slide into one image with PIL, off-screen, so the ui
+only has to swap images to change slides
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+from PIL import ImageDraw, ImageFont
+from modules.analysis import ROLLING_WINDOW
+from modules.image_store import CHAMP_SIZES
+
+YELLOW = "#f1ff47"
+BLACK = "#000000"
+
+# Slides in the order they are shown, after the last one the first is shown
+SLIDES = ["death", "kda", "farm", "winrate", "vision", "tilt"]
+
+# Font files tried in order for each weight, the first one found is used
+FONT_FILES = {
+    False: ["arial.ttf", "Arial.ttf", "DejaVuSans.ttf"],
+    True: ["arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(size, bold=False):
+    """
+    Loads a font at the size Tk would draw it
+
+    Args:
+        size: An integer representing the font size in points
+        bold: A boolean representing whether the font is bold
+
+    Returns:
+        A PIL ImageFont
+    """
+    # Tk font sizes are in points, at 96 pixels per inch
+    pixels = round(size * 4 / 3)
+    for filename in FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(filename, pixels)
+        except OSError:
+            continue
+    return ImageFont.load_default(pixels)
+
+
+def wrap_text(text, font, width):
+    """
+    Splits text into lines no wider than width, breaking between words like
+    a Tk canvas text item
+
+    Args:
+        text: A string representing the text
+        font: A PIL ImageFont
+        width: A float representing the widest a line can be in pixels
+
+    Returns:
+        A string with a newline between each line
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = word if not line else f"{line} {word}"
+            if line and font.getlength(candidate) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# Tk anchors and the PIL anchors placing text the same way
+ANCHORS = {"center": "mm", "w": "lm", "e": "rm"}
+
+
+def draw_text(draw, position, text, size, fill, **options):
+    """
+    Draws text like Tk's canvas.create_text
+
+    Args:
+        draw: A PIL ImageDraw to draw on
+        position: A tuple of floats representing where the anchor of the
+            text goes
+        text: A string representing the text
+        size: An integer representing the font size in points
+        fill: A string representing the text color
+        options: Tk text options, width, anchor ("center", "w" or "e"),
+            justify and bold
+    """
+    font = load_font(size, options.get("bold", False))
+    if options.get("width") is not None:
+        text = wrap_text(text, font, options["width"])
+    draw.multiline_text(
+        position,
+        text,
+        fill=fill,
+        font=font,
+        anchor=ANCHORS[options.get("anchor", "center")],
+        align=options.get("justify", "left"),
+    )
+
+
+def _paste_champion(slide, images, name, position, scale):
+    """
+    Pastes a champion square with its top left corner at a position given
+    before scaling
+    """
+    slide.paste(
+        images.pil_image(name), (int(position[0] * scale), int(position[1] * scale))
+    )
+
+
+def _paste_lowlight_champion(slide, images, champ, scale):
+    """
+    Pastes a champion's big square into the box in the middle of the death,
+    farm, vision and tilt backgrounds. If there is no champion to show, the
+    box is covered in black instead, so its placeholder is not shown.
+    """
+    if champ is not None:
+        _paste_champion(slide, images, f"{champ}3", (160, 360), scale)
+        return
+    side = int(CHAMP_SIZES[3] * scale)
+    left, top = int(160 * scale), int(360 * scale)
+    # A little past the box, since resizing the background blurs its edges
+    ImageDraw.Draw(slide).rectangle(
+        (left - 2, top - 2, left + side + 2, top + side + 2), fill=BLACK
+    )
+
+
+def render_death_slide(report, images, scale):
+    """
+    Composites the champion the player has died the most on and the number
+    of deaths
+
+    Args:
+        report: A WrappedReport holding the player's lowlights
+        images: An ImageStore to take the backgrounds and champion squares
+            from
+        scale: A float representing the ui scale
+
+    Returns:
+        A PIL Image of the slide
+    """
+    deaths, champ = report.most_deaths
+    slide = images.pil_image("death_bg").copy()
+    _paste_lowlight_champion(slide, images, champ, scale)
+    draw_text(
+        ImageDraw.Draw(slide),
+        (slide.width / 2, 700),
+        # pylint: disable=line-too-long
+        f"In Season 12, your most deaths in one game was {deaths} deaths on {champ}. You filthy inter.",
+        12,
+        YELLOW,
+        width=slide.width * 0.7,
+        justify="center",
+    )
+    return slide
+
+
+def render_kda_slide(report, images, scale):
+    """
+    Composites the five champions the player has the worst kda with and
+    their kdas, see render_death_slide
+    """
+    slide = images.pil_image("kda_bg").copy()
+    champs = [kda["champ"] for kda in report.worst_kda]
+    if champs:
+        _paste_champion(slide, images, f"{champs[0]}4", (57, 392), scale)
+    for idx, champ in enumerate(champs[1:]):
+        _paste_champion(slide, images, f"{champ}1", (521, 360 + 187 * idx), scale)
+
+    draw = ImageDraw.Draw(slide)
+    for idx, kda in enumerate(report.worst_kda):
+        fill = YELLOW if idx == 4 else BLACK
+        y_pos = 615 + 31 * idx
+        for x_pos, text in [
+            (slide.width / 15, f"{round(kda['kda'], 2)}"),
+            (slide.width / 4, kda["champ"]),
+        ]:
+            draw_text(
+                draw,
+                (x_pos, y_pos),
+                text,
+                14,
+                fill,
+                width=slide.width * 0.7,
+                anchor="w",
+                bold=True,
+            )
+    return slide
+
+
+def render_farm_slide(report, images, scale):
+    """
+    Composites the champion the player has the worst farm on and the farm
+    per minute, see render_death_slide
+    """
+    farm, champ = report.least_cs
+    slide = images.pil_image("farm_bg").copy()
+    _paste_lowlight_champion(slide, images, champ, scale)
+    # pylint: disable=line-too-long
+    if champ is None:
+        text = "In Season 12, you only played support, so nobody can judge your cs. Convenient."
+    else:
+        text = f"In Season 12, your worst cs per minute when not playing support was {round(farm, 1)} on {champ}. Maybe you should play support instead."
+    draw_text(
+        ImageDraw.Draw(slide),
+        (slide.width / 2, 700),
+        text,
+        12,
+        YELLOW,
+        width=slide.width * 0.7,
+        justify="center",
+    )
+    return slide
+
+
+def render_winrate_slide(report, images, scale):
+    """
+    Composites the five champions the player has the worst winrate with,
+    their winrates and games played, see render_death_slide
+    """
+    slide = images.pil_image("winrate_bg").copy()
+    draw = ImageDraw.Draw(slide)
+    for idx, winrate in enumerate(report.worst_winrate):
+        _paste_champion(
+            slide, images, f"{winrate['champ']}2", (199, 133 + 210 * idx), scale
+        )
+        y_pos = 157 * idx
+        draw_text(
+            draw,
+            (slide.width / 4, 150 + y_pos),
+            f"{round(winrate['winrate'] * 100)}%",
+            40,
+            BLACK,
+            width=slide.width * 0.7,
+            anchor="e",
+            bold=True,
+        )
+        draw_text(
+            draw,
+            (3 * slide.width / 5, 140 + y_pos),
+            winrate["champ"],
+            16,
+            BLACK,
+            width=slide.width * 0.7,
+            anchor="w",
+            bold=True,
+        )
+        draw_text(
+            draw,
+            (3 * slide.width / 5, 170 + y_pos),
+            f"{winrate['games_played']} games played",
+            14,
+            BLACK,
+            width=slide.width * 0.7,
+            anchor="w",
+        )
+    return slide
+
+
+def render_vision_slide(report, images, scale):
+    """
+    Composites the champion the player has gotten the worst vision with in
+    one game and the vision score per minute, see render_death_slide
+    """
+    vision_score, champ = report.worst_vs
+    slide = images.pil_image("vision_bg").copy()
+    _paste_lowlight_champion(slide, images, champ, scale)
+    # pylint: disable=line-too-long
+    if champ is None:
+        text = "In Season 12, you never played support, so your wards were never put to the test. Lucky."
+    else:
+        text = f"In Season 12, your worst vision score per minute was {round(vision_score, 2)} on {champ}. Lee Sin support cosplay is not cool."
+    draw_text(
+        ImageDraw.Draw(slide),
+        (slide.width / 2, 700),
+        text,
+        12,
+        YELLOW,
+        width=slide.width * 0.7,
+        justify="center",
+    )
+    return slide
+
+
+def render_tilt_slide(report, images, scale):
+    """
+    Composites the player's longest loss streak, worst run of games by kda
+    and worst day, with the champion played most during the loss streak,
+    see render_death_slide
+    """
+    streak, streak_champ = report.loss_streak
+    rolling_kda, rolling_champ = report.rolling_kda
+    day, day_wins, day_games = report.worst_day
+
+    slide = images.pil_image("tilt_bg").copy()
+    _paste_lowlight_champion(slide, images, streak_champ or rolling_champ, scale)
+
+    tilt_texts = [f"In Season 12, you lost {streak} games in a row"]
+    if streak_champ is not None:
+        tilt_texts[0] += f", mostly on {streak_champ}"
+    if rolling_champ is not None:
+        tilt_texts.append(
+            f"Your worst {ROLLING_WINDOW} games in a row had a KDA of "
+            f"{round(rolling_kda, 2)}"
+        )
+    if day is not None:
+        tilt_texts.append(f"On {day} you won {day_wins} of {day_games} games")
+    draw_text(
+        ImageDraw.Draw(slide),
+        (slide.width / 2, 700),
+        ". ".join(tilt_texts) + ". Maybe take a break next time.",
+        12,
+        YELLOW,
+        width=slide.width * 0.7,
+        justify="center",
+    )
+    return slide
+
+
+RENDERERS = {
+    "death": render_death_slide,
+    "kda": render_kda_slide,
+    "farm": render_farm_slide,
+    "winrate": render_winrate_slide,
+    "vision": render_vision_slide,
+    "tilt": render_tilt_slide,
+}
+
+
+class SlideDeck:
+    """
+    A player's slides, each composited once and cached. Slides are rendered
+    on a background thread, so the next slide can be rendered while the
+    current one is shown; only converting a finished slide for the ui
+    happens on the calling thread.
+
+    Attributes
+    ----------
+    report : WrappedReport
+        lowlights the slides show
+    images : ImageStore
+        source of the backgrounds and champion squares
+    scale : float
+        ui scale the champion positions are multiplied by
+    make_photo : function
+        converts a PIL Image into the object the ui draws, such as
+        ImageTk.PhotoImage
+    """
+
+    def __init__(self, report, images, scale=1, make_photo=None):
+        self.report = report
+        self.images = images
+        self.scale = scale
+        self.make_photo = make_photo if make_photo is not None else lambda img: img
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._renders = {}
+        self._photos = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, name):
+        """
+        Starts rendering a slide in the background, unless it has been
+        already
+
+        Args:
+            name: A string representing the slide, one of SLIDES
+        """
+        with self._lock:
+            if name not in self._renders:
+                self._renders[name] = self._executor.submit(
+                    RENDERERS[name], self.report, self.images, self.scale
+                )
+
+    def render(self, name):
+        """
+        Finds a slide as a PIL Image, waiting for it to be rendered
+
+        Args:
+            name: A string representing the slide, one of SLIDES
+
+        Returns:
+            A PIL Image of the slide
+        """
+        self.prefetch(name)
+        return self._renders[name].result()
+
+    def photo(self, name):
+        """
+        Finds a slide converted for the ui, converting it the first time
+
+        Args:
+            name: A string representing the slide, one of SLIDES
+
+        Returns:
+            The value returned by make_photo for the slide
+        """
+        if name not in self._photos:
+            self._photos[name] = self.make_photo(self.render(name))
+        return self._photos[name]
+
+    def close(self):
+        """
+        Stops the background thread once any slide being rendered is done
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
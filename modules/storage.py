@@ -0,0 +1,463 @@
+"""
+Functions for saving, loading and converting scraped player data in columnar
+formats. Run `python -m modules.storage` to convert old .csv files in data/
+"""
+
+import ast
+import argparse
+import json
+import os
+import re
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from modules.journal import write_csv_atomic
+
+# File formats player data can be saved in, by file extension
+FILE_FORMATS = ("csv", "parquet", "arrow")
+
+# Name of the column holding the match ids in columnar files
+INDEX_COLUMN = "matchId"
+
+# Tokens of a Python repr that are written differently in JSON. Strings
+# without backslashes or quotes of the other kind are matched whole, so
+# words inside them are left alone. Any other string leaves a stray quote
+# or backslash to match, which marks the repr as one to parse with
+# ast.literal_eval instead.
+_REPR_TOKENS = re.compile(
+    r"""'([^'"\\]*)'|("[^"\\]*")|\b(True|False|None|nan|inf)\b|(['"\\])"""
+)
+
+# Marks the reprs that need _REPR_TOKENS. In the rest every string is in
+# single quotes with nothing escaped, so swapping the quotes makes JSON.
+_REPR_NEEDS_TOKENS = re.compile(r"""["\\]|\b(?:True|False|None|nan|inf)\b""")
+_SWAP_QUOTES = str.maketrans("'", '"')
+_JSON_WORDS = {
+    "True": "true",
+    "False": "false",
+    "None": "null",
+    "nan": "NaN",
+    "inf": "Infinity",
+}
+
+# Compact types of the columns the analysis reads. Strings repeated across
+# games are categoricals, counters are the narrowest integers that fit them
+# and nullable types are used where rows from older scrapes can be missing
+# a value.
+ANALYSIS_SCHEMA = {
+    "championName": "category",
+    "kills": "int16",
+    "deaths": "int16",
+    "assists": "int16",
+    "win": "boolean",
+    "neutralMinionsKilled": "int16",
+    "totalMinionsKilled": "int16",
+    "timePlayed": "int32",
+    "visionScore": "int16",
+    "individualPosition": "category",
+    "role": "category",
+    "teamPosition": "category",
+    "lane": "category",
+    "gameCreation": "Int64",
+}
+
+
+def player_data_path(summoner_name, file_format="csv"):
+    """
+    Finds where a summoner's data is saved
+
+    Args:
+        summoner_name: A string representing the name of the summoner
+        file_format: A string representing the file format, one of
+            FILE_FORMATS
+
+    Returns:
+        A string representing the path to the summoner's data file
+    """
+    return f"data/{summoner_name}.{file_format}"
+
+
+def _as_dict(value):
+    """
+    Turns a dictionary, or the JSON or Python repr of one written to a .csv
+    file, into a dictionary
+    """
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return ast.literal_eval(value)
+    return {}
+
+
+def _repr_as_json(text):
+    """
+    Rewrites the Python repr of a dictionary as JSON, or returns None if it
+    holds strings that cannot be rewritten safely
+    """
+    simple = True
+
+    def replace(match):
+        nonlocal simple
+        single, double, word, stray = match.groups()
+        if single is not None:
+            return f'"{single}"'
+        if double is not None:
+            return double
+        if word is not None:
+            return _JSON_WORDS[word]
+        simple = False
+        return stray
+
+    json_text = _REPR_TOKENS.sub(replace, text)
+    return json_text if simple else None
+
+
+def _loads_all(texts):
+    """
+    Parses a list of JSON texts in a single json.loads call, returning None
+    if any of them is not a JSON dictionary
+    """
+    try:
+        records = json.loads("[" + ",".join(texts) + "]")
+    except json.JSONDecodeError:
+        return None
+    if len(records) != len(texts) or not all(
+        isinstance(record, dict) for record in records
+    ):
+        return None
+    return records
+
+
+def _decode_dicts(values):
+    """
+    Decodes a column of dictionaries and the text of them read from a .csv
+    file. Files written by save_player_data hold JSON, which is parsed for
+    the whole column in a single json.loads call. Older files hold Python
+    reprs, which are rewritten as JSON and then parsed the same way. Reprs
+    with only plain strings and numbers, like those of the Riot API's
+    dictionaries, just have their quotes swapped for the whole column at
+    once. Only the reprs that cannot be rewritten safely, like ones holding
+    strings with escapes, or that do not parse, are parsed one at a time
+    with ast.literal_eval.
+
+    Args:
+        values: A Series holding dictionaries, JSON or repr strings of them
+            or missing values
+
+    Returns:
+        A list of dictionaries, empty for missing values
+    """
+    if not values.map(lambda value: isinstance(value, str)).all():
+        return [_as_dict(value) for value in values]
+    records = _loads_all(values)
+    if records is not None:
+        return records
+
+    json_texts = [
+        _repr_as_json(value) if needs_tokens else swapped
+        for value, swapped, needs_tokens in zip(
+            values,
+            values.str.translate(_SWAP_QUOTES),
+            values.str.contains(_REPR_NEEDS_TOKENS),
+        )
+    ]
+    records = _loads_all([text or "null" for text in json_texts])
+    if records is not None:
+        return records
+    records = []
+    for value, text in zip(values, json_texts):
+        record = None if text is None else _loads_all([text])
+        records.append(_as_dict(value) if record is None else record[0])
+    return records
+
+
+def _has_nested(records):
+    """
+    Finds whether any dictionary in a list holds a nested dictionary
+    """
+    return any(
+        isinstance(value, dict) for record in records for value in record.values()
+    )
+
+
+def _dicts_as_json(player_stats):
+    """
+    Makes a copy of player data with its dictionaries, like `challenges` and
+    `perks`, written as JSON text, so a .csv file of it can be decoded in
+    bulk by _decode_dicts
+    """
+    encoded = {}
+    for column in player_stats.columns[player_stats.dtypes == object]:
+        if player_stats[column].map(lambda value: isinstance(value, dict)).any():
+            encoded[column] = player_stats[column].map(
+                lambda value: json.dumps(value) if isinstance(value, dict) else value
+            )
+    return player_stats.assign(**encoded)
+
+
+def decode_dict_column(values, prefix, sparse_threshold=None):
+    """
+    Turns a column of dictionaries, like `challenges` or `perks` as read from
+    a .csv file, into a wide frame with one typed column per key. Nested
+    dictionaries are flattened into dotted column names and lists are kept
+    as lists.
+
+    Args:
+        values: A Series holding dictionaries, repr strings of them or
+            missing values
+        prefix: A string put before every column name, such as "challenges"
+        sparse_threshold: A float representing the fraction of rows a key
+            must be present in to get a dense column, or None to make every
+            column dense. Rarer keys get sparse columns.
+
+    Returns:
+        A DataFrame with the same index as values and a `[prefix].[key]`
+        column for every key
+    """
+    values = values.where(values.notna(), "{}")
+    records = _decode_dicts(values)
+    if _has_nested(records):
+        wide = pd.json_normalize(records, sep=".")
+        wide.index = values.index
+    else:
+        wide = pd.DataFrame.from_records(records, index=values.index)
+    wide.columns = [f"{prefix}.{column}" for column in wide.columns]
+    if sparse_threshold is not None:
+        present = wide.notna().mean()
+        for column in wide.columns[present < sparse_threshold]:
+            if wide[column].dtype.kind in "biuf":
+                wide[column] = wide[column].astype(pd.SparseDtype(float))
+    return wide
+
+
+def flatten_player_data(player_stats):
+    """
+    Makes a copy of player data that can be stored in typed columns. Each
+    key of the `challenges` and `perks` dictionaries becomes its own
+    `challenges.[key]` or `perks.[key]` column, and lists are stored as JSON
+    text.
+
+    Args:
+        player_stats: A DataFrame holding a player's stats from various
+            matches, as scraped or as read from a .csv file
+
+    Returns:
+        A new DataFrame with only scalar columns
+    """
+    columns = {}
+    for column in player_stats.columns:
+        if column in ("challenges", "perks"):
+            wide = decode_dict_column(player_stats[column], column)
+            for key in wide.columns:
+                columns[key] = wide[key]
+        else:
+            columns[column] = player_stats[column]
+    flat_stats = pd.DataFrame(columns, index=player_stats.index)
+
+    # Lists, like challenges.legendaryItemUsed, are stored as JSON text
+    for column in flat_stats.columns[flat_stats.dtypes == object]:
+        if flat_stats[column].map(lambda value: isinstance(value, list)).any():
+            flat_stats[column] = flat_stats[column].map(
+                lambda value: json.dumps(value) if isinstance(value, list) else None
+            )
+    return flat_stats.infer_objects()
+
+
+def save_player_data(player_stats, filepath):
+    """
+    Saves player data in the format given by the file extension. Columnar
+    formats are flattened first, and dictionaries in .csv files are written
+    as JSON. Older versions wrote them as Python reprs, so files saved now
+    cannot be read by those versions, though load_player_data still reads
+    files in either format. The file is written to a temporary file and
+    renamed, so it is never left half written.
+
+    Args:
+        player_stats: A DataFrame holding a player's stats, indexed by match id
+        filepath: A string representing the path to a .csv, .parquet or
+            .arrow file
+    """
+    if filepath.endswith(".csv"):
+        write_csv_atomic(_dicts_as_json(player_stats), filepath)
+        return
+
+    table = pa.Table.from_pandas(
+        flatten_player_data(player_stats).rename_axis(INDEX_COLUMN).reset_index(),
+        preserve_index=False,
+    )
+    temp_path = f"{filepath}.tmp"
+    if filepath.endswith(".parquet"):
+        pq.write_table(table, temp_path)
+    else:
+        with pa.OSFile(temp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(temp_path, filepath)
+
+
+def _present_columns(names, columns):
+    """
+    Picks the columns to read from a columnar file, see load_player_data
+
+    Args:
+        names: A list of strings representing the columns in the file
+        columns: A list of strings representing the requested columns, or
+            None for every column
+
+    Returns:
+        A list of strings holding the index column and the requested columns
+        in the file, or None to read every column
+    """
+    if columns is None:
+        return None
+    return [INDEX_COLUMN, *[column for column in columns if column in names]]
+
+
+def load_player_data(filepath, columns=None, memory_map=True):
+    """
+    Loads player data saved by save_player_data
+
+    Args:
+        filepath: A string representing the path to a .csv, .parquet or
+            .arrow file
+        columns: A list of strings representing the columns to load, or None
+            to load every column. Only the requested columns are read from
+            columnar files, and requested columns missing from the file are
+            left out.
+        memory_map: A boolean representing whether to memory map columnar
+            files instead of reading them into memory, so only the parts of
+            the file holding the requested columns are read from disk
+
+    Returns:
+        A DataFrame holding the player's stats, indexed by match id
+    """
+    if filepath.endswith(".csv"):
+        if columns is None:
+            return pd.read_csv(filepath, index_col=0)
+        # The unnamed first column of the .csv file holds the match ids
+        return pd.read_csv(
+            filepath,
+            index_col=0,
+            usecols=lambda column: column == "Unnamed: 0" or column in columns,
+        )
+
+    if filepath.endswith(".parquet"):
+        names = pq.read_schema(filepath, memory_map=memory_map).names
+        read_columns = _present_columns(names, columns)
+        table = pq.read_table(filepath, columns=read_columns, memory_map=memory_map)
+    else:
+        source = pa.memory_map(filepath) if memory_map else pa.OSFile(filepath)
+        table = pa.ipc.open_file(source).read_all()
+        read_columns = _present_columns(table.schema.names, columns)
+        if read_columns is not None:
+            table = table.select(read_columns)
+    player_stats = table.to_pandas().set_index(INDEX_COLUMN)
+    player_stats.index.name = None
+    return player_stats
+
+
+def compact_player_data(player_stats):
+    """
+    Keeps only the columns the analysis reads and converts them to the
+    compact types in ANALYSIS_SCHEMA
+
+    Args:
+        player_stats: A DataFrame holding a player's stats, indexed by match
+            id
+
+    Returns:
+        A new DataFrame holding the columns of ANALYSIS_SCHEMA that are in
+        player_stats, with empty rows dropped
+    """
+    columns = [column for column in ANALYSIS_SCHEMA if column in player_stats]
+    return (
+        player_stats[columns]
+        .dropna(how="all")
+        .astype({column: ANALYSIS_SCHEMA[column] for column in columns})
+    )
+
+
+def load_analysis_data(filepath, memory_map=True):
+    """
+    Loads the columns of a player's data file the analysis reads, in the
+    compact types in ANALYSIS_SCHEMA
+
+    Args:
+        filepath: A string representing the path to a .csv, .parquet or
+            .arrow file
+        memory_map: A boolean representing whether to memory map columnar
+            files, see load_player_data
+
+    Returns:
+        A DataFrame holding the player's stats, indexed by match id
+    """
+    columns = list(ANALYSIS_SCHEMA)
+    if filepath.endswith(".csv"):
+        # Reading with the compact types skips building object columns
+        # first, but empty rows have to be dropped before integers can be
+        # parsed, so only the strings are parsed straight to categoricals
+        player_stats = pd.read_csv(
+            filepath,
+            index_col=0,
+            usecols=lambda column: column == "Unnamed: 0" or column in columns,
+            dtype={
+                column: dtype
+                for column, dtype in ANALYSIS_SCHEMA.items()
+                if dtype == "category"
+            },
+        )
+    else:
+        player_stats = load_player_data(filepath, columns, memory_map)
+    return compact_player_data(player_stats)
+
+
+def migrate_player_data(filepath, file_format="parquet", remove=False):
+    """
+    Converts a .csv file written by the scraper into a columnar file next to
+    it, decoding its `challenges` and `perks` columns once so they never have
+    to be parsed again
+
+    Args:
+        filepath: A string representing the path to the .csv file
+        file_format: A string representing the format to convert to,
+            "parquet" or "arrow"
+        remove: A boolean representing whether to delete the .csv file once
+            it has been converted
+
+    Returns:
+        A string representing the path to the new file
+    """
+    new_filepath = f"{os.path.splitext(filepath)[0]}.{file_format}"
+    player_stats = pd.read_csv(filepath, index_col=0).dropna(how="all")
+    save_player_data(player_stats, new_filepath)
+    if remove:
+        os.remove(filepath)
+    return new_filepath
+
+
+def main():
+    """
+    Converts every .csv file in a directory into a columnar file from the
+    command line
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--format", choices=FILE_FORMATS[1:], default="parquet")
+    parser.add_argument(
+        "--remove", action="store_true", help="delete each .csv file once converted"
+    )
+    args = parser.parse_args()
+
+    for filename in sorted(os.listdir(args.directory)):
+        if not filename.endswith(".csv"):
+            continue
+        filepath = os.path.join(args.directory, filename)
+        new_filepath = migrate_player_data(filepath, args.format, args.remove)
+        print(f"{filepath} -> {new_filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,26 @@
 Class for League Wrapped ui
 """
 
-from io import BytesIO
-import math
-from tkinter import Tk, Canvas, Entry, StringVar, OptionMenu, Button, NW
+from tkinter import Tk, Canvas, Entry, StringVar, OptionMenu, Button
 from riotwatcher import LolWatcher
-from PIL import Image, ImageTk
-import requests
+from PIL import ImageTk
 import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
-from modules.scraper import get_data_from_matchlist, get_season_matchlist
-from modules.analysis import most_deaths, worst_kda, least_cs, worst_vs, worst_winrate
+from modules.scrape_task import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    MATCHLIST,
+    PROGRESS,
+    ScrapeTask,
+    describe_eta,
+)
+from modules.analysis import compute_report
+from modules.analysis_cache import DEFAULT_CACHE_PATH, AnalysisCache
+from modules.atlas import REMOTE_SIZE
+from modules.image_store import ImageStore
+from modules.rate_limit import RateLimiter, attach_rate_limiter
+from modules.slides import SLIDES, SlideDeck
 
 # Colors
 
@@ -24,6 +34,9 @@ SCALE = 0.7
 WIDTH = 720 * SCALE
 HEIGHT = 1280 * SCALE
 
+# Milliseconds between checks for progress from the background scrape
+POLL_MS = 100
+
 
 def show_image(file_path):
     """
@@ -47,7 +60,12 @@ class LeagueWrappedUI:
     Attributes
     ----------
     player_data : DataFrame
-        player's statistics scraped using Riot API
+        player's statistics scraped using Riot API, in the compact types
+        of ANALYSIS_SCHEMA
+    report : WrappedReport
+        player's lowlights, worked out once from player_data
+    analysis_cache : AnalysisCache
+        reports worked out before, so reloading a player is free
     user : str
         player's username
     matchlist : list
@@ -56,48 +74,78 @@ class LeagueWrappedUI:
         Riot's code for the player's region
     key : str
         API key
+    watcher : LolWatcher
+        watcher using the API key, shared by every scrape
+    rate_limiter : RateLimiter
+        requests made with the API key, shared by every scrape so resuming
+        does not start from an empty budget
     canvas : Canvas
         background that the ui goes on
-    images : dict
-        dictionary of PhotoImages containing all the images necessary for the ui
+    images : ImageStore
+        PhotoImages of the splash and loading screens, and the champion
+        squares the slides are composited from, loaded when a slide needs
+        them
+    scrape_task : ScrapeTask
+        scrape running in the background while the loading screen is shown,
+        or None
+    scrape_button : int
+        canvas item of the button under the progress bar, or None
+    progress_bar : int
+        canvas item of the filled part of the progress bar
+    progress_text : int
+        canvas item of the text under the progress bar
+    slides : SlideDeck
+        player's slides, each composited once, or None
+    slide_image : int
+        canvas item the current slide is shown in
+    slide_button : Button
+        button that shows the next slide
+    slide_window : int
+        canvas item holding slide_button
 
     Methods
     -------
     make_images():
-        Creates all PhotoImage objects that are not champion squares and
-        puts them in the images dictionary.
-    make_champ_images():
-        Creates all champion square PhotoImage objects and
+        Creates the PhotoImage objects of the splash and loading screens and
         puts them in the images dictionary.
     go_loading_screen():
         Shows loading screen, includes input username and region
-        code from initial screen.
+        code from initial screen, and starts the scrape.
+    start_scrape():
+        Starts scraping the player's season on a background thread, picking up
+        where a cancelled scrape stopped, and shows a cancel button.
+    show_scrape_button():
+        Shows a button under the progress bar, replacing the last one.
+    poll_scrape():
+        Shows the messages sent by the background scrape since the last poll,
+        and polls again until the scrape is over.
     load_player_data():
-        Creates watcher object, list of match ids, and dataframe of player data.
-        Puts list of match ids in matchlist attribute and dataframe of
-        player data in player_data attribute.
-    show_death_wrap():
-        Visualizes the champion the player has died the most on and the number of deaths.
-    show_kda_wrap():
-        Visualizes the bottom five champions the player has the worst kda
-        with and the five worst kdas.
-    show_farm_wrap():
-        Visualizes the champion the player has the worst farm on and amount of farm per minute.
-    show_winrate_wrap():
-        Visualizes the five champions the player has the worst winrate with
-        and the five worst winrates.
-    show_vision_wrap():
-        Visualizes the champion the player has gotten the worst vision with in one game
-        and the vision score from that game.
+        Puts the scraped player data in the player_data attribute, works out
+        the player's lowlights and shows the first slide.
+    show_slide():
+        Shows a slide, from the death, kda, farm, winrate, vision and tilt
+        slides in order, and renders the next one in the background.
     """
 
     def __init__(self):
         # Create scale and attributes related to API use
         self.player_data = None
+        self.report = None
+        self.analysis_cache = AnalysisCache(path=DEFAULT_CACHE_PATH)
         self.user = None
         self.matchlist = None
         self.region_code = None
         self.key = None
+        self.watcher = None
+        self.rate_limiter = None
+        self.scrape_task = None
+        self.scrape_button = None
+        self.progress_bar = None
+        self.progress_text = None
+        self.slides = None
+        self.slide_image = None
+        self.slide_button = None
+        self.slide_window = None
 
         # Create window
         window = Tk()
@@ -108,8 +156,7 @@ class LeagueWrappedUI:
         self.canvas.grid(row=0, column=0)
 
         # Save images
-        self.images = {}
-        self.make_champ_images()
+        self.images = ImageStore.from_manifest(scale=SCALE)
         self.make_images()
 
         # Create season 12 splash
@@ -199,79 +246,20 @@ class LeagueWrappedUI:
 
     def make_images(self):
         """
-        Creates all PhotoImage objects that are not champion squares and
-        puts them in the images dictionary.
-        """
-        # Make backgrounds
-        death_bg = Image.open("assets/TEMPLATE_deaths.jpg")
-        death_bg = death_bg.resize((int(WIDTH), int(HEIGHT)))
-        self.images["death_bg"] = ImageTk.PhotoImage(death_bg)
-
-        kda_bg = Image.open("assets/TEMPLATE_kda.jpg")
-        kda_bg = kda_bg.resize((int(WIDTH), int(HEIGHT)))
-        self.images["kda_bg"] = ImageTk.PhotoImage(kda_bg)
-
-        farm_bg = Image.open("assets/TEMPLATE_farm.jpg")
-        farm_bg = farm_bg.resize((int(WIDTH), int(HEIGHT)))
-        self.images["farm_bg"] = ImageTk.PhotoImage(farm_bg)
-
-        vision_bg = Image.open("assets/TEMPLATE_vision.jpg")
-        vision_bg = vision_bg.resize((int(WIDTH), int(HEIGHT)))
-        self.images["vision_bg"] = ImageTk.PhotoImage(vision_bg)
-
-        winrate_bg = Image.open("assets/TEMPLATE_winrate.jpg")
-        winrate_bg = winrate_bg.resize((int(WIDTH), int(HEIGHT)))
-        self.images["winrate_bg"] = ImageTk.PhotoImage(winrate_bg)
-
-        # Make poros/loading image
-        # pylint: disable=line-too-long
-        loading_url = "https://nexus.leagueoflegends.com/wp-content/uploads/2018/11/poros_banner-1_slno1owbdsxulmdvqomp.jpg"
-        pull = requests.get(loading_url, timeout=30)
-        loading = Image.open(BytesIO(pull.content))
-        loading = loading.resize((int(1276 * 0.375), int(718 * 0.375)))
-        self.images["poros"] = ImageTk.PhotoImage(loading)
-
-        # Make splash image
-        # pylint: disable=line-too-long
-        splash_url = "https://cdn1.epicgames.com/offer/24b9b5e323bc40eea252a10cdd3b2f10/LOL_2560x1440-98749e0d718e82d27a084941939bc9d3"
-        pull = requests.get(splash_url, timeout=30)
-        splash = Image.open(BytesIO(pull.content))
-        splash = splash.resize((int(1276 * 0.375), int(718 * 0.375)))
-        splash_img = ImageTk.PhotoImage(splash)
-        self.images["splash"] = splash_img
-
-    def make_champ_images(self):
-        """
-        Creates all champion square PhotoImage objects and
-        puts them in the images dictionary.
+        Creates the PhotoImage objects of the splash and loading screens and
+        puts them in the images dictionary. Slides, backgrounds included,
+        are composited by the SlideDeck.
         """
-        # Make champ images
-        champ_request = requests.get(
-            "http://ddragon.leagueoflegends.com/cdn/13.6.1/data/en_US/champion.json",
-            timeout=30,
-        )
-        champ_dic = champ_request.json()
-        for champ in champ_dic["data"]:
-            image_url = f"http://ddragon.leagueoflegends.com/cdn/13.6.1/img/champion/{champ}.png"
-            img_request = requests.get(image_url, timeout=30)
-            champ_img = Image.open(BytesIO(img_request.content))
-
-            champ_img4 = champ_img.resize((int(405 * SCALE), int(405 * SCALE)))
-            self.images[f"{champ}4"] = ImageTk.PhotoImage(champ_img4)
-
-            champ_img3 = champ_img.resize((int(400 * SCALE), int(400 * SCALE)))
-            self.images[f"{champ}3"] = ImageTk.PhotoImage(champ_img3)
-
-            champ_img2 = champ_img.resize((int(200 * SCALE), int(200 * SCALE)))
-            self.images[f"{champ}2"] = ImageTk.PhotoImage(champ_img2)
-
-            champ_img1 = champ_img.resize((int(167 * SCALE), int(167 * SCALE)))
-            self.images[f"{champ}1"] = ImageTk.PhotoImage(champ_img1)
+        for name in ["poros", "splash"]:
+            image = self.images.prerendered(name)
+            if image is None:
+                image = self.images.remote_image(name).resize(REMOTE_SIZE)
+            self.images[name] = ImageTk.PhotoImage(image)
 
     def go_loading_screen(self, user_entry, key_entry, dropdown_value, regions):
         """
         Shows loading screen, includes input username and region
-        code from initial screen.
+        code from initial screen, and starts the scrape.
         """
         # Clear ui
         self.canvas.delete("all")
@@ -281,12 +269,9 @@ class LeagueWrappedUI:
         self.key = key_entry.get()
         region = dropdown_value.get()
         self.region_code = regions[region]
-
-        # Load data
-        watcher = LolWatcher(api_key=self.key)
-        self.matchlist = get_season_matchlist(
-            watcher=watcher, summoner_name=self.user, region=self.region_code
-        )
+        self.watcher = LolWatcher(api_key=self.key)
+        self.rate_limiter = RateLimiter()
+        attach_rate_limiter(self.watcher, self.rate_limiter)
 
         # Loading text
         self.canvas.create_text(
@@ -313,331 +298,131 @@ class LeagueWrappedUI:
             justify="center",
         )
 
-        # Estimation text
-        eta = 2 * (math.ceil(len(self.matchlist) / 100) - 1)
-        self.canvas.create_text(
+        # Progress bar and estimation text
+        self.canvas.create_rectangle(
+            WIDTH * 0.125, 670, WIDTH * 0.875, 690, outline=YELLOW
+        )
+        self.progress_bar = self.canvas.create_rectangle(
+            WIDTH * 0.125, 670, WIDTH * 0.125, 690, fill=YELLOW, outline=""
+        )
+        self.progress_text = self.canvas.create_text(
             WIDTH / 2,
-            700,
+            730,
             width=WIDTH * 0.75,
-            text=f"Estimated wait time is {eta} minutes.\nClick below to continue.",
+            text="Finding your matches...",
             fill=YELLOW,
             font=("Arial", 18),
             justify="center",
         )
 
-        # Continue button
-        cont = Button(
-            master=self.canvas,
-            text="Show Me Stats!",
-            command=lambda: self.load_player_data(watcher),
-        )
-        self.canvas.create_window(WIDTH / 2, 800, window=cont)
+        self.start_scrape()
 
-    def load_player_data(self, watcher):
+    def start_scrape(self):
         """
-        Creates watcher object, list of match ids, and dataframe of player data.
-        Puts list of match ids in matchlist attribute and dataframe of
-        player data in player_data attribute.
+        Starts scraping the player's season on a background thread, picking up
+        where a cancelled scrape stopped, and shows a cancel button.
         """
-
-        # Get player data
-        self.player_data = get_data_from_matchlist(
-            watcher, self.user, self.matchlist, self.region_code
+        self.scrape_task = ScrapeTask(
+            self.watcher,
+            self.user,
+            self.region_code,
+            rate_limiter=self.rate_limiter,
         )
+        self.scrape_task.start()
+        self.show_scrape_button("Cancel", self.scrape_task.cancel)
+        self.canvas.after(POLL_MS, self.poll_scrape)
 
-        # Clear ui
-        self.canvas.delete("all")
-
-        # Show deaths wrap
-        self.show_death_wrap()
-
-    def show_death_wrap(self):
+    def show_scrape_button(self, text, command):
         """
-        Visualizes the champion the player has died the most on and the number of deaths.
+        Shows a button under the progress bar, replacing the last one.
         """
-        # Analyze for death
-        death_data = most_deaths(self.player_data)
-
-        # Add background
-        self.canvas.create_image(WIDTH / 2, HEIGHT / 2, image=self.images["death_bg"])
-
-        # Add champ images
-        champ = death_data[1]
-        self.canvas.create_image(
-            160 * SCALE,
-            360 * SCALE,
-            anchor=NW,
-            image=self.images[f"{champ}3"],
-        )
+        if self.scrape_button is not None:
+            self.canvas.delete(self.scrape_button)
+        button = Button(master=self.canvas, text=text, command=command)
+        self.scrape_button = self.canvas.create_window(WIDTH / 2, 800, window=button)
 
-        # Add text
-        deaths = death_data[0]
-        self.canvas.create_text(
-            WIDTH / 2,
-            700,
-            width=WIDTH * 0.7,
-            # pylint: disable=line-too-long
-            text=f"In Season 12, your most deaths in one game was {deaths} deaths on {champ}. You filthy inter.",
-            fill=YELLOW,
-            font=("Arial", 12),
-            justify="center",
-        )
-
-        # Continue button
-        cont = Button(
-            master=self.canvas, text="Show Me Stats!", command=self.show_kda_wrap
-        )
-        self.canvas.create_window(WIDTH / 2, 800, window=cont)
-
-    def show_kda_wrap(self):
+    def poll_scrape(self):
         """
-        Visualizes the bottom five champions the player has the worst kda
-        with and the five worst kdas.
+        Shows the messages sent by the background scrape since the last poll,
+        and polls again until the scrape is over.
         """
-        # Clear ui
-        self.canvas.delete("all")
-
-        # Analyze for KDAs
-        kda_data = worst_kda(self.player_data)
-
-        # Add background
-        self.canvas.create_image(WIDTH / 2, HEIGHT / 2, image=self.images["kda_bg"])
-
-        # Add champ images
-        horrible_kdas = []
-        for kda in kda_data:
-            horrible_kdas.append(kda["champ"])
-
-        self.canvas.create_image(
-            57 * SCALE,
-            392 * SCALE,
-            anchor=NW,
-            image=self.images[f"{horrible_kdas[0]}4"],
-        )
-
-        y_disp = 360
-
-        for champ in horrible_kdas[1:]:
-            self.canvas.create_image(
-                521 * SCALE,
-                y_disp * SCALE,
-                anchor=NW,
-                image=self.images[f"{champ}1"],
-            )
-            y_disp += 187
-
-        # Add text
-        ytext = 615
-        kda_list = []
-
-        for kda in kda_data:
-            kda_list.append(round(kda["kda"], 2))
-
-        kda_texts = {}
-        for i, champ in enumerate(horrible_kdas):
-            kda_num = self.canvas.create_text(
-                WIDTH / 15,
-                ytext,
-                width=WIDTH * 0.7,
-                text=f"{kda_list[i]}",
-                fill=BLACK,
-                font=("Arial", 14, "bold"),
-                anchor="w",
-            )
-            kda_champ = self.canvas.create_text(
-                WIDTH / 4,
-                ytext,
-                width=WIDTH * 0.7,
-                text=f"{champ}",
-                fill=BLACK,
-                font=("Arial", 14, "bold"),
-                anchor="w",
-            )
-            kda_texts[f"{i}"] = kda_champ
-            kda_texts[f"{i}"] = kda_num
-            if i == 4:
-                self.canvas.itemconfig(kda_num, fill=YELLOW)
-                self.canvas.itemconfig(kda_champ, fill=YELLOW)
-            ytext += 31
-
-        # Continue button
-        cont = Button(
-            master=self.canvas, text="Show Me Stats!", command=self.show_farm_wrap
-        )
-        self.canvas.create_window(WIDTH / 2, 800, window=cont)
-
-    def show_farm_wrap(self):
+        for message in self.scrape_task.poll():
+            kind = message[0]
+            if kind == MATCHLIST:
+                self.matchlist = message[1]
+            elif kind == PROGRESS:
+                _, done, total, eta = message
+                filled = WIDTH * 0.75 * done / max(total, 1)
+                self.canvas.coords(
+                    self.progress_bar,
+                    WIDTH * 0.125,
+                    670,
+                    WIDTH * 0.125 + filled,
+                    690,
+                )
+                self.canvas.itemconfigure(
+                    self.progress_text,
+                    text=f"{done} of {total} matches, {describe_eta(eta)}",
+                )
+            elif kind == DONE:
+                self.load_player_data(message[1])
+                return
+            elif kind == CANCELLED:
+                self.canvas.itemconfigure(
+                    self.progress_text,
+                    text="Stopped. Your matches so far are saved.",
+                )
+                self.show_scrape_button("Resume", self.start_scrape)
+                return
+            elif kind == FAILED:
+                self.canvas.itemconfigure(
+                    self.progress_text, text=f"Something went wrong: {message[1]}"
+                )
+                self.show_scrape_button("Try Again", self.start_scrape)
+                return
+        self.canvas.after(POLL_MS, self.poll_scrape)
+
+    def load_player_data(self, player_data):
         """
-        Visualizes the champion the player has the worst farm on and amount of farm per minute.
+        Puts the scraped player data in the player_data attribute, works out
+        the player's lowlights and shows the first slide.
         """
-        # Clear ui
-        self.canvas.delete("all")
-
-        # Analyze for farm
-        farm_data = least_cs(self.player_data)
-
-        # Add background
-        self.canvas.create_image(WIDTH / 2, HEIGHT / 2, image=self.images["farm_bg"])
-
-        # Add champ image
-        champ = farm_data[1]
-        self.canvas.create_image(
-            160 * SCALE,
-            360 * SCALE,
-            anchor=NW,
-            image=self.images[f"{champ}3"],
+        self.player_data = player_data
+        self.report = self.analysis_cache.call(compute_report, self.player_data)
+        self.scrape_task = None
+        self.scrape_button = None
+        if self.slides is not None:
+            self.slides.close()
+        self.slides = SlideDeck(
+            self.report, self.images, SCALE, make_photo=ImageTk.PhotoImage
         )
 
-        # Add text
-        farm = farm_data[0]
-        self.canvas.create_text(
-            WIDTH / 2,
-            700,
-            width=WIDTH * 0.7,
-            # pylint: disable=line-too-long
-            text=f"In Season 12, your worst cs per minute when not playing support was {round(farm, 1)} on {champ}. Maybe you should play support instead.",
-            fill=YELLOW,
-            font=("Arial", 12),
-            justify="center",
+        # Clear ui, then make the one image and button every slide reuses
+        self.canvas.delete("all")
+        self.slide_image = self.canvas.create_image(WIDTH / 2, HEIGHT / 2)
+        self.slide_button = Button(master=self.canvas, text="Show Me Stats!")
+        self.slide_window = self.canvas.create_window(
+            WIDTH / 2, 800, window=self.slide_button
         )
 
-        # Continue button
-        cont = Button(
-            master=self.canvas, text="Show Me Stats!", command=self.show_winrate_wrap
-        )
-        self.canvas.create_window(WIDTH / 2, 800, window=cont)
+        # Show deaths slide
+        self.show_slide(0)
 
-    def show_winrate_wrap(self):
+    def show_slide(self, index):
         """
-        Visualizes the five champions the player has the worst winrate with
-        and the five worst winrates.
-        """
-        # Clear ui
-        self.canvas.delete("all")
-
-        # Analyze for winrate
-        wr_data = worst_winrate(self.player_data)
-
-        # Add background
-        self.canvas.create_image(WIDTH / 2, HEIGHT / 2, image=self.images["winrate_bg"])
-
-        # Add champ images
-        horrible_wr_champs = []
-        for wr_dic in wr_data:
-            horrible_wr_champs.append(wr_dic["champ"])
-
-        y_disp = 133
-
-        for champ in horrible_wr_champs:
-            # pilImage = Image.open(BytesIO(r.content)).resize(
-            #     (int(200 * scale), int(200 * scale))
-            # )
-            self.canvas.create_image(
-                199 * SCALE,
-                y_disp * SCALE,
-                anchor=NW,
-                image=self.images[f"{champ}2"],
-            )
-            y_disp += 210
-
-        # Add winrate text
-        y_disp = 150
-        winrates = []
-        for wr_dic in wr_data:
-            winrates.append(round(wr_dic["winrate"] * 100))
-        wr_texts = {}
-        for i in range(len(horrible_wr_champs)):
-            wr_text = self.canvas.create_text(
-                WIDTH / 4,
-                y_disp,
-                width=WIDTH * 0.7,
-                text=f"{winrates[i]}%",
-                fill=BLACK,
-                font=("Arial", 40, "bold"),
-                anchor="e",
-            )
-            y_disp += 157
-            wr_texts[f"{i}"] = wr_text
-
-        # Add champ text
-        y_disp = 140
-        champ_texts = {}
-        for i, champ in enumerate(horrible_wr_champs):
-            wr_text = self.canvas.create_text(
-                3 * WIDTH / 5,
-                y_disp,
-                width=WIDTH * 0.7,
-                text=f"{champ}",
-                fill=BLACK,
-                font=("Arial", 16, "bold"),
-                anchor="w",
-            )
-            y_disp += 157
-            champ_texts[f"{i}"] = wr_text
-
-        # Add games played text
-        y_disp = 170
-        games_played = []
-        for wr_dic in wr_data:
-            games_played.append(wr_dic["games_played"])
-        games_texts = {}
-        for i in range(len(horrible_wr_champs)):
-            games_text = self.canvas.create_text(
-                3 * WIDTH / 5,
-                y_disp,
-                width=WIDTH * 0.7,
-                text=f"{games_played[i]} games played",
-                fill=BLACK,
-                font=("Arial", 14),
-                anchor="w",
-            )
-            y_disp += 157
-            games_texts[f"{i}"] = games_text
-
-        # Continue button
-        cont = Button(
-            master=self.canvas, text="Show Me Stats!", command=self.show_vision_wrap
-        )
-        self.canvas.create_window(WIDTH / 2, 850, window=cont)
+        Shows a slide by swapping the composited image into the slide image,
+        and starts rendering the next slide in the background.
 
-    def show_vision_wrap(self):
+        Args:
+            index: An integer representing the slide's position in SLIDES
         """
-        Visualizes the champion the player has gotten the worst vision with in one game
-        and the vision score from that game.
-        """
-        # Clear ui
-        self.canvas.delete("all")
-
-        # Analyze for vision
-        vision_data = worst_vs(self.player_data)
-
-        # Add background
-        self.canvas.create_image(WIDTH / 2, HEIGHT / 2, image=self.images["vision_bg"])
-
-        # Add champ image
-        champ = vision_data[1]
-        self.canvas.create_image(
-            160 * SCALE,
-            360 * SCALE,
-            anchor=NW,
-            image=self.images[f"{champ}3"],
-        )
-
-        # Add text
-        vision_score = vision_data[0]
-        self.canvas.create_text(
-            WIDTH / 2,
-            700,
-            width=WIDTH * 0.7,
-            # pylint: disable=line-too-long
-            text=f"In Season 12, your worst vision score per minute was {round(vision_score, 2)} on {champ}. Lee Sin support cosplay is not cool.",
-            fill=YELLOW,
-            font=("Arial", 12),
-            justify="center",
-        )
+        name = SLIDES[index]
+        next_index = (index + 1) % len(SLIDES)
+        self.canvas.itemconfigure(self.slide_image, image=self.slides.photo(name))
 
-        # Continue button
-        cont = Button(
-            master=self.canvas, text="Show Me Stats!", command=self.show_death_wrap
+        # The winrate slide fills more of the screen, so its button is lower
+        self.canvas.coords(
+            self.slide_window, WIDTH / 2, 850 if name == "winrate" else 800
         )
-        self.canvas.create_window(WIDTH / 2, 800, window=cont)
+        self.slide_button.configure(command=lambda: self.show_slide(next_index))
+        self.slides.prefetch(SLIDES[next_index])
@@ -2,21 +2,21 @@
 Check the correctness of analysis functions
 """
 
-import sys
 import pandas as pd
-
-sys.path.append("./modules")
-
-# pylint: disable=import-error, wrong-import-position
-from analysis import (
+from modules.analysis import (
+    compute_report,
     least_cs,
+    longest_loss_streak,
     most_deaths,
+    worst_day,
     worst_kda,
+    worst_rolling_kda,
     worst_vs,
     worst_winrate,
 )
+from modules.storage import load_analysis_data
 
-IAN_DATA = pd.read_csv("./data/Among Us Jimin.csv", index_col=0)
+IAN_DATA = load_analysis_data("./data/Among Us Jimin.csv")
 
 
 def test_least_cs():
@@ -64,3 +64,86 @@ def test_worst_winrate():
         {"champ": "Kaisa", "winrate": 0.3, "games_played": 10},
         {"champ": "Quinn", "winrate": 0.3333333333333333, "games_played": 6},
     ]
+
+
+def test_worst_kda_ties():
+    """
+    Test champions with the same KDA are kept in the order first played
+    """
+    tied_data = pd.DataFrame(
+        {
+            "championName": ["Zed", "Ahri", "Zed", "Lux", "Ahri"],
+            "kills": [1, 1, 1, 0, 0],
+            "deaths": [2, 2, 2, 1, 2],
+            "assists": [0, 0, 0, 0, 1],
+        }
+    )
+    assert [champ["champ"] for champ in worst_kda(tied_data)] == [
+        "Lux",
+        "Zed",
+        "Ahri",
+    ]
+
+
+def test_compute_report():
+    """
+    Test compute_report matches each analysis function and does not change
+    the player data
+    """
+    columns = list(IAN_DATA.columns)
+    report = compute_report(IAN_DATA)
+    assert list(IAN_DATA.columns) == columns
+    assert report.most_deaths == most_deaths(IAN_DATA)
+    assert report.least_cs == least_cs(IAN_DATA)
+    assert list(report.worst_winrate) == worst_winrate(IAN_DATA)
+    assert list(report.worst_kda) == worst_kda(IAN_DATA)
+    assert report.worst_vs == worst_vs(IAN_DATA)
+    assert report.loss_streak == longest_loss_streak(IAN_DATA)
+    assert report.rolling_kda == worst_rolling_kda(IAN_DATA)
+    assert report.worst_day == worst_day(IAN_DATA)
+
+
+def test_longest_loss_streak():
+    """
+    Test longest_loss_streak function's correctness
+    """
+    assert longest_loss_streak(IAN_DATA) == (8, "Mordekaiser")
+
+
+def test_missing_results():
+    """
+    Test games with no result count as not won, instead of raising
+    """
+    games = pd.DataFrame(
+        {
+            "win": pd.array([True, None, False, True, None], dtype="boolean"),
+            "championName": ["Ashe", "Olaf", "Olaf", "Ashe", "Ashe"],
+            "gameCreation": [1, 2, 3, 4, 5],
+        }
+    )
+    assert longest_loss_streak(games) == (2, "Olaf")
+    assert worst_day(games) == ("1970-01-01", 2, 5)
+
+
+def test_worst_rolling_kda():
+    """
+    Test worst_rolling_kda function's correctness
+    """
+    assert worst_rolling_kda(IAN_DATA) == (1.5223880597014925, "Jinx")
+    assert worst_rolling_kda(IAN_DATA.iloc[:5])[1] is None
+
+
+def test_worst_day():
+    """
+    Test worst_day picks the day with the worst winrate, using gameCreation
+    """
+    day = 24 * 60 * 60 * 1000
+    games = pd.DataFrame(
+        {
+            "win": [True, False, False, True, True, False, False, False, False],
+            "gameCreation": [1, 2, 3, 4, day, day + 1, 2 * day, 3 * day, 3 * day],
+        }
+    )
+    assert worst_day(games) == ("1970-01-01", 2, 4)
+    assert worst_day(games, min_games=2) == ("1970-01-04", 0, 2)
+    assert worst_day(IAN_DATA) == (None, 0, 0)
@@ -0,0 +1,97 @@
+"""
+Check analysis results are reused only for the same player data
+"""
+
+from dataclasses import astuple
+import json
+import sqlite3
+import pytest
+from modules.analysis import compute_report, worst_kda
+from modules.analysis_cache import AnalysisCache, dataset_fingerprint
+from modules.storage import load_analysis_data
+
+IAN_DATA = load_analysis_data("./data/Among Us Jimin.csv")
+
+
+def test_fingerprint():
+    """
+    Test the fingerprint changes with the matches, the columns, their dtypes
+    and the stats, but not with copying the data
+    """
+    fingerprint = dataset_fingerprint(IAN_DATA)
+    assert dataset_fingerprint(IAN_DATA.copy()) == fingerprint
+    assert dataset_fingerprint(IAN_DATA.iloc[1:]) != fingerprint
+    assert dataset_fingerprint(IAN_DATA.astype({"championName": object})) != (
+        fingerprint
+    )
+    other_player = IAN_DATA.assign(
+        championName=IAN_DATA["championName"].astype(str) + "2"
+    )
+    assert dataset_fingerprint(other_player) != fingerprint
+    assert dataset_fingerprint(IAN_DATA.assign(gameCreation=0)) != fingerprint
+    assert dataset_fingerprint(IAN_DATA.assign(deaths=IAN_DATA["deaths"] + 1)) != (
+        fingerprint
+    )
+
+
+def test_memory_hits():
+    """
+    Test a repeated call returns the remembered result without recomputing
+    """
+    cache = AnalysisCache()
+    report = cache.call(compute_report, IAN_DATA)
+    assert cache.call(compute_report, IAN_DATA) is report
+    assert list(cache.call(worst_kda, IAN_DATA)) == list(report.worst_kda)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lambdas_refused():
+    """
+    Test lambdas are refused, since their names do not tell them apart
+    """
+    cache = AnalysisCache()
+    with pytest.raises(ValueError):
+        cache.call(lambda player_data: len(player_data), IAN_DATA)
+
+
+def test_lru_eviction():
+    """
+    Test the least recently used result is dropped when memory is full
+    """
+    cache = AnalysisCache(max_entries=1)
+    cache.call(worst_kda, IAN_DATA)
+    cache.call(worst_kda, IAN_DATA.iloc[1:])
+    cache.call(worst_kda, IAN_DATA)
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_disk_tier(tmp_path):
+    """
+    Test results are still cached after the cache is reopened
+    """
+    cache = AnalysisCache(path=tmp_path / "cache.sqlite")
+    report = cache.call(compute_report, IAN_DATA)
+    cache.close()
+    cache = AnalysisCache(path=tmp_path / "cache.sqlite")
+    assert astuple(cache.call(compute_report, IAN_DATA)) == astuple(report)
+    assert (cache.hits, cache.misses) == (1, 0)
+    fresh = cache.call(worst_kda, IAN_DATA)
+    cache.close()
+
+    # A result has the same types whether it was computed or read from disk
+    cache = AnalysisCache(path=tmp_path / "cache.sqlite")
+    assert cache.call(worst_kda, IAN_DATA) == fresh
+    assert isinstance(fresh, tuple)
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+
+    # Results are stored as JSON, never pickled
+    with sqlite3.connect(tmp_path / "cache.sqlite") as connection:
+        (data,) = connection.execute(
+            "SELECT data FROM results WHERE name = ?",
+            ("modules.analysis.compute_report",),
+        ).fetchone()
+        names = {name for (name,) in connection.execute("SELECT name FROM results")}
+    assert json.loads(data)["report"]["most_deaths"] == list(report.most_deaths)
+    assert names == {"modules.analysis.compute_report", "modules.analysis.worst_kda"}
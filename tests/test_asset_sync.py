@@ -0,0 +1,93 @@
+"""
+Check images are synced in parallel and counted as changed only if they are
+"""
+
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import pytest
+from modules.asset_sync import sync_assets
+from modules.image_store import ImageStore, champion_image_path, load_manifest
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """
+    Serves files, answering If-Modified-Since with 304, without logging
+    """
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def add_version(root, version, champs):
+    """
+    Puts a Data Dragon version with a square for each champion on the server
+    """
+    data = root / "cdn" / version / "data" / "en_US"
+    data.mkdir(parents=True)
+    (data / "champion.json").write_text(
+        json.dumps({"data": {champ: {} for champ in champs}}), encoding="UTF-8"
+    )
+    (root / "cdn" / version / "img" / "champion").mkdir(parents=True)
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    """
+    A local server for version 13.6.1 with two champions and a remote image,
+    yielding its root directory and URL
+    """
+    root = tmp_path / "server"
+    add_version(root, "13.6.1", ["Ashe", "Jinx"])
+    for champ in ["Ashe", "Jinx"]:
+        (root / "cdn/13.6.1/img/champion" / f"{champ}.png").write_bytes(b"old")
+    (root / "poros.jpg").write_bytes(b"poros")
+
+    httpd = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(root))
+    )
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield root, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sync_and_resync(server, tmp_path):
+    """
+    Test every image is downloaded and recorded in the manifest, and a second
+    sync downloads nothing
+    """
+    root, url = server
+    directory = str(tmp_path / "images")
+    kwargs = {"base_url": f"{url}/cdn", "remote_images": {"poros": f"{url}/poros.jpg"}}
+    counts = sync_assets("13.6.1", directory, max_workers=4, **kwargs)
+    assert counts == {"changed": 3, "unchanged": 0, "failed": 0}
+    manifest = load_manifest(directory)
+    assert manifest["version"] == "13.6.1"
+    assert set(manifest["assets"]) == {
+        "champion/Ashe.png",
+        "champion/Jinx.png",
+        "remote/poros",
+    }
+    with open(champion_image_path("Ashe", "13.6.1", directory), "rb") as file:
+        assert file.read() == b"old"
+
+    counts = sync_assets("13.6.1", directory, max_workers=4, **kwargs)
+    assert counts == {"changed": 0, "unchanged": 3, "failed": 0}
+
+    # In the next version only Jinx's square changes, within the same second
+    # as the old one, so only its content tells them apart
+    add_version(root, "13.7.1", ["Ashe", "Jinx"])
+    for champ, content in [("Ashe", b"old"), ("Jinx", b"new")]:
+        filepath = root / "cdn/13.7.1/img/champion" / f"{champ}.png"
+        filepath.write_bytes(content)
+        stat = os.stat(root / "cdn/13.6.1/img/champion" / f"{champ}.png")
+        os.utime(filepath, (stat.st_atime, stat.st_mtime))
+    counts = sync_assets("13.7.1", directory, max_workers=4, **kwargs)
+    assert counts == {"changed": 1, "unchanged": 2, "failed": 0}
+    for champ, content in [("Ashe", b"old"), ("Jinx", b"new")]:
+        with open(champion_image_path(champ, "13.7.1", directory), "rb") as file:
+            assert file.read() == content
+    assert ImageStore.from_manifest(directory).version == "13.7.1"
@@ -0,0 +1,61 @@
+"""
+Check images are packed into the atlas and sliced back out unchanged
+"""
+
+import os
+from PIL import Image
+from modules.atlas import SpriteAtlas, atlas_path, pack
+from modules.build_atlas import build_atlas
+from modules.image_store import ImageStore, champion_image_path, remote_image_path
+
+
+def test_pack():
+    """
+    Test packed rectangles fit in the atlas without overlapping
+    """
+    sizes = {
+        f"box{idx}": (50 + idx * 37 % 200, 20 + idx * 53 % 300) for idx in range(60)
+    }
+    boxes, height = pack(sizes, width=512)
+    assert set(boxes) == set(sizes)
+    pixels = set()
+    for x_pos, y_pos, width, box_height in boxes.values():
+        assert x_pos + width <= 512 and y_pos + box_height <= height
+        box_pixels = {
+            (x, y)
+            for x in range(x_pos, x_pos + width, 10)
+            for y in range(y_pos, y_pos + box_height, 10)
+        }
+        assert not pixels & box_pixels
+        pixels |= box_pixels
+
+
+def test_build_and_slice(tmp_path):
+    """
+    Test the ui's images are pre-rendered at its scale and looked up from the
+    atlas without reading the original files
+    """
+    directory = str(tmp_path)
+    for champ, color in [("Ashe", "blue"), ("Jinx", "pink")]:
+        filepath = champion_image_path(champ, "13.6.1", directory)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        Image.new("RGB", (120, 120), color).save(filepath)
+    for name in ["poros", "splash"]:
+        filepath = remote_image_path(name, directory)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        Image.new("RGB", (1276, 718), "green").save(filepath, "PNG")
+
+    atlas = build_atlas("13.6.1", 0.7, directory)
+    assert len(atlas) == 6 + 2 + 2 * 4
+    os.remove(champion_image_path("Jinx", "13.6.1", directory))
+
+    loaded = SpriteAtlas.load(atlas_path("13.6.1", 0.7, directory))
+    assert loaded.sprites == atlas.sprites
+    images = ImageStore.from_manifest(directory, scale=0.7)
+    assert images.atlas is not None
+    assert images.prerendered("death_bg").size == (int(720 * 0.7), int(1280 * 0.7))
+    assert images.prerendered("poros").size == (478, 269)
+    jinx = images.pil_image("Jinx3")
+    assert jinx.size == (280, 280)
+    assert jinx.getpixel((10, 10)) == Image.new("RGB", (1, 1), "pink").getpixel((0, 0))
+    assert SpriteAtlas.load(atlas_path("13.6.1", 1, directory)) is None
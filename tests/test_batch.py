@@ -0,0 +1,49 @@
+"""
+Check players are analyzed the same way across a pool of processes
+"""
+
+import shutil
+from modules.analysis import compute_report
+from modules import batch
+from modules.batch import analyze_directory, analyze_file, summarize_report
+from modules.storage import load_analysis_data
+
+IAN_DATA = load_analysis_data("./data/Among Us Jimin.csv")
+
+
+def test_analyze_directory(tmp_path):
+    """
+    Test every player gets a row matching their report, in the same order
+    with one process or several, and a broken file only fails its own row
+    """
+    names = ["a", "b", "c", "d", "e", "f"]
+    for name in names:
+        shutil.copy("./data/Among Us Jimin.csv", tmp_path / f"{name}.csv")
+    (tmp_path / "broken.csv").write_text("garbage", encoding="UTF-8")
+    expected = summarize_report(compute_report(IAN_DATA))
+
+    # With chunks of one file, more chunks are left than are first submitted
+    for processes, chunk_size in [(1, 2), (2, 2), (2, 1)]:
+        rows = list(analyze_directory(tmp_path, processes, chunk_size))
+        assert [row["summoner"] for row in rows] == ["a", "b", "broken"] + names[2:]
+        assert "error" in rows[2]
+        for row in rows[:2] + rows[3:]:
+            assert row["games"] == len(IAN_DATA)
+            assert row["load_seconds"] >= 0 and row["analysis_seconds"] >= 0
+            assert {key: row[key] for key in expected} == expected
+
+
+def test_any_error_fails_its_row(monkeypatch):
+    """
+    Test an error of any type goes into the row instead of stopping the batch
+    """
+
+    def broken_report(player_data):
+        raise TypeError(f"cannot analyze {len(player_data)} games")
+
+    monkeypatch.setattr(batch, "compute_report", broken_report)
+    row = analyze_file("./data/Among Us Jimin.csv")
+    assert row == {
+        "summoner": "Among Us Jimin",
+        "error": f"TypeError: cannot analyze {len(IAN_DATA)} games",
+    }
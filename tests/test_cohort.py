@@ -0,0 +1,69 @@
+"""
+Check players are ranked correctly against a cohort
+"""
+
+import numpy as np
+from modules.analysis import compute_report
+from modules.cohort import Cohort, player_files
+from modules.storage import load_analysis_data
+
+IAN_DATA = load_analysis_data("./data/Among Us Jimin.csv")
+
+
+def test_bottom_percent():
+    """
+    Test the percent of the cohort doing at least as badly is found for
+    lowlights where lower and higher values are worse
+    """
+    cohort = Cohort(
+        {
+            "most_deaths": [10, 12, 14, 16],
+            "least_cs": [1.0, 2.0, 3.0, 4.0],
+            "worst_winrate": [],
+            "worst_kda": [0.5],
+            "worst_vs": [0.1, 0.2],
+        },
+        size=4,
+    )
+    assert cohort.bottom_percent("most_deaths", 14) == 50
+    assert cohort.bottom_percent("least_cs", 2.0) == 50
+    assert cohort.bottom_percent("least_cs", 0.5) == 0
+    assert np.isnan(cohort.bottom_percent("worst_winrate", 0.3))
+
+
+def test_add_report():
+    """
+    Test players added one at a time are ranked against each other
+    """
+    cohort = Cohort()
+    report = compute_report(IAN_DATA)
+    cohort.add_report(report)
+    cohort.add_report(compute_report(IAN_DATA.assign(deaths=IAN_DATA["deaths"] // 2)))
+    assert cohort.size == 2
+    assert cohort.rank(report)["most_deaths"] == 50
+    assert cohort.rank(report)["least_cs"] == 100
+
+
+def test_save_and_load(tmp_path):
+    """
+    Test a saved cohort gives the same ranks after it is loaded
+    """
+    cohort = Cohort()
+    report = compute_report(IAN_DATA)
+    cohort.add_report(report)
+    cohort.save(tmp_path / "cohort.npz")
+    loaded = Cohort.load(tmp_path / "cohort.npz")
+    assert loaded.size == 1
+    assert loaded.rank(report) == cohort.rank(report)
+
+
+def test_player_files(tmp_path):
+    """
+    Test each summoner is only found once, preferring columnar files
+    """
+    for filename in ["a.csv", "a.parquet", "b.csv", "b.jsonl", "cohort.npz"]:
+        (tmp_path / filename).touch()
+    assert player_files(tmp_path) == [
+        str(tmp_path / "a.parquet"),
+        str(tmp_path / "b.csv"),
+    ]
@@ -0,0 +1,91 @@
+"""
+Check champion images are only downloaded when needed
+"""
+
+from io import BytesIO
+import os
+from PIL import Image
+import pytest
+from modules.image_store import ImageStore, champion_image_path
+
+
+class FakeResponse:
+    """
+    A response holding a champion square, or a 404 for an unknown champion
+    """
+
+    def __init__(self, url):
+        self.status_code = 404 if "Nobody" in url else 200
+        buffer = BytesIO()
+        Image.new("RGB", (120, 120), "red").save(buffer, "PNG")
+        self.content = buffer.getvalue()
+
+    def raise_for_status(self):
+        """
+        Does nothing, since only 404s are returned as errors
+        """
+
+
+class FakeSession:
+    """
+    A session recording the URLs it is asked for
+    """
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, timeout):  # pylint: disable=unused-argument
+        """
+        Records a request and returns a FakeResponse
+        """
+        self.urls.append(url)
+        return FakeResponse(url)
+
+
+def test_lazy_download(tmp_path):
+    """
+    Test a champion is downloaded once, when first looked up, and then read
+    from the disk cache of its version
+    """
+    session = FakeSession()
+    images = ImageStore("13.6.1", tmp_path, scale=0.5, session=session)
+    assert not session.urls
+    assert images.pil_image("Ashe3").size == (200, 200)
+    assert images.pil_image("Ashe1").size == (83, 83)
+    assert len(session.urls) == 1
+    assert os.path.exists(champion_image_path("Ashe", "13.6.1", tmp_path))
+
+    images = ImageStore("13.6.1", tmp_path, session=session)
+    assert images.pil_image("Ashe4").size == (405, 405)
+    images = ImageStore("13.7.1", tmp_path, session=session)
+    assert images.pil_image("Ashe4").size == (405, 405)
+    assert len(session.urls) == 2
+
+
+def test_fixed_and_unknown_images(tmp_path):
+    """
+    Test fixed images are returned as stored and unknown names raise a
+    KeyError like a dictionary, without downloading anything
+    """
+    session = FakeSession()
+    images = ImageStore("13.6.1", tmp_path, session=session)
+    images["splash"] = "splash"
+    assert images["splash"] == "splash"
+    for name in ["poros", "Ashe3"]:
+        with pytest.raises(KeyError):
+            assert images[name]
+    assert not session.urls
+    for name in ["Ashe7", "Nobody3"]:
+        with pytest.raises(KeyError):
+            images.pil_image(name)
+
+
+def test_remote_image(tmp_path):
+    """
+    Test a remote image is downloaded once and then loaded from disk
+    """
+    session = FakeSession()
+    images = ImageStore("13.6.1", tmp_path, session=session)
+    assert images.remote_image("poros").size == (120, 120)
+    assert images.remote_image("poros").size == (120, 120)
+    assert len(session.urls) == 1
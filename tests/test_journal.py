@@ -0,0 +1,59 @@
+"""
+Check the correctness of the scrape journal
+"""
+
+import pandas as pd
+from modules.journal import KEPT, SKIPPED, ScrapeJournal, read_journal, write_csv_atomic
+
+
+def test_round_trip(tmp_path):
+    """
+    Test recorded entries are read back in the order written, across reopens
+    """
+    journal = ScrapeJournal(tmp_path / "x.jsonl")
+    journal.record("NA1_3", KEPT, row={"kills": 3})
+    journal.record("NA1_2", SKIPPED, reason="gameMode is ARAM")
+    journal.close()
+    journal = ScrapeJournal(tmp_path / "x.jsonl")
+    journal.record("NA1_1", KEPT, row={"kills": 1})
+    journal.close()
+    assert read_journal(tmp_path / "x.jsonl") == [
+        {"match_id": "NA1_3", "status": "kept", "row": {"kills": 3}},
+        {"match_id": "NA1_2", "status": "skipped", "reason": "gameMode is ARAM"},
+        {"match_id": "NA1_1", "status": "kept", "row": {"kills": 1}},
+    ]
+
+
+def test_partial_line_ignored(tmp_path):
+    """
+    Test a line cut off by a crash is not read
+    """
+    journal = ScrapeJournal(tmp_path / "x.jsonl")
+    journal.record("NA1_1", KEPT, row={"kills": 1})
+    journal.close()
+    with open(tmp_path / "x.jsonl", "a", encoding="UTF-8") as file:
+        file.write('{"match_id": "NA1_2", "ro')
+    assert len(read_journal(tmp_path / "x.jsonl")) == 1
+
+
+def test_write_csv_atomic(tmp_path):
+    """
+    Test the .csv file is written and no temporary file is left behind
+    """
+    write_csv_atomic(pd.DataFrame({"kills": [1]}), tmp_path / "x.csv")
+    assert [path.name for path in tmp_path.iterdir()] == ["x.csv"]
+
+
+def test_reopen_drops_partial_line(tmp_path):
+    """
+    Test entries appended after a crash mid-write are still read
+    """
+    with open(tmp_path / "x.jsonl", "w", encoding="UTF-8") as file:
+        file.write('{"match_id": "NA1_2", "status": "kept"}\n{"match_id": "NA')
+    journal = ScrapeJournal(tmp_path / "x.jsonl")
+    journal.record("NA1_1", SKIPPED, reason="gameDuration < 240")
+    journal.close()
+    assert [entry["match_id"] for entry in read_journal(tmp_path / "x.jsonl")] == [
+        "NA1_2",
+        "NA1_1",
+    ]
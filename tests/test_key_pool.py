@@ -0,0 +1,40 @@
+"""
+Check the multi-key, multi-region scheduler spreads requests correctly
+"""
+
+from modules.key_pool import KeyPool, RoutedRateLimiter, get_routing_value
+
+
+def test_routing_values():
+    """
+    Test match requests count towards the regional routing value and
+    summoner requests towards the platform
+    """
+    assert get_routing_value("by_id", "NA1") == "americas"
+    assert get_routing_value("matchlist_by_puuid", "kr") == "asia"
+    assert get_routing_value("by_name", "EUW1") == "euw1"
+
+
+def test_regions_have_separate_limits():
+    """
+    Test one region running out of requests does not slow down another
+    """
+    rate_limiter = RoutedRateLimiter(app_limits=((1, 60),), method_limits={})
+    assert rate_limiter.call("by_id", lambda region, match_id: match_id, "na1", "A")
+    assert rate_limiter.limiter("americas").wait_time("by_id") > 0
+    assert rate_limiter.limiter("europe").wait_time("by_id") == 0
+    assert rate_limiter.call("by_id", lambda region, match_id: match_id, "euw1", "B")
+
+
+def test_summoners_spread_across_keys():
+    """
+    Test summoners in the same region are assigned to different keys until
+    every key has one
+    """
+    key_pool = KeyPool(["key-a", "key-b"])
+    first = key_pool.assign("NA1")
+    second = key_pool.assign("LA1")
+    third = key_pool.assign("EUW1")
+    assert first[0] is not second[0]
+    assert third[0] is first[0]
+    assert key_pool.assign("NA1")[0] is first[0]
@@ -0,0 +1,64 @@
+"""
+Check the correctness of the on-disk match cache
+"""
+
+import sqlite3
+from modules.match_cache import MatchCache
+
+MATCH = {"metadata": {"matchId": "NA1_1"}, "info": {"gameMode": "CLASSIC"}}
+
+
+def test_round_trip(tmp_path):
+    """
+    Test a stored match is returned unchanged and counted as a hit
+    """
+    cache = MatchCache(tmp_path / "cache.sqlite")
+    assert cache.get("NA1_1") is None
+    cache.put("NA1_1", MATCH)
+    assert cache.get("NA1_1") == MATCH
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_persists_between_instances(tmp_path):
+    """
+    Test matches are still cached after the cache is reopened
+    """
+    cache = MatchCache(tmp_path / "cache.sqlite")
+    cache.put("NA1_1", MATCH)
+    cache.close()
+    assert "NA1_1" in MatchCache(tmp_path / "cache.sqlite")
+
+
+def test_size_eviction(tmp_path):
+    """
+    Test the least recently used match is evicted when the cache is full
+    """
+    cache = MatchCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.put("NA1_1", MATCH)
+    cache.put("NA1_2", MATCH)
+    cache.get("NA1_1")
+    cache.put("NA1_3", MATCH)
+    assert len(cache) == 2
+    assert "NA1_2" not in cache
+
+    # Storing a cached match again replaces it without evicting another
+    cache.put("NA1_3", MATCH)
+    assert len(cache) == 2
+    assert "NA1_1" in cache
+    cache.close()
+
+    # The least recently used matches are found without sorting the table
+    with sqlite3.connect(tmp_path / "cache.sqlite") as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT match_id FROM matches ORDER BY used_at"
+        ).fetchall()
+    assert "matches_used_at" in str(plan)
+
+
+def test_age_eviction(tmp_path):
+    """
+    Test matches older than max_age are treated as misses
+    """
+    cache = MatchCache(tmp_path / "cache.sqlite", max_age=-1)
+    cache.put("NA1_1", MATCH)
+    assert cache.get("NA1_1") is None
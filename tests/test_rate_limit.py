@@ -0,0 +1,90 @@
+"""
+Check the correctness of the rate limiter
+"""
+
+import threading
+import time
+from modules.rate_limit import RateLimiter, TokenBucket, parse_rate_limit_header
+
+
+def test_bucket_waits_when_empty():
+    """
+    Test a bucket only hands out `limit` tokens per window
+    """
+    bucket = TokenBucket(2, 10)
+    bucket.spend(0.0)
+    assert bucket.wait_time(0.0) == 0.0
+    bucket.spend(1.0)
+    assert bucket.wait_time(2.0) == 8.0
+
+
+def test_bucket_refills_after_window():
+    """
+    Test spent tokens return to the bucket after the window passes
+    """
+    bucket = TokenBucket(1, 5)
+    bucket.spend(0.0)
+    assert bucket.wait_time(5.0) == 0.0
+
+
+def test_limiter_applies_method_limits():
+    """
+    Test the limiter blocks on a method limit but not on other methods
+    """
+    limiter = RateLimiter(app_limits=(), method_limits={"by_id": ((1, 0.2),)})
+    start = time.monotonic()
+    limiter.acquire("by_id")
+    limiter.acquire("by_name")
+    assert time.monotonic() - start < 0.1
+    limiter.acquire("by_id")
+    assert time.monotonic() - start >= 0.2
+
+
+def test_parse_rate_limit_header():
+    """
+    Test Riot rate limit headers are parsed into (count, seconds) pairs
+    """
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1), (100, 120)]
+
+
+def test_adapts_to_headers():
+    """
+    Test the limiter takes on the limits and counts reported by the API
+    """
+    limiter = RateLimiter(app_limits=(), method_limits={}, margin=0)
+    limiter.update_from_headers(
+        "by_id",
+        {"X-App-Rate-Limit": "5:10", "X-App-Rate-Limit-Count": "5:10"},
+    )
+    assert [(bucket.limit, bucket.window) for bucket in limiter.app_buckets] == [
+        (5, 10)
+    ]
+    assert limiter.app_buckets[0].wait_time(time.monotonic()) > 9
+
+
+def test_blocked_method_waits():
+    """
+    Test a blocked method waits while other methods carry on
+    """
+    limiter = RateLimiter(app_limits=(), method_limits={})
+    limiter.block(0.2, "by_id")
+    start = time.monotonic()
+    limiter.acquire("by_name")
+    assert time.monotonic() - start < 0.1
+    limiter.acquire("by_id")
+    assert time.monotonic() - start >= 0.2
+    assert limiter.stats()["throttled_time"] > 0
+
+
+def test_stop_wakes_wait():
+    """
+    Test setting stop ends a wait for the limits without making the request
+    """
+    limiter = RateLimiter(app_limits=((1, 60),), method_limits={})
+    stop = threading.Event()
+    assert limiter.acquire(stop=stop)
+    threading.Timer(0.1, stop.set).start()
+    start = time.monotonic()
+    assert limiter.call("by_id", lambda: "match", stop=stop) is None
+    assert time.monotonic() - start < 5
+    assert limiter.requests == 1
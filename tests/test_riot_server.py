@@ -0,0 +1,144 @@
+"""
+Check the local Riot API stand-in answers like the real API
+"""
+
+import pytest
+import requests
+from requests.exceptions import HTTPError
+from modules.rate_limit import RateLimiter, attach_rate_limiter, parse_rate_limit_header
+from modules.riot_server import (
+    FixtureStore,
+    RiotStandIn,
+    create_stand_in_watcher,
+    make_synthetic_fixtures,
+)
+from modules.scraper import fetch_matches
+
+
+@pytest.fixture(name="fixtures")
+def fixture_fixtures(tmp_path):
+    """
+    A FixtureStore holding a synthetic summoner with 30 matches
+    """
+    store = FixtureStore(tmp_path)
+    make_synthetic_fixtures(store, "Synthetic", 30)
+    return store
+
+
+def test_replays_fixtures(fixtures):
+    """
+    Test a LolWatcher pointed at the stand-in gets the recorded responses
+    """
+    stand_in = RiotStandIn(fixtures)
+    watcher = create_stand_in_watcher(stand_in.start())
+    try:
+        matchlist = watcher.match.matchlist_by_puuid(
+            "na1", "puuid-Synthetic", start=20, count=100
+        )
+        assert len(matchlist) == 10
+        matches = list(fetch_matches(watcher, matchlist, "na1", max_workers=4))
+        assert [match["metadata"]["matchId"] for match in matches] == matchlist
+    finally:
+        stand_in.stop()
+
+
+def test_missing_fixture_is_404(fixtures):
+    """
+    Test a match with no fixture is answered with a 404
+    """
+    stand_in = RiotStandIn(fixtures)
+    watcher = create_stand_in_watcher(stand_in.start())
+    try:
+        with pytest.raises(HTTPError):
+            watcher.match.by_id("na1", "NA1_1")
+    finally:
+        stand_in.stop()
+
+
+def test_rate_limit_headers(fixtures):
+    """
+    Test requests over the limit get a 429 with Retry-After, and every
+    response carries rate limit headers
+    """
+    stand_in = RiotStandIn(fixtures, app_limits=((2, 10),))
+    url = stand_in.start() + "/lol/summoner/v4/summoners/by-name/Synthetic"
+    try:
+        responses = [requests.get(url, timeout=5) for _ in range(3)]
+    finally:
+        stand_in.stop()
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[1].headers["X-App-Rate-Limit"] == "2:10"
+    assert responses[1].headers["X-App-Rate-Limit-Count"] == "2:10"
+    assert responses[2].headers["Retry-After"] == "10"
+    assert stand_in.throttled_count == 1
+
+
+def test_fractional_window_headers(fixtures):
+    """
+    Test windows shorter than a second are reported as they are, not
+    rounded down to zero
+    """
+    stand_in = RiotStandIn(fixtures, app_limits=((2, 0.5),))
+    url = stand_in.start() + "/lol/summoner/v4/summoners/by-name/Synthetic"
+    try:
+        response = requests.get(url, timeout=5)
+    finally:
+        stand_in.stop()
+    assert response.headers["X-App-Rate-Limit"] == "2:0.5"
+    assert parse_rate_limit_header(response.headers["X-App-Rate-Limit"]) == [(2, 0.5)]
+
+
+def test_limiter_avoids_429(fixtures):
+    """
+    Test fetching through the rate limiter never trips the stand-in's limits
+    """
+    stand_in = RiotStandIn(fixtures, app_limits=((10, 1),))
+    watcher = create_stand_in_watcher(stand_in.start())
+    matchlist = fixtures.load("matchlists", "puuid-Synthetic")
+    # The stand-in starts counting a window when a request reaches it, so
+    # the margin has to cover how late a request can reach it after being
+    # allowed, which is a lot on a busy machine with 8 threads in flight
+    rate_limiter = RateLimiter(app_limits=((10, 1),), margin=1)
+    try:
+        list(
+            fetch_matches(
+                watcher, matchlist, "na1", max_workers=8, rate_limiter=rate_limiter
+            )
+        )
+    finally:
+        stand_in.stop()
+    assert stand_in.throttled_count == 0
+
+
+def test_retries_after_429(fixtures):
+    """
+    Test a limiter that does not know the limits retries after each 429 and
+    still fetches every match
+    """
+    stand_in = RiotStandIn(fixtures, app_limits=((5, 1),))
+    watcher = create_stand_in_watcher(stand_in.start())
+    matchlist = fixtures.load("matchlists", "puuid-Synthetic")[:8]
+    rate_limiter = RateLimiter(app_limits=())
+    try:
+        matches = list(fetch_matches(watcher, matchlist, "na1", 1, rate_limiter))
+    finally:
+        stand_in.stop()
+    assert len(matches) == 8
+    assert rate_limiter.retries == stand_in.throttled_count > 0
+
+
+def test_headers_slow_limiter_down(fixtures):
+    """
+    Test a limiter fed the response headers learns the limits without a 429
+    """
+    stand_in = RiotStandIn(fixtures, app_limits=((5, 1),))
+    watcher = create_stand_in_watcher(stand_in.start())
+    matchlist = fixtures.load("matchlists", "puuid-Synthetic")[:8]
+    rate_limiter = RateLimiter(app_limits=())
+    attach_rate_limiter(watcher, rate_limiter)
+    try:
+        matches = list(fetch_matches(watcher, matchlist, "na1", 1, rate_limiter))
+    finally:
+        stand_in.stop()
+    assert len(matches) == 8
+    assert stand_in.throttled_count == 0
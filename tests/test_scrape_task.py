@@ -0,0 +1,132 @@
+"""
+Check scrapes run in the background report progress and can be resumed
+"""
+
+import os
+import time
+import pytest
+from modules.rate_limit import RateLimiter
+from modules.riot_server import (
+    FixtureStore,
+    RiotStandIn,
+    create_stand_in_watcher,
+    make_synthetic_fixtures,
+)
+from modules.scrape_task import (
+    CANCELLED,
+    DONE,
+    MATCHLIST,
+    PROGRESS,
+    ScrapeTask,
+    ThroughputMeter,
+    describe_eta,
+)
+
+
+def test_throughput_meter():
+    """
+    Test the wait is estimated from the rate of the most recent matches
+    """
+    meter = ThroughputMeter(window=2)
+    meter.add(100, now=0)
+    assert meter.eta(50) is None
+    meter.add(101, now=10)
+    meter.add(102, now=11)
+    meter.add(103, now=12)
+    assert meter.rate() == 1
+    assert meter.eta(60) == 60
+    assert describe_eta(meter.eta(60)) == "about 1 minute left"
+    assert describe_eta(None) == "working out how long this will take"
+
+
+def run(task, cancel_after=None):
+    """
+    Polls a task until it is over, cancelling it once a number of matches
+    are done, and returns every message it sent
+    """
+    task.start()
+    messages = []
+    while task.is_alive():
+        messages += task.poll()
+        done = [message[1] for message in messages if message[0] == PROGRESS]
+        if cancel_after is not None and done and done[-1] >= cancel_after:
+            task.cancel()
+        time.sleep(0.01)
+    return messages + task.poll()
+
+
+@pytest.fixture(name="watcher")
+def fixture_watcher(tmp_path, monkeypatch):
+    """
+    A LolWatcher pointed at a slow stand-in for a summoner with 30 matches,
+    which records the match ids it fetches in a `fetched` list, with the
+    scrape saving to a temporary data directory
+    """
+    store = FixtureStore(tmp_path / "fixtures")
+    make_synthetic_fixtures(store, "Synthetic", 30)
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    stand_in = RiotStandIn(store, latency=0.01)
+    watcher = create_stand_in_watcher(stand_in.start())
+    # The installed riotwatcher may not have summoner.by_name, so summoners
+    # are looked up in the store directly
+    monkeypatch.setattr(
+        watcher.summoner,
+        "by_name",
+        lambda region, name: store.load("summoners", name),
+        raising=False,
+    )
+    by_id = watcher.match.by_id
+    watcher.fetched = []
+
+    def fetch(region, match_id):
+        watcher.fetched.append(match_id)
+        return by_id(region, match_id)
+
+    monkeypatch.setattr(watcher.match, "by_id", fetch)
+    yield watcher
+    stand_in.stop()
+
+
+def test_cancel_and_resume(watcher):
+    """
+    Test a cancelled scrape keeps its journal and a new task resumes from it,
+    fetching every match once across both tasks
+    """
+    messages = run(ScrapeTask(watcher, "Synthetic", "na1"), cancel_after=5)
+    assert messages[0][0] == MATCHLIST and len(messages[0][1]) == 30
+    matchlist = messages[0][1]
+    assert messages[-1] == (CANCELLED,)
+    assert os.path.exists("data/Synthetic.jsonl")
+    stopped_at = [message[1] for message in messages if message[0] == PROGRESS][-1]
+    assert stopped_at < 30
+    fetched_before = len(watcher.fetched)
+
+    messages = run(ScrapeTask(watcher, "Synthetic", "na1"))
+    progress = [message for message in messages if message[0] == PROGRESS]
+    assert progress[0][1] == fetched_before >= stopped_at
+    assert progress[-1][1:3] == (30, 30)
+    assert sorted(watcher.fetched) == sorted(matchlist)
+    assert messages[-1][0] == DONE
+    assert 0 < len(messages[-1][1]) <= 30
+    assert messages[-1][1]["championName"].dtype == "category"
+    assert not os.path.exists("data/Synthetic.jsonl")
+
+
+def test_cancel_while_listing_matches(watcher):
+    """
+    Test a scrape cancelled while the matchlist waits for the rate limits
+    stops waiting and sends no matchlist
+    """
+    rate_limiter = RateLimiter()
+    rate_limiter.block(60)
+    task = ScrapeTask(watcher, "Synthetic", "na1", rate_limiter=rate_limiter)
+    task.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    task.cancel()
+    while task.is_alive() and time.monotonic() - start < 5:
+        time.sleep(0.01)
+    assert not task.is_alive()
+    assert task.poll() == [(CANCELLED,)]
+    assert not watcher.fetched
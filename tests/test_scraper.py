@@ -3,13 +3,66 @@ Check that scraper functions are setup properly
 """
 
 import os
-import sys
+import threading
+import pytest
 from requests.exceptions import HTTPError
+from modules.riot_server import (
+    FixtureStore,
+    RiotStandIn,
+    create_stand_in_watcher,
+    make_synthetic_fixtures,
+)
+from modules.scraper import (
+    ColumnBuilder,
+    create_watcher,
+    get_data_for_summoners,
+    project_row,
+    refresh_player_data,
+)
+from modules.storage import load_player_data
 
-sys.path.append("./modules")
 
-# pylint: disable=import-error, wrong-import-position
-from scraper import create_watcher
+@pytest.fixture(name="store")
+def fixture_store(tmp_path, monkeypatch):
+    """
+    A FixtureStore holding a synthetic summoner with 30 matches, with the
+    scraper saving to a temporary data directory
+    """
+    store = FixtureStore(tmp_path / "fixtures")
+    make_synthetic_fixtures(store, "Synthetic", 30)
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    return store
+
+
+@pytest.fixture(name="watcher")
+def fixture_watcher(store, monkeypatch):
+    """
+    A LolWatcher pointed at a stand-in serving the store, which records the
+    summoners it looks up in a `looked_up` list and the match ids it fetches
+    in a `fetched` list
+    """
+    stand_in = RiotStandIn(store)
+    watcher = create_stand_in_watcher(stand_in.start())
+    # The installed riotwatcher may not have summoner.by_name, so summoners
+    # are looked up in the store directly
+    watcher.looked_up = []
+
+    def look_up(region, name):  # pylint: disable=unused-argument
+        watcher.looked_up.append(name)
+        return store.load("summoners", name)
+
+    monkeypatch.setattr(watcher.summoner, "by_name", look_up, raising=False)
+    by_id = watcher.match.by_id
+    watcher.fetched = []
+
+    def fetch(region, match_id):
+        watcher.fetched.append(match_id)
+        return by_id(region, match_id)
+
+    monkeypatch.setattr(watcher.match, "by_id", fetch)
+    yield watcher
+    stand_in.stop()
 
 
 def test_key_file_exists():
@@ -27,3 +80,120 @@ def test_key_validity():
         create_watcher().champion.rotations("na1")
     except HTTPError:
         assert False
+
+
+def test_project_row():
+    """
+    Test projected fields are kept and the rest go to the side store
+    """
+    side_store = {}
+    row = {"kills": 1, "deaths": 2, "perks": {"statPerks": {}}}
+    assert project_row(row, ["kills", "deaths"], side_store, "NA1_1") == {
+        "kills": 1,
+        "deaths": 2,
+    }
+    assert side_store == {"NA1_1": {"perks": {"statPerks": {}}}}
+
+
+def test_column_builder():
+    """
+    Test rows come out typed and in matchlist order, whatever order they
+    were added in
+    """
+    builder = ColumnBuilder(["NA1_3", "NA1_2", "NA1_1"], ["kills", "championName"])
+    builder.add("NA1_1", {"kills": 4, "championName": "Olaf"})
+    builder.add("NA1_3", {"kills": 1, "championName": "Ashe"})
+    player_stats = builder.to_frame()
+    assert list(player_stats.index) == ["NA1_3", "NA1_1"]
+    assert list(player_stats["championName"]) == ["Ashe", "Olaf"]
+    assert player_stats["kills"].dtype == "int16"
+
+
+def test_refresh_skips_known_matches(watcher):
+    """
+    Test a refresh fetches nothing once the season has been scraped, not
+    even the matches that were skipped
+    """
+    player_data = refresh_player_data(watcher, "Synthetic", "na1")
+    assert len(watcher.fetched) == 30
+    assert "NA1_4600000000" not in player_data.index
+    assert os.path.exists("data/Synthetic.skipped.json")
+
+    watcher.fetched.clear()
+    refreshed = refresh_player_data(watcher, "Synthetic", "na1")
+    assert not watcher.fetched
+    assert len(refreshed) == len(player_data)
+
+
+def test_refresh_scrapes_new_matches(store, watcher):
+    """
+    Test a refresh only fetches the matches played since the last scrape,
+    and keeps the older rows
+    """
+    matchlist = store.load("matchlists", "puuid-Synthetic")
+    store.save("matchlists", "puuid-Synthetic", matchlist[10:])
+    old_data = refresh_player_data(watcher, "Synthetic", "na1")
+
+    store.save("matchlists", "puuid-Synthetic", matchlist)
+    watcher.fetched.clear()
+    player_data = refresh_player_data(watcher, "Synthetic", "na1")
+    assert watcher.fetched == matchlist[:10]
+    assert set(old_data.index) < set(player_data.index)
+    assert list(player_data.index) == [
+        match_id for match_id in matchlist if match_id in player_data.index
+    ]
+
+
+def test_stopped_refresh(store, watcher):
+    """
+    Test a stopped refresh returns None and leaves the saved data as it was
+    """
+    matchlist = store.load("matchlists", "puuid-Synthetic")
+    store.save("matchlists", "puuid-Synthetic", matchlist[10:])
+    old_data = refresh_player_data(watcher, "Synthetic", "na1")
+
+    store.save("matchlists", "puuid-Synthetic", matchlist)
+    stop = threading.Event()
+    stop.set()
+    assert refresh_player_data(watcher, "Synthetic", "na1", stop=stop) is None
+    assert len(load_player_data("data/Synthetic.csv")) == len(old_data)
+    assert len(refresh_player_data(watcher, "Synthetic", "na1")) > len(old_data)
+
+
+def test_batch_resumes_after_crash(store, watcher, monkeypatch):
+    """
+    Test a batch that crashes part way is resumed from each summoner's
+    journal, looking every summoner up once per run and fetching every
+    match once overall
+    """
+    # A second summoner who played in every third of the first one's matches
+    matchlist = store.load("matchlists", "puuid-Synthetic")
+    shared = matchlist[::3]
+    store.save("summoners", "Duo", {"name": "Duo", "puuid": "puuid-Duo"})
+    store.save("matchlists", "puuid-Duo", shared)
+    for match_id in shared:
+        match = store.load("matches", match_id)
+        match["info"]["participants"][1]["puuid"] = "puuid-Duo"
+        store.save("matches", match_id, match)
+
+    fetch = watcher.match.by_id
+
+    def crash(region, match_id):
+        if len(watcher.fetched) == 12:
+            raise RuntimeError("crashed")
+        return fetch(region, match_id)
+
+    monkeypatch.setattr(watcher.match, "by_id", crash)
+    with pytest.raises(RuntimeError):
+        get_data_for_summoners(watcher, ["Synthetic", "Duo"], "na1")
+    assert watcher.looked_up == ["Synthetic", "Duo"]
+    assert os.path.exists("data/Synthetic.jsonl")
+
+    monkeypatch.setattr(watcher.match, "by_id", fetch)
+    all_player_stats = get_data_for_summoners(watcher, ["Synthetic", "Duo"], "na1")
+    assert watcher.looked_up == ["Synthetic", "Duo"] * 2
+    assert sorted(watcher.fetched) == sorted(matchlist)
+    assert set(all_player_stats["Duo"].index) <= set(shared)
+    assert set(all_player_stats["Duo"].index) < set(all_player_stats["Synthetic"].index)
+    assert not os.path.exists("data/Synthetic.jsonl")
+    assert not os.path.exists("data/Duo.jsonl")
@@ -0,0 +1,106 @@
+"""
+Check each slide is composited once, at the size of the ui
+"""
+
+import os
+from PIL import Image
+import pytest
+from modules.analysis import compute_report
+from modules.image_store import ImageStore, champion_image_path
+from modules.slides import SLIDES, SlideDeck, load_font, wrap_text
+from modules.storage import load_analysis_data
+
+PLAYER_DATA = load_analysis_data("data/Among Us Jimin.csv")
+
+
+@pytest.fixture(name="images")
+def fixture_images(tmp_path):
+    """
+    An ImageStore with a square saved for every champion the sample player
+    played, so nothing is downloaded
+    """
+    for champ in PLAYER_DATA["championName"].unique():
+        filepath = champion_image_path(champ, "13.6.1", tmp_path)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        Image.new("RGB", (120, 120), "red").save(filepath)
+    return ImageStore("13.6.1", tmp_path, scale=0.7)
+
+
+@pytest.fixture(name="deck")
+def fixture_deck(images):
+    """
+    A deck of the sample player's slides
+    """
+    deck = SlideDeck(
+        compute_report(PLAYER_DATA), images, 0.7, make_photo=Image.Image.copy
+    )
+    yield deck
+    deck.close()
+
+
+def test_render_every_slide(deck):
+    """
+    Test every slide is rendered at the size of the ui, with its champion
+    square pasted in
+    """
+    for name in SLIDES:
+        slide = deck.render(name)
+        assert slide.size == (503, 896)
+    # The death slide's champion square is at (160, 360) before scaling
+    assert deck.render("death").getpixel((200, 300)) == (255, 0, 0)
+
+
+def test_render_without_champions(images):
+    """
+    Test every slide is rendered for players who never or only played
+    support, with the empty champion square covered in black
+    """
+    support_games = PLAYER_DATA["teamPosition"] == "UTILITY"
+    for games, empty_slide in [(~support_games, "vision"), (support_games, "farm")]:
+        deck = SlideDeck(
+            compute_report(PLAYER_DATA[games]),
+            images,
+            0.7,
+            make_photo=Image.Image.copy,
+        )
+        try:
+            for name in SLIDES:
+                assert deck.render(name).size == (503, 896)
+            assert deck.render(empty_slide).getpixel((200, 300)) == (0, 0, 0)
+        finally:
+            deck.close()
+
+
+def test_tilt_without_champion(images):
+    """
+    Test the tilt slide covers its empty champion square for a player who
+    never lost and played too few games for a run of games
+    """
+    won_games = PLAYER_DATA[PLAYER_DATA["win"].astype(bool)].iloc[:3]
+    deck = SlideDeck(compute_report(won_games), images, 0.7)
+    try:
+        assert deck.render("tilt").getpixel((200, 300)) == (0, 0, 0)
+    finally:
+        deck.close()
+
+
+def test_slides_cached(deck):
+    """
+    Test a prefetched slide is rendered once, and converted for the ui once
+    """
+    deck.prefetch("kda")
+    slide = deck.render("kda")
+    assert deck.render("kda") is slide
+    assert deck.photo("kda") is deck.photo("kda")
+
+
+def test_wrap_text():
+    """
+    Test wrapped lines fit in the width, without losing any words
+    """
+    font = load_font(12)
+    text = "In Season 12, your most deaths in one game was 13 deaths on Ashe."
+    lines = wrap_text(text, font, 150).split("\n")
+    assert len(lines) > 1
+    assert all(font.getlength(line) <= 150 for line in lines)
+    assert " ".join(lines) == text
@@ -0,0 +1,141 @@
+"""
+Check player data survives being saved and loaded in every file format
+"""
+
+import ast
+import json
+import pandas as pd
+import pytest
+from modules.storage import (
+    ANALYSIS_SCHEMA,
+    decode_dict_column,
+    flatten_player_data,
+    load_analysis_data,
+    load_player_data,
+    save_player_data,
+)
+
+player_data = pd.read_csv("data/Among Us Jimin.csv", index_col=0)
+
+
+def test_flatten_challenges():
+    """
+    Test each challenge becomes its own typed column
+    """
+    flat_data = flatten_player_data(player_data)
+    assert "challenges" not in flat_data.columns
+    assert flat_data["challenges.kda"].dtype == float
+    assert flat_data["kills"].equals(player_data["kills"])
+
+
+def test_decode_dict_column():
+    """
+    Test decoding a whole column at once matches decoding each value
+    """
+    wide = decode_dict_column(player_data["challenges"], "challenges")
+    for match_id, value in player_data["challenges"].dropna().items():
+        for key, stat in ast.literal_eval(value).items():
+            assert wide.loc[match_id, f"challenges.{key}"] == stat
+    assert wide.loc[player_data["challenges"].isna()].isna().all(axis=None)
+
+
+def test_decode_nested_and_sparse():
+    """
+    Test nested dictionaries are flattened and rare keys made sparse
+    """
+    values = pd.Series(["{'a': {'b': 1}, 'c': 5, 'd': True}", "{'a': {'b': 2}}", None])
+    wide = decode_dict_column(values, "perks", sparse_threshold=0.5)
+    assert wide["perks.a.b"].tolist()[:2] == [1, 2]
+    assert not isinstance(wide["perks.a.b"].dtype, pd.SparseDtype)
+    assert isinstance(wide["perks.c"].dtype, pd.SparseDtype)
+    assert wide["perks.d"].tolist()[0] is True
+
+
+def test_decode_awkward_strings(tmp_path):
+    """
+    Test strings holding quotes or Python literals, and nesting that only a
+    later row has, are decoded from reprs and from the JSON saved in .csv
+    files
+    """
+    records = [
+        {"note": "it's True", "kills": 1},
+        {"note": 'said "None"', "nested": {"depth": 2}},
+    ]
+    wide = decode_dict_column(pd.Series([repr(record) for record in records]), "x")
+    assert wide["x.note"].tolist() == ["it's True", 'said "None"']
+    assert wide["x.nested.depth"].tolist()[1] == 2
+
+    filepath = str(tmp_path / "player.csv")
+    save_player_data(pd.DataFrame({"x": records}, index=["NA1_2", "NA1_1"]), filepath)
+    saved = load_player_data(filepath)["x"]
+    assert json.loads(saved.iloc[0]) == records[0]
+    saved_wide = decode_dict_column(saved, "x")
+    assert saved_wide["x.note"].tolist() == wide["x.note"].tolist()
+    assert saved_wide["x.nested.depth"].tolist()[1] == 2
+
+
+def test_decode_reprs_in_bulk():
+    """
+    Test a column of reprs is decoded the same as with ast.literal_eval,
+    whether a repr has its quotes swapped, is rewritten token by token or
+    can only be parsed on its own
+    """
+    records = [
+        {"kills": 1, "styles": [{"perk": 8229}], "ratio": 0.5},
+        {"flag": True, "missing": None, "note": "True"},
+        {"path": "C:\\Riot", "pair": (1, 2)},
+        {1: "number key"},
+        {"quote": 'it\'s "quoted"'},
+    ]
+    values = pd.Series([repr(record) for record in records])
+    expected = pd.DataFrame.from_records(
+        [ast.literal_eval(value) for value in values]
+    ).add_prefix("x.")
+    pd.testing.assert_frame_equal(decode_dict_column(values, "x"), expected)
+    wide = decode_dict_column(values[:2], "x")
+    assert wide["x.styles"].iloc[0] == [{"perk": 8229}]
+    assert wide["x.flag"].iloc[1] is True and wide["x.note"].iloc[1] == "True"
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "arrow"])
+def test_round_trip(tmp_path, file_format):
+    """
+    Test saved data is loaded back with the same match ids and stats
+    """
+    filepath = str(tmp_path / f"player.{file_format}")
+    save_player_data(player_data, filepath)
+    loaded_data = load_player_data(filepath)
+    assert list(loaded_data.index) == list(player_data.index)
+    for column in ["championName", "kills", "deaths", "win"]:
+        assert loaded_data[column].tolist() == player_data[column].tolist()
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "arrow"])
+def test_load_columns(tmp_path, file_format):
+    """
+    Test only the requested columns are loaded
+    """
+    filepath = str(tmp_path / f"player.{file_format}")
+    save_player_data(player_data, filepath)
+    loaded_data = load_player_data(filepath, columns=["kills", "win"])
+    assert list(loaded_data.columns) == ["kills", "win"]
+    assert list(loaded_data.index) == list(player_data.index)
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "arrow"])
+def test_load_analysis_data(tmp_path, file_format):
+    """
+    Test the analysis columns are loaded in their compact types with the
+    same values, using a small fraction of the memory
+    """
+    filepath = str(tmp_path / f"player.{file_format}")
+    save_player_data(player_data, filepath)
+    analysis_data = load_analysis_data(filepath)
+    assert list(analysis_data.index) == list(player_data.index)
+    for column, dtype in ANALYSIS_SCHEMA.items():
+        if column not in player_data:
+            continue
+        assert analysis_data[column].dtype == dtype
+        assert analysis_data[column].tolist() == player_data[column].tolist()
+    memory = analysis_data.memory_usage(deep=True).sum()
+    assert memory * 10 < player_data.memory_usage(deep=True).sum()